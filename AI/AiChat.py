@@ -1,87 +1,72 @@
-import requests
 import json
 import os
 import re
 from datetime import datetime
 from pytz import timezone
 from dotenv import load_dotenv
+from AI.llm_client import LLMClient, LLMError
+from AI.intent_router import (
+    GROUP_KEYWORDS, PERSONAL_KEYWORDS, SMALL_TALK_PHRASES, STATUS_KEYWORDS, STATUS_VALUES, TIME_KEYWORDS,
+    URGENT_KEYWORDS, classify_message
+)
+from date_parsing import parse_datetime_value
 
 load_dotenv()
 
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
 TOGETHER_MODEL = "mistralai/Mistral-7B-Instruct-v0.1"
 
-headers = {
-    "Authorization": f"Bearer {TOGETHER_API_KEY}",
-    "Content-Type": "application/json"
-}
+SYSTEM_PROMPT = "You are FocusMate, a helpful productivity coach."
+COMPLETION_PARAMS = {"max_tokens": 200, "temperature": 0.7, "top_p": 0.9}
+
+_llm_client = None
+
+def get_llm_client():
+    """Shared pooled client, created on first use."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient.from_env(TOGETHER_MODEL)
+    return _llm_client
 
 # ---------- Query Type Helpers ----------
+# Reference behaviour over intent_router's keyword lists, one list at a time;
+# routing uses classify_message() (one scan, same results)
 def is_small_talk(text):
     cleaned = re.sub(r'[^\w\s]', '', text.lower().strip())
-    return cleaned in [
-        "hi", "hello", "hey", "how are you", "whats up", "yo",
-        "any advice", "any tips", "help", "motivation", "can you help",
-        "some advice", "anything to suggest"
-    ]
+    return cleaned in SMALL_TALK_PHRASES
 
 def is_urgent_query(msg):
-    keywords = [
-        "urgent", "priority", "what is urgent", "what's urgent", "most important",
-        "what should i do first", "what should i focus", "next", "urgent task",
-        "due soon", "deadline", "what should i do now", "which group task is urgent"
-    ]
-    return any(k in msg.lower() for k in keywords)
+    return any(k in msg.lower() for k in URGENT_KEYWORDS)
 
 def is_time_query(text):
-    return any(p in text.lower() for p in [
-        "what time is it", "current time", "now time", "tell me the time",
-        "what's the time", "what is the time", "what day is it", "date today", "today's date"
-    ])
+    return any(p in text.lower() for p in TIME_KEYWORDS)
 
 def is_status_query(msg):
-    return any(s in msg.lower() for s in ["to do", "in progress", "done", "completed", "not started"])
+    return any(s in msg.lower() for s in STATUS_KEYWORDS)
 
 def is_personal_task_query(msg):
-    msg = msg.lower()
-    return ("personal task" in msg or 
-            "my task" in msg or 
-            "personal to do" in msg or
-            "my to do" in msg)
+    return any(k in msg.lower() for k in PERSONAL_KEYWORDS)
 
 def is_group_task_query(msg):
-    msg = msg.lower()
-    return ("group task" in msg or 
-            "team task" in msg or 
-            "group to do" in msg or
-            "team to do" in msg)
+    return any(k in msg.lower() for k in GROUP_KEYWORDS)
 
 def extract_requested_status(msg):
     msg = msg.lower()
-    if "in progress" in msg: return "in progress"
-    if "to do" in msg or "todo" in msg: return "to do"
-    if "done" in msg or "completed" in msg: return "completed"
-    if "not started" in msg: return "not started"
+    for status, keywords in STATUS_VALUES:
+        if any(k in msg for k in keywords):
+            return status
     return None
 
 # ---------- Task Formatters ----------
-def parse_deadline(deadline_str):
-    formats = [
-        '%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%d %H:%M:%S.%f',
-        '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'
-    ]
-    for fmt in formats:
-        try:
-            return datetime.strptime(deadline_str, fmt)
-        except:
-            continue
-    return None
+def parse_deadline(deadline):
+    # Accepts datetimes (task_context passes them natively) as well as strings
+    return parse_datetime_value(deadline)
 
-def format_due_date(task):
-    deadline = parse_deadline(task.get('deadline', ''))
+def format_due_date(task, now=None):
+    deadline = parse_deadline(task.get('deadline'))
     if not deadline:
         return "No deadline"
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
     delta = deadline - now
     if delta.total_seconds() < 0:
         return "overdue"
@@ -111,66 +96,79 @@ def summarize_task(task):
     return f"{title} — {deadline_msg} | {prio}"
 
 # ---------- Urgent Task Logic ----------
+def is_done(task):
+    return (task.get("status") or "").lower() in ("completed", "done")
+
 def find_most_urgent(tasks):
-    future_tasks = [t for t in tasks if t.get("status", "").lower() not in ("completed", "done") and t.get("deadline")]
+    future_tasks = [t for t in tasks if not is_done(t) and t.get("deadline")]
     if not future_tasks:
         return None
-    return sorted(future_tasks, key=lambda t: (
+    # Each deadline is parsed once, and min() avoids sorting the whole list
+    return min(future_tasks, key=lambda t: (
         parse_deadline(t.get("deadline")) or datetime.max,
-        int(t.get("priority", 999))
-    ))[0]
+        int(t.get("priority") or 999)
+    ))
 
 # ---------- Main AI Generator ----------
-def generate_ai_advice(message, schedule_json, personal_tasks, group_tasks, urgent_tasks, user_name="there"):
+def prepare_ai_request(message, schedule_json, personal_tasks, group_tasks, urgent_tasks, user_name="there"):
+    """
+    Route the message and build what to send to the model.
+    Returns (reply, messages, cacheable): `reply` is set when the answer is produced
+    locally (no model call), otherwise `messages` holds the chat-completions prompt.
+    """
     if not TOGETHER_API_KEY:
-        return "❌ Missing Together.ai API key."
+        return "❌ Missing Together.ai API key.", None, False
 
-    # Filter out completed tasks
-    personal_tasks = [t for t in personal_tasks if t.get('status', '').lower() not in ("completed", "done")]
-    group_tasks = [t for t in group_tasks if t.get('status', '').lower() not in ("completed", "done")]
-    urgent_tasks = [t for t in urgent_tasks if t.get('status', '').lower() not in ("completed", "done")]
+    # Filter out completed tasks (task_context.load_task_context already does this in SQL for /chat)
+    personal_tasks = [t for t in personal_tasks if not is_done(t)]
+    group_tasks = [t for t in group_tasks if not is_done(t)]
+    urgent_tasks = [t for t in urgent_tasks if not is_done(t)]
 
     now = datetime.now(timezone("Asia/Jerusalem"))
     date_str = now.strftime("%A, %B %d, %Y")
     time_str = now.strftime("%H:%M")
     part_of_day = "morning" if now.hour < 12 else "afternoon" if now.hour < 17 else "evening"
 
+    # Prompts that only depend on the clock (small talk, time) repeat a lot and are cached
+    cacheable = False
+
     # --- Message Type Routing ---
-    if is_status_query(message):
-        status = extract_requested_status(message)
+    intents, requested_status = classify_message(message)
+    if "status" in intents:
+        status = requested_status
         if not status:
-            return "I couldn't determine which task status you meant."
+            return "I couldn't determine which task status you meant.", None, False
 
-        match = lambda t: t.get("status", "").lower() == status
+        match = lambda t: (t.get("status") or "").lower() == status
         
         # Check if specifically asking for personal or group tasks
-        if is_personal_task_query(message):
+        if "personal" in intents:
             tasks = [summarize_task(t) for t in personal_tasks if match(t)]
             if not tasks:
-                return f"You have no personal tasks with status '{status}'."
-            return f"Here are your personal tasks with status **{status}**:\n" + "\n".join(f"- {t}" for t in tasks)
+                return f"You have no personal tasks with status '{status}'.", None, False
+            return f"Here are your personal tasks with status **{status}**:\n" + "\n".join(f"- {t}" for t in tasks), None, False
         
-        elif is_group_task_query(message):
+        elif "group" in intents:
             tasks = [summarize_task(t) for t in group_tasks if match(t)]
             if not tasks:
-                return f"You have no group tasks with status '{status}'."
-            return f"Here are your group tasks with status **{status}**:\n" + "\n".join(f"- {t}" for t in tasks)
+                return f"You have no group tasks with status '{status}'.", None, False
+            return f"Here are your group tasks with status **{status}**:\n" + "\n".join(f"- {t}" for t in tasks), None, False
         
         else:  # Show both if not specified
             personal = [summarize_task(t) for t in personal_tasks if match(t)]
             group = [summarize_task(t) for t in group_tasks if match(t)]
 
             if not personal and not group:
-                return f"You have no tasks with status '{status}'."
+                return f"You have no tasks with status '{status}'.", None, False
 
             response = f"Here are your tasks with status **{status}**:\n"
             if personal:
                 response += "\n🟢 *Personal Tasks:*\n" + "\n".join(f"- {t}" for t in personal)
             if group:
                 response += "\n🔵 *Group Tasks:*\n" + "\n".join(f"- {t}" for t in group)
-            return response
+            return response, None, False
 
-    elif is_urgent_query(message):
+    elif "urgent" in intents:
         urgent = find_most_urgent(personal_tasks + group_tasks + urgent_tasks)
         if urgent:
             summary = summarize_task(urgent)
@@ -181,22 +179,24 @@ Suggest a next step based on the most urgent task:
             prompt = f"""You are FocusMate. Today is {date_str}.
 There are no urgent tasks. Encourage the user to review priorities or take a short productive action."""
 
-    elif is_time_query(message):
+    elif "time" in intents:
         prompt = f"""It's {time_str} on {date_str} (Asia/Jerusalem).
 Give the user this info and one motivational tip to stay productive."""
+        cacheable = True
 
-    elif is_small_talk(message):
+    elif "small_talk" in intents:
         prompt = f"""It's the {part_of_day} on {date_str}.
 Greet {user_name} warmly. Offer two productivity tips like Pomodoro or task batching."""
+        cacheable = True
 
-    elif is_group_task_query(message):
+    elif "group" in intents:
         deadlines = "\n".join(f"- {summarize_task(t)}" for t in group_tasks) or "No group tasks."
         prompt = f"""Today is {date_str} ({part_of_day}).
 Here are your group tasks:
 {deadlines}
 Suggest a useful action to move one of them forward."""
 
-    elif is_personal_task_query(message):
+    elif "personal" in intents:
         deadlines = "\n".join(f"- {summarize_task(t)}" for t in personal_tasks) or "No personal tasks."
         prompt = f"""Today is {date_str} ({part_of_day}).
 Here are your personal tasks:
@@ -216,20 +216,36 @@ Schedule: {schedule_note}
 ❗ Urgent Tasks:\n{urgent_summary}
 Give clear, actionable planning advice. Suggest one next step."""
 
-    payload = {
-        "model": TOGETHER_MODEL,
-        "messages": [
-            {"role": "system", "content": "You are FocusMate, a helpful productivity coach."},
-            {"role": "user", "content": prompt}
-        ],
-        "max_tokens": 200,
-        "temperature": 0.7,
-        "top_p": 0.9
-    }
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    return None, messages, cacheable
+
+
+def generate_ai_advice(message, schedule_json, personal_tasks, group_tasks, urgent_tasks, user_name="there"):
+    reply, messages, cacheable = prepare_ai_request(
+        message, schedule_json, personal_tasks, group_tasks, urgent_tasks, user_name
+    )
+    if reply is not None:
+        return reply
+
+    try:
+        return get_llm_client().complete(messages, cache=cacheable, **COMPLETION_PARAMS)
+    except LLMError as e:
+        return f"❌ Together.ai error: {e}"
+
+
+def stream_ai_advice(message, schedule_json, personal_tasks, group_tasks, urgent_tasks, user_name="there"):
+    """Same as generate_ai_advice(), but yields the reply piece by piece as the model produces it."""
+    reply, messages, cacheable = prepare_ai_request(
+        message, schedule_json, personal_tasks, group_tasks, urgent_tasks, user_name
+    )
+    if reply is not None:
+        yield reply
+        return
 
     try:
-        res = requests.post("https://api.together.xyz/v1/chat/completions", headers=headers, json=payload)
-        res.raise_for_status()
-        return res.json()["choices"][0]["message"]["content"].strip()
-    except Exception as e:
-        return f"❌ Together.ai error: {e}" 
\ No newline at end of file
+        yield from get_llm_client().stream(messages, cache=cacheable, **COMPLETION_PARAMS)
+    except LLMError as e:
+        yield f"❌ Together.ai error: {e}"
@@ -0,0 +1,126 @@
+import threading
+import queue
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Column order the feature scaler and the model were trained on (see AI/task_prediction.py)
+FEATURE_COLUMNS = ["category_encoded", "priority", "estimated_time", "start_time_hour", "user_encoded"]
+FALLBACK_USER_ID = -1
+
+
+# ---------- Vectorized Encoding ----------
+def encode_categories(categories, category_encoder):
+    """Encode a list of categories in one call, mapping unknown ones to 'General'."""
+    known = set(category_encoder.classes_)
+    categories = [c if c in known else "General" for c in categories]
+    return category_encoder.transform(categories).astype(np.float64)
+
+
+def encode_users(user_ids, user_encoder, users_with_history):
+    """
+    Encode a list of user ids in one call.
+    Users without completed tasks or unknown to the encoder use the fallback user (-1).
+    Returns (encoded_ids, used_fallback_flags).
+    """
+    known = set(user_encoder.classes_.tolist())
+    used_fallback = np.array([
+        uid not in users_with_history or uid not in known for uid in user_ids
+    ], dtype=bool)
+    resolved = [FALLBACK_USER_ID if fallback else uid for uid, fallback in zip(user_ids, used_fallback)]
+    return user_encoder.transform(resolved).astype(np.float64), used_fallback
+
+
+def build_feature_matrix(category_encoded, priorities, estimated_times, start_hours, user_encoded):
+    """Stack the five model features into a (n, 5) float matrix in FEATURE_COLUMNS order."""
+    return np.column_stack([
+        np.asarray(category_encoded, dtype=np.float64),
+        np.asarray(priorities, dtype=np.float64),
+        np.asarray(estimated_times, dtype=np.float64),
+        np.asarray(start_hours, dtype=np.float64),
+        np.asarray(user_encoded, dtype=np.float64),
+    ])
+
+
+# ---------- Batched Forward Pass ----------
+def predict_minutes(model, feature_scaler, time_scaler, features):
+    """
+    Run scaling, the model forward pass and the inverse time scaling on a whole
+    (n, 5) feature matrix at once. Returns a 1-D array of predicted minutes.
+    `model` is either an MlpInferenceEngine or a Keras model.
+    """
+    features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+    if hasattr(model, "predict_minutes"):
+        # MlpInferenceEngine has both scalers folded into its weights
+        return model.predict_minutes(features)
+    # Same arithmetic as StandardScaler.transform, without the per-call DataFrame validation
+    scaled = (features - feature_scaler.mean_) / feature_scaler.scale_
+    predicted_scaled = np.asarray(model.predict(scaled, verbose=0)).reshape(-1)
+    return predicted_scaled * time_scaler.scale_[0] + time_scaler.mean_[0]
+
+
+# ---------- Micro-Batcher ----------
+class PredictionBatcher:
+    """
+    Merges concurrent single-row predictions into one forward pass.
+
+    Callers block in `predict()` while a background worker collects every row
+    submitted within `max_wait_ms` of the first one (up to `max_batch_size`)
+    and evaluates them with a single call to `predict_fn`.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, features):
+        """Queue one feature row and return a Future resolving to its predicted minutes."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(features, dtype=np.float64), future))
+        return future
+
+    def predict(self, features, timeout=10):
+        return self.submit(features).result(timeout=timeout)
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # Window closed: only take rows that are already waiting
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            rows = np.vstack([features for features, _ in batch])
+            try:
+                results = np.asarray(self.predict_fn(rows)).reshape(-1)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), value in zip(batch, results):
+                future.set_result(float(value))
+
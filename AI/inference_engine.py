@@ -0,0 +1,120 @@
+"""
+Pure-NumPy inference for the task duration regressor.
+
+The Keras model trained in AI/task_prediction.py is a small Dense MLP. Its weights,
+together with the feature/time StandardScaler parameters, are exported to a single
+.npz artifact. At load time the input scaler is folded into the first layer and the
+output scaler into the last one, so a prediction is just a few fused matmuls and
+TensorFlow never has to be imported by the web workers.
+
+Regenerate the artifact after retraining (run from the repository root):
+    python AI/inference_engine.py
+"""
+import os
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_PATH = os.path.join(BASE_DIR, "task_prediction_model.npz")
+
+_ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0.0, out=x),
+    "linear": lambda x: x,
+}
+
+
+# ---------- Export ----------
+def export_inference_artifact(model, feature_scaler, time_scaler, out_path=ARTIFACT_PATH):
+    """Write the Dense layer weights and scaler parameters of a trained model to `out_path`."""
+    arrays = {}
+    activations = []
+    dense_layers = [layer for layer in model.layers if layer.get_weights()]
+    for index, layer in enumerate(dense_layers):
+        kernel, bias = layer.get_weights()
+        activation = layer.get_config().get("activation", "linear")
+        if activation not in _ACTIVATIONS:
+            raise ValueError(f"Unsupported activation '{activation}' in layer {layer.name}")
+        arrays[f"kernel_{index}"] = kernel.astype(np.float64)
+        arrays[f"bias_{index}"] = bias.astype(np.float64)
+        activations.append(activation)
+
+    np.savez(
+        out_path,
+        activations=np.array(activations),
+        feature_mean=np.asarray(feature_scaler.mean_, dtype=np.float64),
+        feature_scale=np.asarray(feature_scaler.scale_, dtype=np.float64),
+        time_mean=np.asarray(time_scaler.mean_, dtype=np.float64),
+        time_scale=np.asarray(time_scaler.scale_, dtype=np.float64),
+        **arrays
+    )
+    return out_path
+
+
+def export_from_files(model_path, feature_scaler_path, time_scaler_path, out_path=ARTIFACT_PATH):
+    """Load the saved Keras model and pickled scalers, then export them (needs TensorFlow)."""
+    import joblib
+    from tensorflow import keras
+
+    model = keras.models.load_model(model_path)
+    return export_inference_artifact(
+        model, joblib.load(feature_scaler_path), joblib.load(time_scaler_path), out_path
+    )
+
+
+# ---------- Inference ----------
+class MlpInferenceEngine:
+    """
+    Evaluates the exported MLP on raw (unscaled) feature rows and returns minutes.
+    Input scaling and output inverse-scaling are folded into the first and last layers.
+    """
+
+    def __init__(self, kernels, biases, activations, feature_mean, feature_scale, time_mean, time_scale):
+        kernels = [np.array(k, dtype=np.float64) for k in kernels]
+        biases = [np.array(b, dtype=np.float64) for b in biases]
+
+        # (x - mean) / scale @ W + b  ==  x @ (W / scale[:, None]) + (b - (mean / scale) @ W)
+        feature_mean = np.asarray(feature_mean, dtype=np.float64)
+        feature_scale = np.asarray(feature_scale, dtype=np.float64)
+        biases[0] = biases[0] - (feature_mean / feature_scale) @ kernels[0]
+        kernels[0] = kernels[0] / feature_scale[:, None]
+
+        # (x @ W + b) * time_scale + time_mean
+        time_mean = float(np.asarray(time_mean).reshape(-1)[0])
+        time_scale = float(np.asarray(time_scale).reshape(-1)[0])
+        kernels[-1] = kernels[-1] * time_scale
+        biases[-1] = biases[-1] * time_scale + time_mean
+
+        self.layers = [(k, b, _ACTIVATIONS[str(a)]) for k, b, a in zip(kernels, biases, activations)]
+        self.n_features_in_ = kernels[0].shape[0]
+
+    @classmethod
+    def load(cls, path=ARTIFACT_PATH):
+        with np.load(path, allow_pickle=False) as artifact:
+            count = len(artifact["activations"])
+            return cls(
+                kernels=[artifact[f"kernel_{i}"] for i in range(count)],
+                biases=[artifact[f"bias_{i}"] for i in range(count)],
+                activations=artifact["activations"].tolist(),
+                feature_mean=artifact["feature_mean"],
+                feature_scale=artifact["feature_scale"],
+                time_mean=artifact["time_mean"],
+                time_scale=artifact["time_scale"],
+            )
+
+    def predict_minutes(self, features):
+        """Predict durations in minutes for a (n, n_features) matrix of raw features."""
+        x = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            x = activation(x)
+        return x.reshape(-1)
+
+
+if __name__ == "__main__":
+    path = export_from_files(
+        os.path.join(BASE_DIR, "task_prediction_model.keras"),
+        os.path.join(BASE_DIR, "feature_scaler.pkl"),
+        os.path.join(BASE_DIR, "time_scaler.pkl"),
+    )
+    print(f"✅ Inference artifact written to {path}")
@@ -0,0 +1,83 @@
+"""
+Single-pass intent classification for AiChat messages.
+
+Every routing keyword is compiled once into a table mapping the keyword to the labels
+it implies. A message is lowercased once and each distinct keyword is tested once, so
+classifying a message costs one sweep of the table. It does not run AiChat's six
+is_*_query helpers in sequence, each with its own lower(). Those helpers check the
+lists below one at a time with `in`, and the results are the same.
+"""
+import re
+from collections import namedtuple
+
+STATUS_KEYWORDS = ["to do", "in progress", "done", "completed", "not started"]
+URGENT_KEYWORDS = [
+    "urgent", "priority", "what is urgent", "what's urgent", "most important",
+    "what should i do first", "what should i focus", "next", "urgent task",
+    "due soon", "deadline", "what should i do now", "which group task is urgent"
+]
+TIME_KEYWORDS = [
+    "what time is it", "current time", "now time", "tell me the time",
+    "what's the time", "what is the time", "what day is it", "date today", "today's date"
+]
+PERSONAL_KEYWORDS = ["personal task", "my task", "personal to do", "my to do"]
+GROUP_KEYWORDS = ["group task", "team task", "group to do", "team to do"]
+SMALL_TALK_PHRASES = frozenset([
+    "hi", "hello", "hey", "how are you", "whats up", "yo",
+    "any advice", "any tips", "help", "motivation", "can you help",
+    "some advice", "anything to suggest"
+])
+
+# Status values in the order extract_requested_status() checks them
+STATUS_VALUES = [
+    ("in progress", ["in progress"]),
+    ("to do", ["to do", "todo"]),
+    ("completed", ["done", "completed"]),
+    ("not started", ["not started"]),
+]
+
+MessageIntents = namedtuple("MessageIntents", ["intents", "status"])
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def _build_table():
+    labels = {}
+    for intent, keywords in [("status", STATUS_KEYWORDS), ("urgent", URGENT_KEYWORDS), ("time", TIME_KEYWORDS),
+                             ("personal", PERSONAL_KEYWORDS), ("group", GROUP_KEYWORDS)]:
+        for keyword in keywords:
+            labels.setdefault(keyword, set()).add(intent)
+    for value, keywords in STATUS_VALUES:
+        for keyword in keywords:
+            labels.setdefault(keyword, set()).add("status=" + value)
+
+    # A keyword containing a shorter keyword with the same labels can never add anything
+    # ("what is urgent" vs "urgent"), so only the shortest ones are kept
+    table = []
+    for keyword, keyword_labels in labels.items():
+        implied = set().union(*(labels[other] for other in labels if other != keyword and other in keyword))
+        if not keyword_labels <= implied:
+            table.append((keyword, frozenset(keyword_labels)))
+    return tuple(table)
+
+
+_KEYWORD_TABLE = _build_table()
+
+
+def classify_message(message):
+    """
+    Return MessageIntents(intents, status) for a chat message.
+    `intents` is a frozenset drawn from {"status", "urgent", "time", "small_talk",
+    "personal", "group"}; `status` is the requested task status or None.
+    """
+    text = message.lower()
+    found = set()
+    for keyword, labels in _KEYWORD_TABLE:
+        if keyword in text:
+            found |= labels
+
+    if _PUNCTUATION.sub('', text.strip()) in SMALL_TALK_PHRASES:
+        found.add("small_talk")
+
+    status = next((value for value, _ in STATUS_VALUES if "status=" + value in found), None)
+    return MessageIntents(frozenset(label for label in found if "=" not in label), status)
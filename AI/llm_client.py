@@ -0,0 +1,188 @@
+"""
+Chat-completions client for the Together.ai endpoint used by AiChat.
+
+- one pooled requests.Session shared by every call (keep-alive, no TLS handshake per message)
+- connect/read timeouts and retries with exponential backoff on 429/5xx and connection errors
+- an in-process LRU+TTL cache keyed on the normalized prompt, for prompts that repeat
+  (small talk, time questions)
+- `acomplete()` for asyncio callers, sharing the same pool and cache
+- `stream()` yields tokens from the upstream's server-sent events as they arrive
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_BASE_URL = "https://api.together.xyz/v1"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LLMError(Exception):
+    """Raised when the completion endpoint fails after all retries."""
+
+
+def normalize_prompt(text):
+    """Lowercase and collapse whitespace so trivially different prompts share a cache entry."""
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, max_size=256, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LLMClient:
+
+    def __init__(self, api_key, model, base_url=DEFAULT_BASE_URL, connect_timeout=3.05, read_timeout=30,
+                 max_retries=2, backoff_factor=0.5, pool_size=20, cache_size=256, cache_ttl=300,
+                 max_concurrency=32):
+        self.api_key = api_key
+        self.model = model
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = ResponseCache(cache_size, cache_ttl)
+        self.max_concurrency = max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()  # one per event loop
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["POST"]),  # completions are safe to repeat
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    @classmethod
+    def from_env(cls, model):
+        return cls(
+            api_key=os.getenv("TOGETHER_API_KEY"),
+            model=model,
+            base_url=os.getenv("TOGETHER_API_URL", DEFAULT_BASE_URL),
+            read_timeout=float(os.getenv("LLM_TIMEOUT", 30)),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
+            cache_ttl=float(os.getenv("LLM_CACHE_TTL", 300)),
+        )
+
+    def cache_key(self, messages, params):
+        normalized = [{"role": m["role"], "content": normalize_prompt(m["content"])} for m in messages]
+        raw = json.dumps([self.model, normalized, sorted(params.items())], sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def build_payload(self, messages, params):
+        return {"model": self.model, "messages": messages, **params}
+
+    def complete(self, messages, cache=False, **params):
+        """
+        Return the assistant message text for `messages`.
+        With cache=True an identical (normalized) prompt is answered from memory.
+        """
+        key = self.cache_key(messages, params) if cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            res = self.session.post(self.url, json=self.build_payload(messages, params), timeout=self.timeout)
+            res.raise_for_status()
+            content = res.json()["choices"][0]["message"]["content"].strip()
+        except (requests.RequestException, KeyError, IndexError, ValueError) as e:
+            raise LLMError(str(e)) from e
+
+        if key:
+            self.cache.set(key, content)
+        return content
+
+    def stream(self, messages, cache=False, **params):
+        """
+        Yield content tokens as the upstream streams them (OpenAI-style SSE chunks).
+        Retries only cover establishing the response, never a half-read stream.
+        With cache=True a cached reply is yielded whole, and a completed stream is cached.
+        """
+        key = self.cache_key(messages, params) if cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        payload = self.build_payload(messages, params)
+        payload["stream"] = True
+        parts = []
+        try:
+            with self.session.post(self.url, json=payload, timeout=self.timeout, stream=True) as res:
+                res.raise_for_status()
+                # Decoded per line: requests would read a text/event-stream without a charset as ISO-8859-1
+                for line in res.iter_lines():
+                    line = line.decode("utf-8")
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                    if delta.get("content"):
+                        parts.append(delta["content"])
+                        yield delta["content"]
+        except (requests.RequestException, KeyError, IndexError, ValueError) as e:
+            raise LLMError(str(e)) from e
+
+        if key:
+            self.cache.set(key, "".join(parts).strip())
+
+    async def acomplete(self, messages, cache=False, **params):
+        """asyncio variant of complete(); runs on the shared pool, at most max_concurrency at once."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.setdefault(loop, asyncio.Semaphore(self.max_concurrency))
+        async with semaphore:
+            return await asyncio.to_thread(self.complete, messages, cache, **params)
+
+    def close(self):
+        self.session.close()
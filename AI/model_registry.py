@@ -0,0 +1,101 @@
+import os
+import threading
+
+# Config keys the prediction routes look up; kept identical to the old app.config entries
+COMPONENTS = ("MODEL", "CATEGORY_ENCODER", "FEATURE_SCALER", "TIME_SCALER", "USER_ENCODER", "SEEN_USER_IDS")
+
+
+class ModelRegistry:
+    """
+    Lazily loads the prediction model and its encoders/scalers.
+
+    Nothing heavy (joblib, scikit-learn, NumPy, TensorFlow) is imported until the
+    first `get()` call or until `warm_up()` loads everything in a background thread,
+    so creating the Flask app stays cheap.
+    """
+
+    def __init__(self, base_dir="AI"):
+        self.model_path = os.path.join(base_dir, "task_prediction_model.keras")
+        self.inference_artifact_path = os.path.join(base_dir, "task_prediction_model.npz")
+        self.category_encoder_path = os.path.join(base_dir, "category_encoder.pkl")
+        self.feature_scaler_path = os.path.join(base_dir, "feature_scaler.pkl")
+        self.time_scaler_path = os.path.join(base_dir, "time_scaler.pkl")
+        self.user_encoder_path = os.path.join(base_dir, "user_encoder.pkl")
+        self.seen_users_path = os.path.join(base_dir, "seen_user_ids.pkl")
+
+        self._components = None
+        self._lock = threading.Lock()
+        self._warm_up_thread = None
+
+    def missing_files(self):
+        """Cheap existence check so a broken deployment still fails at startup."""
+        # The Keras model is only needed when the NumPy artifact has not been exported
+        model_file = self.inference_artifact_path if os.path.exists(self.inference_artifact_path) else self.model_path
+        required = [model_file, self.category_encoder_path, self.feature_scaler_path, self.time_scaler_path]
+        return [file for file in required if not os.path.exists(file)]
+
+    @property
+    def loaded(self):
+        return self._components is not None
+
+    def get(self, name):
+        if name not in COMPONENTS:
+            raise KeyError(name)
+        if self._components is None:
+            self._ensure_loaded()
+        return self._components.get(name)
+
+    def warm_up(self):
+        """Start loading every component in a daemon thread; returns the thread."""
+        with self._lock:
+            if self._components is None and self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self._ensure_loaded, name="ai-warm-up", daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._components is None:
+                self._components = self._load()
+
+    def _load(self):
+        import joblib
+
+        try:
+            # ✅ Load Model (NumPy engine when exported, Keras otherwise)
+            if os.path.exists(self.inference_artifact_path):
+                print("🔄 Loading NumPy inference engine...")
+                from AI.inference_engine import MlpInferenceEngine
+                model = MlpInferenceEngine.load(self.inference_artifact_path)
+            else:
+                print("🔄 Loading AI model...")
+                import tensorflow as tf
+                model = tf.keras.models.load_model(self.model_path)
+            print("✅ Model loaded successfully!")
+
+            category_encoder = joblib.load(self.category_encoder_path)
+            feature_scaler = joblib.load(self.feature_scaler_path)
+            print(f"✅ Feature Scaler Loaded! Expected Features: {feature_scaler.n_features_in_}")
+            time_scaler = joblib.load(self.time_scaler_path)
+            user_encoder = joblib.load(self.user_encoder_path)
+
+            # ✅ Load seen user IDs (optional but helpful for fallback)
+            if os.path.exists(self.seen_users_path):
+                seen_user_ids = joblib.load(self.seen_users_path)
+                print(f"👥 Loaded known user IDs: {seen_user_ids}")
+            else:
+                seen_user_ids = [-1]  # fallback if file missing
+
+            print("✅ AI Model and Encoders Loaded Successfully!")
+            return {
+                "MODEL": model,
+                "CATEGORY_ENCODER": category_encoder,
+                "FEATURE_SCALER": feature_scaler,
+                "TIME_SCALER": time_scaler,
+                "USER_ENCODER": user_encoder,
+                "SEEN_USER_IDS": seen_user_ids,
+            }
+
+        except Exception as e:
+            print(f"❌ Error loading AI Model or Encoders: {e}")
+            return {name: None for name in COMPONENTS}
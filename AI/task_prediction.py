@@ -138,6 +138,10 @@ joblib.dump(label_encoder, "category_encoder.pkl")
 joblib.dump(time_scaler, "time_scaler.pkl")
 joblib.dump(user_encoder, "user_encoder.pkl")
 
+# Export weights + scalers for the TensorFlow-free inference engine used by app.py
+from inference_engine import export_inference_artifact
+export_inference_artifact(model, scaler, time_scaler, "task_prediction_model.npz")
+
 # Final log
 print(f"📊 Final dataset shape: {df.shape}")
 print(f"🔍 Input feature count: {X.shape[1]}")
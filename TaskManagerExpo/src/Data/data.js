@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { View, Text, Image, StyleSheet, ScrollView, Dimensions, ActivityIndicator } from 'react-native';
+import { View, Text, StyleSheet, ScrollView, Dimensions, ActivityIndicator } from 'react-native';
 import { LineChart, BarChart } from 'react-native-chart-kit';
 import config from '../config';
 import AsyncStorage from '@react-native-async-storage/async-storage';
@@ -38,21 +38,18 @@ const DataScreen = () => {
   const [loading, setLoading] = useState(true);
   const [userId, setUserId] = useState(null);
   const [onTimeStats, setOnTimeStats] = useState(null);
+  const [completion, setCompletion] = useState(null);
   const [refreshing, setRefreshing] = useState(false);
 
   const fetchData = async (id) => {
     try {
-      const monthlyRes = await fetch(`${config.API_URL}/api/data/monthly_stats/${id}`);
-      const monthlyJson = await monthlyRes.json();
-      setMonthlyData(monthlyJson);
-
-      const timeTakenRes = await fetch(`${config.API_URL}/api/data/time_taken_stats/${id}`);
-      const timeTakenJson = await timeTakenRes.json();
-      setTimeTakenData(timeTakenJson);
-
-      const onTimeRes = await fetch(`${config.API_URL}/api/data/on_time_stats/${id}`);
-      const onTimeJson = await onTimeRes.json();
-      setOnTimeStats(onTimeJson);
+      // One request for every chart on the screen
+      const res = await fetch(`${config.API_URL}/api/data/dashboard/${id}`);
+      const dashboard = await res.json();
+      setMonthlyData(dashboard.monthly_stats);
+      setTimeTakenData(dashboard.time_taken_stats);
+      setOnTimeStats(dashboard.on_time_stats);
+      setCompletion(dashboard.completion);
     } catch (error) {
       console.error("❌ Failed to fetch data:", error);
     } finally {
@@ -101,11 +98,39 @@ const DataScreen = () => {
         
         <View style={styles.card}>
           <Text style={styles.cardTitle}>Task Completion Breakdown</Text>
-          <Image
-            source={{ uri: `${config.API_URL}/api/data/completion_rate_chart?user_id=${userId}` }}
-            style={styles.chartImage}
-            resizeMode="contain"
-          />
+          {loading || !completion ? (
+            <View style={styles.loadingContainer}>
+              <ActivityIndicator size="small" color="#3498db" />
+            </View>
+          ) : (
+            completion.total > 0 ? (
+              <PieChart
+                data={[
+                  {
+                    name: 'Personal Tasks',
+                    population: completion.personal,
+                    color: '#3498db',
+                    legendFontColor: '#2c3e50',
+                    legendFontSize: 14
+                  },
+                  {
+                    name: 'Group Tasks',
+                    population: completion.group,
+                    color: '#9b59b6',
+                    legendFontColor: '#2c3e50',
+                    legendFontSize: 14
+                  }
+                ]}
+                width={screenWidth - 40}
+                height={240}
+                chartConfig={chartConfig}
+                accessor="population"
+                backgroundColor="transparent"
+                paddingLeft="15"
+                absolute
+              />
+            ) : <Text style={styles.noData}>No completed tasks yet</Text>
+          )}
         </View>
   
         <View style={styles.card}>
@@ -12,6 +12,7 @@ import { Ionicons } from "@expo/vector-icons";
 import { useNavigation, useFocusEffect } from "@react-navigation/native";
 import * as ImagePicker from 'expo-image-picker';
 import { Linking } from "react-native";
+import { subscribeToGroupChat } from "./chatEvents";
 
 const GroupChatScreen = () => {
   const { userId } = useAuth();
@@ -22,7 +23,11 @@ const GroupChatScreen = () => {
   const [messages, setMessages] = useState([]);
   const [newMessage, setNewMessage] = useState("");
   const [uploading, setUploading] = useState(false);
+  const [hasOlder, setHasOlder] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const flatListRef = useRef(null);
+  const lastIdRef = useRef(null);
+  const prependingRef = useRef(false);
 
   const isImageFile = (fileUrl) => {
     if (!fileUrl) return false;
@@ -30,23 +35,68 @@ const GroupChatScreen = () => {
     return ['jpg', 'jpeg', 'png', 'gif', 'webp'].includes(ext);
   };
 
+  // Latest page first, then new messages are pushed over the event stream (no polling)
   useFocusEffect(
     React.useCallback(() => {
-      fetchMessages();
-      const interval = setInterval(fetchMessages, 5000);
-      return () => clearInterval(interval);
+      let close = null;
+      let active = true;
+      fetchMessages().then(() => {
+        if (!active) return;
+        close = subscribeToGroupChat(groupId, userId, {
+          afterId: () => lastIdRef.current,
+          onMessage: (message) => appendMessages([message]),
+          onResync: () => {
+            lastIdRef.current = null;
+            setMessages([]);
+            fetchMessages();
+          },
+        });
+      });
+      return () => {
+        active = false;
+        close?.();
+      };
     }, [])
   );
 
+  const appendMessages = (newMessages) => {
+    if (!newMessages.length) return;
+    lastIdRef.current = Math.max(lastIdRef.current || 0, newMessages[newMessages.length - 1].id);
+    setMessages((prev) => {
+      const lastId = prev.length ? prev[prev.length - 1].id : 0;
+      return [...prev, ...newMessages.filter((m) => m.id > lastId)];
+    });
+  };
+
+  // First call loads the latest page; after that only messages newer than the last one we have
   const fetchMessages = async () => {
     try {
-      const res = await axios.get(`${config.API_URL}/groups/${groupId}/chat`);
-      setMessages(res.data);
+      const params = lastIdRef.current ? { after_id: lastIdRef.current } : {};
+      const res = await axios.get(`${config.API_URL}/groups/${groupId}/chat`, { params });
+      if (!params.after_id) setHasOlder(res.headers["x-has-more"] === "true");
+      appendMessages(res.data);
     } catch (err) {
       console.error("Failed to fetch chat:", err);
     }
   };
 
+  const fetchOlderMessages = async () => {
+    if (!hasOlder || loadingOlder || !messages.length) return;
+    setLoadingOlder(true);
+    try {
+      const res = await axios.get(`${config.API_URL}/groups/${groupId}/chat`, {
+        params: { before_id: messages[0].id },
+      });
+      setHasOlder(res.headers["x-has-more"] === "true");
+      prependingRef.current = true;
+      setMessages((prev) => [...res.data, ...prev]);
+    } catch (err) {
+      console.error("Failed to fetch older messages:", err);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const sendMessage = async () => {
     if (!newMessage.trim()) return;
 
@@ -56,7 +106,6 @@ const GroupChatScreen = () => {
         content: newMessage,
       });
       setNewMessage("");
-      fetchMessages();
     } catch (err) {
       Alert.alert("Error", "Failed to send message");
       console.error("Failed to send message:", err);
@@ -119,8 +168,6 @@ const GroupChatScreen = () => {
         },
         transformRequest: (data) => data, // ✅ IMPORTANT for React Native FormData
       });
-  
-      fetchMessages();
     } catch (error) {
       Alert.alert("Upload Failed", "Could not upload image");
       console.error("❌ Upload error:", error.response?.data || error.message);
@@ -146,15 +193,19 @@ const GroupChatScreen = () => {
         ]}>
   
           {/* ✅ Image rendering */}
+          {/* Thumbnail in the list, original on tap */}
           {isImage && (
-            <View style={styles.fileContainer}>
+            <TouchableOpacity
+              style={styles.fileContainer}
+              onPress={() => Linking.openURL(`${config.API_URL}${item.file_url}`)}
+            >
               <Image
-                source={{ uri: `${config.API_URL}${item.file_url}` }}
+                source={{ uri: `${config.API_URL}${item.thumbnail_url || item.file_url}` }}
                 style={styles.imageMessage}
                 resizeMode="cover"
                 onError={(e) => console.log("❌ Failed to load image", e.nativeEvent)}
               />
-            </View>
+            </TouchableOpacity>
           )}
   
           {/* ✅ File link fallback (non-image) */}
@@ -232,7 +283,16 @@ const GroupChatScreen = () => {
           renderItem={renderItem}
           contentContainerStyle={styles.chatList}
           ref={flatListRef}
-          onContentSizeChange={() => flatListRef.current?.scrollToEnd({ animated: true })}
+          onContentSizeChange={() => {
+            // Stay in place when older messages were added above
+            if (prependingRef.current) {
+              prependingRef.current = false;
+              return;
+            }
+            flatListRef.current?.scrollToEnd({ animated: true });
+          }}
+          refreshing={loadingOlder}
+          onRefresh={hasOlder ? fetchOlderMessages : undefined}
           onLayout={() => flatListRef.current?.scrollToEnd({ animated: true })}
           showsVerticalScrollIndicator={false}
           keyboardDismissMode="interactive"
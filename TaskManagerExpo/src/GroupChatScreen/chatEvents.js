@@ -0,0 +1,70 @@
+import config from "../config";
+
+// Subscribes to /groups/<id>/chat/events (server-sent events) over a streaming XHR,
+// since React Native has no EventSource. Reconnects after a drop, resuming from the
+// last message id it saw. Returns a function that closes the stream.
+//
+//   const close = subscribeToGroupChat(groupId, userId, {
+//     afterId: () => lastIdRef.current,   // omit for unread counts only
+//     onMessage: (message) => ...,
+//     onUnread: (count) => ...,
+//     onResync: () => ...,                 // too far behind: reload the latest page
+//   });
+export const subscribeToGroupChat = (groupId, userId, handlers) => {
+  let xhr = null;
+  let closed = false;
+  let retryTimer = null;
+  let retryDelay = 1000;
+
+  const connect = () => {
+    const params = [`user_id=${userId}`];
+    if (handlers.afterId) {
+      const afterId = handlers.afterId();
+      if (afterId) params.push(`after_id=${afterId}`);
+    } else {
+      params.push("messages=0");
+    }
+
+    let seen = 0;
+    let buffer = "";
+    const request = new XMLHttpRequest();
+    xhr = request;
+    request.open("GET", `${config.API_URL}/groups/${groupId}/chat/events?${params.join("&")}`);
+    request.setRequestHeader("Accept", "text/event-stream");
+    request.onreadystatechange = () => {
+      if (request.readyState >= 3 && request.responseText) {
+        buffer += request.responseText.slice(seen);
+        seen = request.responseText.length;
+        const frames = buffer.split("\n\n");
+        buffer = frames.pop();
+        frames.forEach(dispatch);
+        retryDelay = 1000;
+      }
+      if (request.readyState === 4 && !closed) {
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      }
+    };
+    request.send();
+  };
+
+  const dispatch = (frame) => {
+    let event = "message";
+    let data = null;
+    frame.split("\n").forEach((line) => {
+      if (line.startsWith("event: ")) event = line.slice(7);
+      else if (line.startsWith("data: ")) data = JSON.parse(line.slice(6));
+    });
+    if (!data) return; // heartbeat comment
+    if (event === "message") handlers.onMessage?.(data);
+    else if (event === "unread") handlers.onUnread?.(data.unread);
+    else if (event === "resync") handlers.onResync?.();
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    xhr?.abort();
+  };
+};
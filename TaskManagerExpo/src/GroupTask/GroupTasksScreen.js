@@ -7,6 +7,7 @@ import config from "../config"; // Adjust the path based on your file structure
 import axios from "axios"; // Axios for API requests
 import { LinearGradient } from 'expo-linear-gradient';
 import { FontAwesome5 } from "@expo/vector-icons";
+import { subscribeToGroupChat } from "../GroupChatScreen/chatEvents";
 
 const GroupTasksScreen = () => {
   const route = useRoute();
@@ -67,7 +68,6 @@ const GroupTasksScreen = () => {
 useFocusEffect(
   React.useCallback(() => {
     fetchGroupData();
-    checkNewMessages();
   }, [groupId])
 );
 
@@ -87,23 +87,21 @@ useFocusEffect(
 
 
   
-const checkNewMessages = async () => {
-  try {
-    const userId = await AsyncStorage.getItem("userId");
-    const res = await fetch(`${config.API_URL}/groups/${groupId}/chat/unread/${userId}`);
-    const data = await res.json();
-    setHasNewMessages(data.hasNewMessages); // Backend should return a boolean
-  } catch (err) {
-    console.warn("Could not check new messages:", err);
-    setHasNewMessages(false);
-  }
-};
+// 🔔 Unread count is pushed by the chat event stream instead of polled
 useEffect(() => {
-  const interval = setInterval(() => {
-    checkNewMessages();
-  }, 10000); // 🔁 Every 10 seconds
-
-  return () => clearInterval(interval); // 🔁 Cleanup on unmount
+  let close = null;
+  let active = true;
+  AsyncStorage.getItem("userId").then((userId) => {
+    if (!active || !userId) return;
+    close = subscribeToGroupChat(groupId, userId, {
+      onUnread: (count) => setHasNewMessages(count > 0),
+    });
+  });
+
+  return () => {
+    active = false;
+    close?.(); // 🔁 Cleanup on unmount
+  };
 }, [groupId]);
 
 
@@ -0,0 +1,228 @@
+"""
+Task analytics for the Data screen.
+
+A user's completed PersonalTasks are summed per (year, month, category) in the
+PersonalTaskRollups table. Each row holds the completed count, on-time/late counts, and
+the duration sum and count. The task routes keep it current: they take a task's
+contribution before a change and apply the difference after it (update_rollup). The
+analytics read a user's few rollup rows, so a read costs O(months), however many tasks
+there are. Monthly, per-category and on-time views are folded from those rows in Python.
+Group tasks need one more query.
+
+rebuild_rollups() recomputes the table from PersonalTasks with the same conditional
+aggregation that personal_rollup_rows() runs for a single user.
+"""
+from collections import defaultdict, namedtuple
+
+from sqlalchemy import and_, case, delete, extract, func, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from date_parsing import parse_datetime_value
+from extensions import db
+from models import GroupTask, PersonalTask, PersonalTaskRollup, task_user_association
+from sql_expressions import seconds_between
+
+DONE = "Done"
+NO_MONTH = 0  # rollup year/month of tasks without actual_time
+
+# One aggregated bucket of completed personal tasks
+RollupRow = namedtuple("RollupRow", ["category", "year", "month", "completed", "on_time", "late",
+                                     "duration_seconds", "timed"])
+
+
+def _count_if(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _rollup_columns():
+    has_deadline = and_(PersonalTask.actual_time.isnot(None), PersonalTask.deadline.isnot(None))
+    has_duration = and_(PersonalTask.start_time.isnot(None), PersonalTask.actual_time.isnot(None))
+    year_expr = extract('year', PersonalTask.actual_time)
+    month_expr = extract('month', PersonalTask.actual_time)
+
+    return (
+        PersonalTask.category,
+        year_expr,
+        month_expr,
+        func.count(PersonalTask.id),
+        _count_if(and_(has_deadline, PersonalTask.actual_time <= PersonalTask.deadline)),
+        _count_if(and_(has_deadline, PersonalTask.actual_time > PersonalTask.deadline)),
+        func.sum(case((has_duration, seconds_between(PersonalTask.start_time, PersonalTask.actual_time)))),
+        _count_if(has_duration),
+    )
+
+
+def personal_rollup_query(user_id):
+    """The grouped query behind personal_rollup_rows."""
+    columns = _rollup_columns()
+    return db.session.query(*columns).filter(
+        PersonalTask.user_id == user_id,
+        PersonalTask.status == DONE
+    ).group_by(*columns[:3])
+
+
+def personal_rollup_rows(user_id):
+    """RollupRows of the user's Done personal tasks, aggregated from PersonalTasks itself."""
+    # Drivers return SUMs and EXTRACTs as int, float or Decimal depending on the database
+    return [RollupRow(category, None if year is None else int(year), None if month is None else int(month),
+                      int(completed), int(on_time or 0), int(late or 0), float(duration or 0), int(timed or 0))
+            for category, year, month, completed, on_time, late, duration, timed in personal_rollup_query(user_id)]
+
+
+def rollup_rows(user_id):
+    """RollupRows of the user's Done personal tasks, read from PersonalTaskRollups."""
+    rows = db.session.query(
+        PersonalTaskRollup.category,
+        PersonalTaskRollup.year,
+        PersonalTaskRollup.month,
+        PersonalTaskRollup.completed,
+        PersonalTaskRollup.on_time,
+        PersonalTaskRollup.late,
+        PersonalTaskRollup.duration_seconds,
+        PersonalTaskRollup.timed,
+    ).filter(
+        PersonalTaskRollup.user_id == user_id,
+        PersonalTaskRollup.completed > 0
+    ).all()
+
+    return [RollupRow(category, None if year == NO_MONTH else year, None if month == NO_MONTH else month,
+                      completed, on_time, late, duration, timed)
+            for category, year, month, completed, on_time, late, duration, timed in rows]
+
+
+def task_contribution(task):
+    """
+    ((user_id, year, month, category), (completed, on_time, late, duration_seconds, timed))
+    that `task` adds to the rollup, or None unless it is a user's Done task.
+    """
+    if task.status != DONE or task.user_id is None:
+        return None
+    # Routes assign request strings to the datetime columns before they are flushed
+    actual_time = parse_datetime_value(task.actual_time)
+    start_time = parse_datetime_value(task.start_time)
+    deadline = parse_datetime_value(task.deadline)
+
+    year, month = (actual_time.year, actual_time.month) if actual_time else (NO_MONTH, NO_MONTH)
+    on_time = late = 0
+    if actual_time and deadline:
+        on_time, late = (1, 0) if actual_time <= deadline else (0, 1)
+    duration, timed = 0, 0
+    if actual_time and start_time:
+        duration, timed = (actual_time - start_time).total_seconds(), 1
+    return (task.user_id, year, month, task.category or "General"), (1, on_time, late, duration, timed)
+
+
+def _update_rollup_row(key, values, sign):
+    user_id, year, month, category = key
+    completed, on_time, late, duration, timed = values
+    # Relative updates, so concurrent task changes of one user do not overwrite each other
+    return db.session.execute(update(PersonalTaskRollup).where(
+        PersonalTaskRollup.user_id == user_id,
+        PersonalTaskRollup.year == year,
+        PersonalTaskRollup.month == month,
+        PersonalTaskRollup.category == category
+    ).values(
+        completed=PersonalTaskRollup.completed + sign * completed,
+        on_time=PersonalTaskRollup.on_time + sign * on_time,
+        late=PersonalTaskRollup.late + sign * late,
+        duration_seconds=PersonalTaskRollup.duration_seconds + sign * duration,
+        timed=PersonalTaskRollup.timed + sign * timed,
+    ).execution_options(synchronize_session=False)).rowcount
+
+
+def _add_to_rollup(contribution, sign):
+    key, values = contribution
+    if _update_rollup_row(key, values, sign) or sign < 0:
+        return
+    (user_id, year, month, category), (completed, on_time, late, duration, timed) = key, values
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(PersonalTaskRollup).values(
+                user_id=user_id, year=year, month=month, category=category, completed=completed,
+                on_time=on_time, late=late, duration_seconds=duration, timed=timed))
+    except IntegrityError:
+        # Another request created the bucket after our update found none: add to its row instead
+        _update_rollup_row(key, values, sign)
+
+
+def update_rollup(before, after):
+    """
+    Replace a task's rollup contribution `before` (from task_contribution, None if it had
+    none) with `after`, in the current transaction. Nothing to do when they are equal.
+    """
+    if before == after:
+        return
+    if before is not None:
+        _add_to_rollup(before, -1)
+    if after is not None:
+        _add_to_rollup(after, 1)
+
+
+def rebuild_rollups():
+    """Recompute PersonalTaskRollups from PersonalTasks for every user; returns the row count."""
+    category, year_expr, month_expr, *counts = _rollup_columns()
+    source = db.session.query(
+        PersonalTask.user_id,
+        category,
+        func.coalesce(year_expr, NO_MONTH),
+        func.coalesce(month_expr, NO_MONTH),
+        *(func.coalesce(count, 0) for count in counts)
+    ).filter(
+        PersonalTask.user_id.isnot(None),
+        PersonalTask.status == DONE
+    ).group_by(PersonalTask.user_id, category, year_expr, month_expr)
+
+    db.session.execute(delete(PersonalTaskRollup))
+    db.session.execute(insert(PersonalTaskRollup).from_select(
+        ["user_id", "category", "year", "month", "completed", "on_time", "late", "duration_seconds", "timed"],
+        source.statement
+    ))
+    db.session.commit()
+    return db.session.query(func.count(PersonalTaskRollup.id)).scalar()
+
+
+def summarize(rows):
+    """Fold RollupRows into the monthly, time-taken, on-time and completed figures."""
+    monthly = defaultdict(int)
+    durations = defaultdict(lambda: [0, 0])
+    on_time = late = completed = 0
+    for row in rows:
+        completed += row.completed
+        on_time += row.on_time
+        late += row.late
+        if row.year is not None:
+            monthly[(row.year, row.month)] += row.completed
+        if row.timed:
+            durations[row.category][0] += row.duration_seconds
+            durations[row.category][1] += row.timed
+
+    return {
+        "monthly_stats": [
+            {"month": f"{year}-{month:02}", "completed_tasks": count}
+            for (year, month), count in sorted(monthly.items())
+        ],
+        "time_taken_stats": [
+            {"category": category, "avg_minutes": round(total / timed / 60, 2) if total else 0}
+            for category, (total, timed) in sorted(durations.items())
+        ],
+        "on_time_stats": {"on_time": on_time, "late": late},
+        "personal_completed": completed,
+    }
+
+
+def group_completed_count(user_id):
+    return db.session.query(func.count(task_user_association.c.id)).join(
+        GroupTask, GroupTask.id == task_user_association.c.task_id
+    ).filter(
+        task_user_association.c.user_id == user_id,
+        GroupTask.status == DONE
+    ).scalar()
+
+
+def dashboard(user_id):
+    """Everything the Data screen shows, in two queries."""
+    summary = summarize(rollup_rows(user_id))
+    personal = summary.pop("personal_completed")
+    group = group_completed_count(user_id)
+    summary["completion"] = {"personal": personal, "group": group, "total": personal + group}
+    return summary
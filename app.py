@@ -1,5 +1,6 @@
 import os
-from flask import Flask, jsonify, request, session, make_response, url_for,render_template_string,send_from_directory,Blueprint,send_file
+import posixpath
+from flask import Flask, jsonify, request, session, make_response, url_for,render_template_string,send_from_directory,Blueprint,Response,stream_with_context
 from flask_cors import CORS, cross_origin  
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -11,26 +12,30 @@ from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
 from models import Task, db, User, PersonalTask, Group, GroupTask, group_user_association, task_user_association,UserFreeSchedule,UserSchedule,GroupMessage
 from extensions import db, mail, jwt
-import numpy as np
-import tensorflow as tf  
-import joblib  
-import pandas as pd
 import json
-from sqlalchemy.orm import joinedload
-from AI.AiChat import generate_ai_advice
+from AI.AiChat import generate_ai_advice, stream_ai_advice
+from AI.model_registry import ModelRegistry
 from itsdangerous import URLSafeTimedSerializer
 from urllib.parse import quote
 from collections import defaultdict
-from werkzeug.utils import secure_filename
 import requests
 from jira_routes import jira_bp  
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import io
+from task_context import load_task_context
+from date_parsing import parse_datetime_value
+from free_time import DAYS as FREE_TIME_DAYS, MINUTES_PER_DAY, FreeTimeline, format_clock, parse_range_list
+from schedule_solver import SOLVERS, SolverTask, dated_chunks, solve_edf, task_report
+from availability import availability_by_user, save_availability
+from task_distribution import TaskAssignments, distribute_group_tasks
+from group_chat import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, latest_message_id, message_page, serialize_message, unread_counts
+from chat_events import InProcessBroker, chat_event_stream, group_channel, sse_event, unread_count
+from chat_uploads import DEFAULT_MAX_UPLOAD_BYTES, ResumableUploads, UploadError, content_etag, make_thumbnail, store_stream
+from analytics import dashboard, group_completed_count, rollup_rows, summarize, task_contribution, update_rollup
+from charts import CHART_MIMETYPES, ChartRenderer, chart_etag, completion_chart_data, render_completion_chart
+from commands import register_commands
+from serializers import cached_group_names, prime_group_names, serialize_group_tasks, serialize_groups
+import math
 from sqlalchemy.sql import func
 from collections import defaultdict
-import random
 from datetime import datetime, timedelta
 from random import randint
 from flask import current_app
@@ -39,8 +44,6 @@ from dateutil.parser import parse as parse_datetime
 
 
 
-analytics_bp = Blueprint('analytics', __name__)
-
 # Load environment variables
 env_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(dotenv_path=".env", override=True)
@@ -90,91 +93,52 @@ def create_app():
 
     print("📌 Checking AI Model and Encoders Before Loading...")
 
-    # ✅ Define Paths
-    model_path = "AI/task_prediction_model.keras"  
-    category_encoder_path = "AI/category_encoder.pkl"
-    feature_scaler_path = "AI/feature_scaler.pkl"
-    time_scaler_path = "AI/time_scaler.pkl"
-
-    # ✅ Debug: Check if files exist
-    missing_files = [file for file in [model_path, category_encoder_path, feature_scaler_path, time_scaler_path] if not os.path.exists(file)]
+    # ✅ Components load on first use (or in the warm-up thread), not here
+    ai_models = ModelRegistry("AI")
+    missing_files = ai_models.missing_files()
 
     if missing_files:
         print(f"❌ Missing AI files: {missing_files}")
         raise FileNotFoundError(f"Required AI files missing: {missing_files}")
 
-    try:
-        # ✅ Load Model
-        print("🔄 Loading AI model...")
-        model = tf.keras.models.load_model(model_path)
-        print("✅ Model loaded successfully!")
-
-        # ✅ Load Category Encoder
-        print("🔄 Loading category encoder...")
-        category_encoder = joblib.load(category_encoder_path)
-        print(f"✅ Category Encoder Loaded!")
-
-        # ✅ Load Feature Scaler
-        print("🔄 Loading feature scaler...")
-        feature_scaler = joblib.load(feature_scaler_path)
-        print(f"✅ Feature Scaler Loaded! Expected Features: {feature_scaler.n_features_in_}")
-
-        # ✅ Load Time Scaler
-        print("🔄 Loading time scaler...")
-        time_scaler = joblib.load(time_scaler_path)
-        print(f"✅ Time Scaler Loaded!")
-
-        # ✅ Load User Encoder
-        print("🔄 Loading user encoder...")
-        user_encoder_path = "AI/user_encoder.pkl"
-        user_encoder = joblib.load(user_encoder_path)
-        print("✅ User Encoder Loaded!")
-
-        # ✅ Load seen user IDs (optional but helpful for fallback)
-        seen_users_path = "AI/seen_user_ids.pkl"
-        if os.path.exists(seen_users_path):
-            seen_user_ids = joblib.load(seen_users_path)
-            print(f"👥 Loaded known user IDs: {seen_user_ids}")
-        else:
-            seen_user_ids = [-1]  # fallback if file missing
-
-        # ✅ Store in app config
-        app.config["USER_ENCODER"] = user_encoder
-        app.config["SEEN_USER_IDS"] = seen_user_ids
-
-        # ✅ Store AI components in Flask app config
-        app.config["MODEL"] = model
-        app.config["CATEGORY_ENCODER"] = category_encoder
-        app.config["FEATURE_SCALER"] = feature_scaler
-        app.config["TIME_SCALER"] = time_scaler
+    app.config["AI_MODELS"] = ai_models
+    app.config.setdefault("AI_WARMUP", os.getenv("AI_WARMUP", "1") != "0")
+    if app.config["AI_WARMUP"]:
+        ai_models.warm_up()
 
-        print("✅ AI Model and Encoders Loaded Successfully!")
-
-    except Exception as e:
-        print(f"❌ Error loading AI Model or Encoders: {e}")
-        app.config["MODEL"] = None
-        app.config["CATEGORY_ENCODER"] = None
-        app.config["FEATURE_SCALER"] = None
-        app.config["TIME_SCALER"] = None
 
 
+    # Chat push; replace with a shared broker when running several workers (see chat_events.py)
+    app.config.setdefault("CHAT_BROKER", InProcessBroker())
+    # Chat attachments (see chat_uploads.py)
+    app.config.setdefault("CHAT_UPLOADS", ResumableUploads(
+        os.getenv("UPLOAD_FOLDER", os.path.join(os.getcwd(), 'uploads')),
+        max_bytes=int(os.getenv("MAX_UPLOAD_BYTES", DEFAULT_MAX_UPLOAD_BYTES))
+    ))
+    # Chart images are drawn in worker processes; CHART_WORKERS=0 draws in the request thread
+    app.config.setdefault("CHART_RENDERER", ChartRenderer(workers=int(os.getenv("CHART_WORKERS", "2"))))
 
     @app.after_request
     def add_cors_headers(response):
         response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', '*')  # Dynamic origin
         response.headers['Access-Control-Allow-Credentials'] = 'true'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+        response.headers['Access-Control-Allow-Methods'] = 'GET, HEAD, POST, PUT, PATCH, DELETE, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Upload-Offset'
+        # chat pagination, resumable uploads
+        response.headers['Access-Control-Expose-Headers'] = 'X-Has-More, Upload-Offset, Upload-Length, Location'
         return response
 
 
     routes(app)
-    app.register_blueprint(analytics_bp)
+    register_commands(app)
     return app
 
 
 # ==================================================== Routes ======================================================= #
 def routes(app):
+    # Created per app: a blueprint can't take new routes once registered, so a
+    # module-level one would break every create_app() call after the first
+    analytics_bp = Blueprint('analytics', __name__)
 
     @app.route('/register', methods=['POST'])
     def register():
@@ -341,6 +305,7 @@ def routes(app):
             return jsonify({"error": "Task not found"}), 404
 
         try:
+            update_rollup(task_contribution(task), None)
             db.session.delete(task)
             db.session.commit()
             print(f"Task {task_id} deleted successfully!")  # Debugging log
@@ -438,6 +403,7 @@ def routes(app):
         
         db.session.add(new_task)
         try:
+            update_rollup(None, task_contribution(new_task))
             db.session.commit()
             return jsonify(new_task.to_dict()), 201
         except Exception as e:
@@ -480,6 +446,7 @@ def routes(app):
 
         try:
             print(f"🔍 Before Update: {task.to_dict()}")  # Debugging before update
+            contribution = task_contribution(task)  # what the task adds to the analytics rollup
 
             # ✅ Ensure status updates correctly
             if "status" in data:
@@ -509,6 +476,7 @@ def routes(app):
             task.due_date = data.get("due_date", task.due_date)
             task.deadline = data.get("deadline", task.deadline)
             task.category = data.get("category", task.category)
+            update_rollup(contribution, task_contribution(task))
 
             db.session.commit()
             print(f"✅ After Update: {task.to_dict()}")
@@ -535,15 +503,15 @@ def routes(app):
                 group = db.session.get(Group, group_id)
                 if not group:
                     return jsonify({"error": "Group not found"}), 404
-                return jsonify(group.to_dict()), 200
+                return jsonify(serialize_groups([group])[0]), 200
 
             if created_by:
                 groups = Group.query.filter_by(created_by=created_by).all()
             else:
                 groups = Group.query.all()
 
-            # Convert to JSON
-            group_list = [group.to_dict() for group in groups]
+            # Convert to JSON (members/tasks fetched in bulk, not per group)
+            group_list = serialize_groups(groups)
             return jsonify(group_list), 200
 
         except Exception as e:
@@ -554,19 +522,16 @@ def routes(app):
     @app.route('/groups/user/<int:user_id>', methods=['GET'])
     def get_user_groups(user_id):
         try:
-            # Groups created by the user
-            created_groups = Group.query.filter_by(created_by=user_id).all()
-
-            # Groups the user is a member of
-            member_groups = Group.query.join(group_user_association).filter(
+            # Groups created by the user or that the user is a member of, in one query
+            member_group_ids = db.session.query(group_user_association.c.group_id).filter(
                 group_user_association.c.user_id == user_id
-            ).all()
-
-            # Combine results and remove duplicates
-            all_groups = list({group.id: group for group in created_groups + member_groups}.values())
+            )
+            all_groups = Group.query.filter(
+                db.or_(Group.created_by == user_id, Group.id.in_(member_group_ids))
+            ).order_by(Group.id).all()
 
             # Convert to JSON
-            group_list = [group.to_dict() for group in all_groups]
+            group_list = serialize_groups(all_groups)
             return jsonify(group_list), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -581,12 +546,12 @@ def routes(app):
 
         try:
             group_tasks = group.tasks  # Using the relationship
-            print(f"Debug: Fetched tasks for group {group_id}: {group_tasks}")  # Debug log
+            print(f"Debug: Fetched {len(group_tasks)} tasks for group {group_id}")  # Debug log
 
             if not group_tasks:
                 return jsonify([]), 200  # Return an empty list if no tasks
 
-            task_list = [task.to_dict() for task in group_tasks]
+            task_list = serialize_group_tasks(group_tasks)
             return jsonify(task_list), 200
         except Exception as e:
             print(f"Debug: Error occurred while fetching tasks for group {group_id}: {str(e)}")  # Debug log
@@ -786,11 +751,16 @@ def routes(app):
         task.deadline = data.get('deadline', task.deadline)
 
         # ✅ Update assigned users with validation
+        assignments = None
+        assigned_user_ids = None
         if 'assigned_users' in data:
             requested_ids = set(data['assigned_users'])
 
-            # Get valid group member IDs
-            group_member_ids = {member.userId for member in group.members}
+            # Get valid group member IDs (ids only, no User rows); field errors should surface at the commit below
+            with db.session.no_autoflush:
+                group_member_ids = {user_id for (user_id,) in db.session.query(group_user_association.c.user_id).filter(
+                    group_user_association.c.group_id == group_id
+                )}
             valid_user_ids = requested_ids & group_member_ids  # intersection
 
             # Optional: log any invalid users
@@ -798,14 +768,20 @@ def routes(app):
             if invalid_user_ids:
                 print(f"⚠️ These user IDs are not part of the group and will be ignored: {invalid_user_ids}")
 
-            # Assign only valid users
-            task.assigned_users = User.query.filter(User.userId.in_(valid_user_ids)).all()
+            # Assign only valid users: diff against the current assignees, written in bulk
+            with db.session.no_autoflush:
+                assignments = TaskAssignments.load([task.id], valid_user_ids)
+            assignments.replace(task.id, sorted(valid_user_ids))
+            assigned_user_ids = assignments.assigned[task.id]
             print(f"👥 Assigned Users Updated: {valid_user_ids}")
 
         try:
+            if assignments is not None:
+                assignments.flush()
             db.session.commit()
-            print(f"✅ After Update: {task.to_dict()}")
-            return jsonify(task.to_dict()), 200
+            task_dict = task.to_dict(assigned_user_ids=assigned_user_ids)
+            print(f"✅ After Update: {task_dict}")
+            return jsonify(task_dict), 200
         except Exception as e:
             db.session.rollback()
             print(f"🚨 Database Commit Error: {str(e)}")
@@ -931,11 +907,11 @@ def routes(app):
             task_dict['task_type'] = 'personal'
             result.append(task_dict)
         
-        # Group tasks
-        for task in group_tasks:
-            task_dict = task.to_dict()
+        # Group tasks (assignees and group names fetched in bulk)
+        group_names = cached_group_names(task.group_id for task in group_tasks)
+        for task_dict in serialize_group_tasks(group_tasks):
             task_dict['task_type'] = 'group'
-            task_dict['group_name'] = task.group.name if task.group else None
+            task_dict['group_name'] = group_names.get(task_dict['group_id'])
             result.append(task_dict)
 
         return jsonify(result), 200
@@ -959,11 +935,8 @@ def routes(app):
                     "message": "No schedule found, returning an empty schedule."
                 }), 200
 
-            # Check if there is enough time in the schedule
-            total_available_hours = sum([
-                        sum(int(hour) for hour in day if isinstance(hour, (int, str)) and str(hour).isdigit())
-                        for day in user_schedule.to_dict().values() if isinstance(day, list)
-                    ])
+            # Check if there is enough time in the schedule (weekly total is maintained on write)
+            total_available_hours = user_schedule.weekly_free_minutes / 60
             if total_available_hours < 5:  # Adjust threshold as needed
                 return jsonify({
                     "userID": user_id,
@@ -988,31 +961,17 @@ def routes(app):
             return jsonify({"error": "No data provided"}), 400
 
         try:
-            user_schedule = UserFreeSchedule.query.filter_by(user_id=user_id).first()
-
-            if not user_schedule:
-                print(f"⚠️ No schedule found for user {user_id}. Creating a new one.")
-                user_schedule = UserFreeSchedule(
-                    user_id=user_id,
-                    sunday="",
-                    monday="",
-                    tuesday="",
-                    wednesday="",
-                    thursday="",
-                    friday="",
-                    saturday=""
-                )
-                db.session.add(user_schedule)
-                db.session.commit()  # Save new schedule to database
-
+            ranges_by_day = {}
             for day in ["sunday", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]:
                 if day in data:
-                    if isinstance(data[day], list):  # Ensure it's a list
-                        setattr(user_schedule, day, ",".join(data[day]))  
-                    else:
+                    if not isinstance(data[day], list):  # Ensure it's a list
                         return jsonify({"error": f"Invalid format for {day}. Expected a list."}), 400
+                    # "H:MM-H:MM" strings, stored as minute rows so there is no length limit;
+                    # unreadable entries are skipped, as the schedule generator always did
+                    ranges_by_day[day] = parse_range_list(data[day])
 
-            user_schedule.updated_at = datetime.utcnow()  
+            user_schedule = save_availability(user_id, ranges_by_day)
+            user_schedule.updated_at = datetime.utcnow()
             db.session.commit()
 
             print(f"✅ Schedule updated successfully for user {user_id}")
@@ -1227,16 +1186,18 @@ def routes(app):
 
     @app.route('/group-tasks/user/<int:user_id>', methods=['GET'])
     def get_group_tasks_for_user(user_id):
-        tasks = GroupTask.query\
+        # Group names come back with the tasks in the same query
+        rows = db.session.query(GroupTask, Group.name)\
             .join(task_user_association)\
+            .outerjoin(Group, Group.id == GroupTask.group_id)\
             .filter(task_user_association.c.user_id == user_id)\
             .all()
+        tasks = [task for task, _ in rows]
+        group_names = prime_group_names((task.group_id, name) for task, name in rows)
 
         result = []
-        for task in tasks:
-            task_dict = task.to_dict()
-            group = Group.query.get(task.group_id)
-            task_dict["group"] = {"name": group.name if group else "Unknown Group"}
+        for task_dict in serialize_group_tasks(tasks):
+            task_dict["group"] = {"name": group_names.get(task_dict["group_id"]) or "Unknown Group"}
             result.append(task_dict)
 
         return jsonify(result)
@@ -1259,26 +1220,105 @@ def routes(app):
 
         db.session.add(new_message)
         db.session.commit()
+        publish_chat_message(new_message)
         return jsonify(new_message.to_dict()), 201
-    
+
+    def publish_chat_message(message):
+        """Push a committed message to the group's open event streams."""
+        payload = serialize_message(message, message.user.username if message.user else None)
+        app.config["CHAT_BROKER"].publish(group_channel(message.group_id), "message", payload)
+
+    @app.route('/groups/<int:group_id>/chat/events', methods=['GET'])
+    def group_chat_events(group_id):
+        """
+        Server-sent events replacing chat and unread polling. Query params: user_id
+        (required), after_id (replay newer messages first), messages=0 (unread counts only).
+        Events: "message", "unread" ({"group_id", "unread"}), and "resync" when the
+        client is over a page behind. Idle connections get a comment line every 15 s.
+        """
+        try:
+            user_id = int(request.args["user_id"])
+            after_id = int(request.args["after_id"]) if request.args.get("after_id") else None
+        except (KeyError, ValueError):
+            return jsonify({"message": "user_id is required and after_id must be an integer"}), 400
+        include_messages = request.args.get("messages") != "0"
+
+        # Subscribed before the catch-up query so nothing published in between is lost
+        subscription = app.config["CHAT_BROKER"].subscribe(group_channel(group_id))
+        try:
+            backlog, resync = [], False
+            if after_id is not None and include_messages:
+                backlog, resync = message_page(group_id, after_id=after_id, limit=MAX_PAGE_SIZE)
+            unread = unread_count(group_id, user_id)
+        except Exception:
+            subscription.close()
+            raise
+
+        # Not wrapped in stream_with_context: the request context (and its DB session) is
+        # released once the headers go out, so idle streams hold no database connection
+        response = Response(chat_event_stream(subscription, group_id, user_id, unread, backlog=backlog,
+                                              after_id=after_id, resync=resync,
+                                              include_messages=include_messages),
+                            mimetype="text/event-stream")
+        # Not left to the generator's finally: it never runs if the client leaves before the first frame
+        response.call_on_close(subscription.close)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
 
     @app.route('/groups/<int:group_id>/chat', methods=['GET'])
     def get_group_messages(group_id):
-        messages = GroupMessage.query.filter_by(group_id=group_id).order_by(GroupMessage.timestamp.asc()).all()
-        return jsonify([{
-            "id": m.id,
-            "group_id": m.group_id,
-            "user_id": m.user_id,
-            "username": m.user.username,  # make sure relationship exists
-            "content": m.content,
-            "timestamp": m.timestamp.isoformat()
-        } for m in messages])
+        """
+        Query params (all optional): after_id (only messages newer than it — the polling mode),
+        before_id (page of older messages), limit (default 50, max 200).
+        Body stays a list in ascending id order; X-Has-More says whether another page exists.
+        """
+        try:
+            before_id, after_id, limit = (
+                int(request.args[name]) if request.args.get(name) else default
+                for name, default in (("before_id", None), ("after_id", None), ("limit", DEFAULT_PAGE_SIZE))
+            )
+        except ValueError:
+            return jsonify({"message": "before_id, after_id and limit must be integers"}), 400
+        if before_id is not None and after_id is not None:
+            return jsonify({"message": "Use either before_id or after_id, not both"}), 400
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        messages, has_more = message_page(group_id, before_id=before_id, after_id=after_id, limit=limit)
+        response = jsonify(messages)
+        response.headers["X-Has-More"] = "true" if has_more else "false"
+        return response
+
+    # Room for the multipart boundaries and the user_id/content fields around the file
+    MULTIPART_OVERHEAD = 64 * 1024
 
-    UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    def chat_uploads():
+        return app.config["CHAT_UPLOADS"]
+
+    def create_file_message(group_id, user_id, content, stored):
+        thumbnail = make_thumbnail(chat_uploads().root, stored.relative_path)
+        new_message = GroupMessage(
+            group_id=group_id,
+            user_id=user_id,
+            content=content,
+            file_url=f"/uploads/{stored.relative_path}",
+            thumbnail_url=f"/uploads/{thumbnail}" if thumbnail else None,
+            timestamp=datetime.utcnow()
+        )
+        db.session.add(new_message)
+        db.session.commit()
+        publish_chat_message(new_message)
+        return new_message
 
     @app.route('/groups/<int:group_id>/chat/upload', methods=['POST'])
     def upload_chat_file(group_id):
+        uploads = chat_uploads()
+        # Refused before any of the body is read; chunked bodies are cut off by Werkzeug at the same size
+        request.max_content_length = uploads.max_bytes + MULTIPART_OVERHEAD
+        if request.content_length and request.content_length > request.max_content_length:
+            return jsonify({"message": f"File is larger than {uploads.max_bytes} bytes"}), 413
+
         user_id = request.form.get('user_id')
         file = request.files.get('file')
         content = request.form.get('content', "") 
@@ -1286,33 +1326,96 @@ def routes(app):
         if not user_id or not file:
             return jsonify({"message": "User ID and file are required"}), 400
 
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
-
-        file_url = f"/uploads/{filename}"
+        try:
+            stored = store_stream(uploads.root, file.stream, file.filename, max_bytes=uploads.max_bytes)
+        except UploadError as e:
+            return jsonify({"message": str(e)}), e.status_code
+        print(f"📎 Stored {stored.size} bytes as {stored.relative_path}" + (" (duplicate)" if stored.deduplicated else ""))
 
-        new_message = GroupMessage(
-            group_id=group_id,
-            user_id=user_id,
-            content=content,  
-            file_url=file_url,
-            timestamp=datetime.utcnow()
-        )
-        print("🔍 user_id:", user_id)
-        print("🔍 file:", file)
-        print("🔍 request.form:", request.form)
-        print("🔍 request.files:", request.files)
+        new_message = create_file_message(group_id, user_id, content, stored)
+        return jsonify(new_message.to_dict()), 201
 
-        db.session.add(new_message)
-        db.session.commit()
+    # ✅ Resumable uploads: POST to start, PATCH bytes at Upload-Offset, HEAD/GET to resume
+    @app.route('/groups/<int:group_id>/chat/uploads', methods=['POST'])
+    def start_chat_upload(group_id):
+        data = request.get_json() or {}
+        user_id, filename, size = data.get("user_id"), data.get("filename"), data.get("size")
+        if not user_id or not filename or not isinstance(size, int):
+            return jsonify({"message": "user_id, filename and an integer size are required"}), 400
+        try:
+            upload_id = chat_uploads().create(size, filename, metadata={
+                "group_id": group_id, "user_id": user_id, "content": data.get("content", "")
+            })
+        except UploadError as e:
+            return jsonify({"message": str(e)}), e.status_code
+
+        response = jsonify({"upload_id": upload_id, "offset": 0, "size": size})
+        response.headers["Location"] = url_for("chat_upload_status", group_id=group_id, upload_id=upload_id)
+        return response, 201
+
+    def find_upload(group_id, upload_id):
+        info = chat_uploads().info(upload_id) if upload_id.isalnum() else None
+        if info is None or info["metadata"].get("group_id") != group_id:
+            return None
+        return info
+
+    def upload_headers(response, offset, size):
+        response.headers["Upload-Offset"] = str(offset)
+        response.headers["Upload-Length"] = str(size)
+        response.headers["Cache-Control"] = "no-store"
+        return response
 
-        return jsonify(new_message.to_dict()), 201
- 
+    @app.route('/groups/<int:group_id>/chat/uploads/<upload_id>', methods=['GET'])
+    def chat_upload_status(group_id, upload_id):
+        info = find_upload(group_id, upload_id)
+        if info is None:
+            return jsonify({"message": "Upload not found"}), 404
+        return upload_headers(jsonify({"offset": info["offset"], "size": info["size"]}), info["offset"], info["size"])
+
+    @app.route('/groups/<int:group_id>/chat/uploads/<upload_id>', methods=['PATCH'])
+    def append_chat_upload(group_id, upload_id):
+        info = find_upload(group_id, upload_id)
+        if info is None:
+            return jsonify({"message": "Upload not found"}), 404
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            return jsonify({"message": "Upload-Offset header is required"}), 400
 
-    @app.route('/uploads/<filename>')
+        try:
+            offset, stored = chat_uploads().append(upload_id, offset, request.stream)
+        except UploadError as e:
+            response = jsonify({"message": str(e)})
+            return upload_headers(response, getattr(e, "offset", info["offset"]), info["size"]), e.status_code
+
+        if stored is None:
+            return upload_headers(jsonify({"offset": offset, "size": info["size"]}), offset, info["size"])
+
+        metadata = info["metadata"]
+        new_message = create_file_message(group_id, metadata["user_id"], metadata["content"], stored)
+        return upload_headers(jsonify(new_message.to_dict()), offset, info["size"]), 201
+
+    @app.route('/groups/<int:group_id>/chat/uploads/<upload_id>', methods=['DELETE'])
+    def cancel_chat_upload(group_id, upload_id):
+        if find_upload(group_id, upload_id) is None:
+            return jsonify({"message": "Upload not found"}), 404
+        chat_uploads().discard(upload_id)
+        return jsonify({"message": "Upload cancelled"})
+
+    @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        return send_from_directory(UPLOAD_FOLDER, filename)
+        # Normalized first, as send_from_directory does, so "./tmp/..." or "x/../tmp/..." can't reach unfinished uploads
+        if posixpath.normpath(filename).split("/", 1)[0] in ("tmp", ".."):
+            return jsonify({"message": "File not found"}), 404
+
+        # Range and If-None-Match are answered by send_file (conditional=True)
+        etag = content_etag(filename)
+        if etag is None:
+            return send_from_directory(chat_uploads().root, filename)  # legacy name: may be overwritten
+        response = send_from_directory(chat_uploads().root, filename, etag=etag)
+        # A content-addressed path never changes: clients never need to ask again
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
 
 
     @app.route('/google-login', methods=['POST'])
@@ -1398,93 +1501,48 @@ def routes(app):
 
     @analytics_bp.route('/api/data/completion_rate_chart')
     def completion_rate_chart():
+        """
+        Completed personal vs group tasks as ?format=png (default) or svg, or json with
+        the chart's data for drawing it on the client. The ETag changes with the counts.
+        """
         user_id = request.args.get('user_id', type=int, default=1)  # Or use from JWT session in production
+        fmt = request.args.get('format', 'png')
+        if fmt != 'json' and fmt not in CHART_MIMETYPES:
+            return jsonify({"error": "format must be png, svg or json"}), 400
 
-        personal_completed = db.session.query(PersonalTask).filter_by(user_id=user_id, status='Done').count()
-        group_completed = db.session.query(task_user_association).join(GroupTask).filter(
-            task_user_association.c.user_id == user_id,
-            GroupTask.status == 'Done'
-        ).count()
-
-        total_tasks = personal_completed + group_completed
-
-        fig, ax = plt.subplots()
-        if total_tasks == 0:
-            ax.text(0.5, 0.5, 'No completed tasks yet', ha='center', va='center', fontsize=12)
-            ax.axis('off')
-            plt.title("Task Completion Breakdown (No Data)")
-        else:
-            labels = ['Personal Tasks', 'Group Tasks']
-            values = [personal_completed, group_completed]
-            ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
-            ax.axis('equal')
-            plt.title(f'Task Completion Breakdown (Total: {total_tasks})')
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        plt.close(fig)
-        return send_file(buf, mimetype='image/png')
+        try:
+            personal_completed = summarize(rollup_rows(user_id))["personal_completed"]
+            group_completed = group_completed_count(user_id)
+
+            etag = chart_etag("completion", fmt, personal_completed, group_completed)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            elif fmt == 'json':
+                response = jsonify(completion_chart_data(personal_completed, group_completed))
+            else:
+                image = app.config["CHART_RENDERER"].render(
+                    render_completion_chart, personal_completed, group_completed, fmt)
+                response = Response(image, mimetype=CHART_MIMETYPES[fmt])
+        except Exception as e:
+            return jsonify({"error": f"Failed to render chart: {str(e)}"}), 500
 
-    from sqlalchemy import extract, func
-    from flask import jsonify
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"  # revalidate: the counts can change any time
+        return response
 
+    # The three views below read the user's PersonalTaskRollups rows (see analytics.py)
     @analytics_bp.route('/api/data/monthly_stats/<int:user_id>')
     def monthly_stats(user_id):
         try:
-            year_expr = extract('year', PersonalTask.actual_time)
-            month_expr = extract('month', PersonalTask.actual_time)
-
-            results = db.session.query(
-                year_expr.label('year'),
-                month_expr.label('month'),
-                func.count(PersonalTask.id)
-            ).filter(
-                PersonalTask.user_id == user_id,
-                PersonalTask.status == 'Done',
-                PersonalTask.actual_time.isnot(None)
-            ).group_by(
-                year_expr, month_expr
-            ).order_by(
-                year_expr, month_expr
-            ).all()
-
-            stats = [
-                {
-                    "month": f"{int(year)}-{int(month):02}",
-                    "completed_tasks": count
-                }
-                for year, month, count in results
-            ]
-            return jsonify(stats), 200
+            return jsonify(summarize(rollup_rows(user_id))["monthly_stats"]), 200
 
         except Exception as e:
             return jsonify({"error": f"Failed to generate monthly stats: {str(e)}"}), 500
 
-    from sqlalchemy.sql import text
-
     @analytics_bp.route('/api/data/time_taken_stats/<int:user_id>')
     def time_taken_stats(user_id):
         try:
-            results = db.session.execute(text("""
-                SELECT category,
-                    AVG(DATEDIFF(SECOND, start_time, actual_time)) AS avg_seconds
-                FROM PersonalTasks
-                WHERE user_id = :user_id
-                AND status = 'Done'
-                AND start_time IS NOT NULL
-                AND actual_time IS NOT NULL
-                GROUP BY category
-            """), {'user_id': user_id}).fetchall()
-
-            stats = [
-                {
-                    "category": row.category,
-                    "avg_minutes": round(row.avg_seconds / 60, 2) if row.avg_seconds else 0
-                }
-                for row in results
-            ]
-            return jsonify(stats), 200
+            return jsonify(summarize(rollup_rows(user_id))["time_taken_stats"]), 200
 
         except Exception as e:
             return jsonify({"error": f"Failed to generate time taken stats: {str(e)}"}), 500
@@ -1493,29 +1551,21 @@ def routes(app):
     @analytics_bp.route('/api/data/on_time_stats/<int:user_id>')
     def on_time_stats(user_id):
         try:
-            on_time = db.session.query(PersonalTask).filter(
-                PersonalTask.user_id == user_id,
-                PersonalTask.status == 'Done',
-                PersonalTask.actual_time.isnot(None),
-                PersonalTask.deadline.isnot(None),
-                PersonalTask.actual_time <= PersonalTask.deadline
-            ).count()
-
-            late = db.session.query(PersonalTask).filter(
-                PersonalTask.user_id == user_id,
-                PersonalTask.status == 'Done',
-                PersonalTask.actual_time.isnot(None),
-                PersonalTask.deadline.isnot(None),
-                PersonalTask.actual_time > PersonalTask.deadline
-            ).count()
-
-            return jsonify({
-                "on_time": on_time,
-                "late": late
-            }), 200
+            return jsonify(summarize(rollup_rows(user_id))["on_time_stats"]), 200
 
         except Exception as e:
             return jsonify({"error": f"Failed to calculate on-time stats: {str(e)}"}), 500
+
+    @analytics_bp.route('/api/data/dashboard/<int:user_id>')
+    def analytics_dashboard(user_id):
+        """
+        monthly_stats, time_taken_stats and on_time_stats as their own endpoints return
+        them, plus completion counts ({"personal", "group", "total"}), in two queries.
+        """
+        try:
+            return jsonify(dashboard(user_id)), 200
+        except Exception as e:
+            return jsonify({"error": f"Failed to build dashboard: {str(e)}"}), 500
         
     from flask import jsonify, request
     from sqlalchemy import func
@@ -1547,6 +1597,19 @@ def routes(app):
         })
 
 
+    # ✅ Unread counts for all of a user's groups in one query
+    @app.route("/chat/unread/<int:user_id>")
+    def unread_summary(user_id):
+        """
+        {"groups": [{"group_id", "unread"}, ...], "total_unread"} for every group the
+        user created or belongs to, counting messages from others after last_read_message_id.
+        """
+        counts = unread_counts(user_id)
+        return jsonify({
+            "groups": [{"group_id": group_id, "unread": unread} for group_id, unread in counts.items()],
+            "total_unread": sum(counts.values())
+        })
+
     # ✅ Mark latest message as read
     @app.route("/groups/<int:group_id>/chat/mark_read/<int:user_id>", methods=["POST"])
     def mark_chat_read(group_id, user_id):
@@ -1558,20 +1621,25 @@ def routes(app):
             .first()
         )
 
+        last_message_id = latest_message_id(group_id)
         if read_entry:
             read_entry.last_read_time = now
+            read_entry.last_read_message_id = last_message_id
         else:
             read_entry = GroupMessageRead(
                 user_id=user_id,
                 group_id=group_id,
+                last_read_message_id=last_message_id,
                 last_read_time=now
             )
             db.session.add(read_entry)
 
         db.session.commit()
+        app.config["CHAT_BROKER"].publish(group_channel(group_id), "read", {"group_id": group_id, "user_id": user_id})
 
         return jsonify({
             "message": "Marked as read",
+            "last_read_message_id": last_message_id,
             "timestamp": now.strftime("%Y-%m-%d %H:%M:%S")
         })
 
@@ -1594,103 +1662,195 @@ def routes(app):
         return df, "⚠️ No category-specific data, using all available history"
 
 
+    def parse_prediction_input(data):
+        """
+        Validate and convert one task descriptor.
+        Returns (parsed, None) on success or (None, error_message) on bad input.
+        """
+        category = data.get("category")
+        priority = data.get("priority")
+        estimated_time = data.get("estimated_time")
+        start_time = data.get("start_time")
+        deadline = data.get("deadline")
+        user_id = data.get("user_id")
+
+        if not all([category, priority, estimated_time, start_time, user_id]):
+            return None, "Missing required fields: category, priority, estimated_time, start_time, user_id"
+
+        try:
+            priority = int(priority)
+            estimated_time = float(estimated_time)
+            user_id = int(user_id)
+            start_dt = parse_datetime(start_time)
+            deadline_dt = parse_datetime(deadline) if deadline else None
+        except Exception as e:
+            return None, f"Invalid datetime format: {str(e)}"
+
+        return {
+            "category": category,
+            "priority": priority,
+            "estimated_time": estimated_time,
+            "start_dt": start_dt,
+            "deadline_dt": deadline_dt,
+            "user_id": user_id,
+        }, None
+
+    def users_with_completed_tasks(user_ids):
+        """Return the subset of user_ids that have at least one completed task (one query)."""
+        if not user_ids:
+            return set()
+        rows = db.session.query(PersonalTask.user_id).filter(
+            PersonalTask.user_id.in_(set(user_ids)),
+            PersonalTask.status == 'Done'
+        ).distinct().all()
+        return {row[0] for row in rows}
+
+    def encode_prediction_inputs(parsed_rows, category_encoder, user_encoder):
+        """Encode a list of parsed descriptors into one (n, 5) feature matrix."""
+        from AI.batch_predictor import build_feature_matrix, encode_categories, encode_users
+
+        user_ids = [row["user_id"] for row in parsed_rows]
+        user_encoded, used_fallback = encode_users(user_ids, user_encoder, users_with_completed_tasks(user_ids))
+        features = build_feature_matrix(
+            encode_categories([row["category"] for row in parsed_rows], category_encoder),
+            [row["priority"] for row in parsed_rows],
+            [row["estimated_time"] for row in parsed_rows],
+            [row["start_dt"].hour for row in parsed_rows],
+            user_encoded,
+        )
+        return features, used_fallback
+
+    def finalize_prediction(parsed, predicted_time, used_fallback):
+        """Apply the sanity checks and clamping rules to a raw model prediction."""
+        start_dt = parsed["start_dt"]
+        deadline_dt = parsed["deadline_dt"]
+        available_time = (deadline_dt - start_dt).total_seconds() / 60 if deadline_dt else None
+
+        # Sanity check
+        if math.isnan(predicted_time) or math.isinf(predicted_time) or predicted_time <= 1:
+            predicted_time = 120
+
+        available_minutes = available_time if deadline_dt else 480
+        predicted_time = max(10, min(float(predicted_time), available_minutes, 480))  # Clamp
+
+        adjusted_due_to_urgency = False
+        if parsed["priority"] == 1 and available_time and predicted_time > available_time:
+            predicted_time = available_time
+            adjusted_due_to_urgency = True
+
+        return {
+            "predicted_time_minutes": round(predicted_time, 2),
+            "predicted_time_hours": round(predicted_time / 60, 2),
+            "adjusted_due_to_urgency": adjusted_due_to_urgency,
+            "used_fallback": bool(used_fallback)
+        }
+
+    def ai_component(name):
+        """Fetch a prediction component, loading the AI stack on first use."""
+        return app.config["AI_MODELS"].get(name)
+
+    def get_prediction_batcher():
+        batcher = app.config.get("PREDICTION_BATCHER")
+        if batcher is None:
+            from AI.batch_predictor import PredictionBatcher, predict_minutes
+            model = ai_component("MODEL")
+            feature_scaler = ai_component("FEATURE_SCALER")
+            time_scaler = ai_component("TIME_SCALER")
+            batcher = PredictionBatcher(
+                lambda features: predict_minutes(model, feature_scaler, time_scaler, features),
+                max_batch_size=app.config.get("PREDICTION_MAX_BATCH", 64),
+                max_wait_ms=app.config.get("PREDICTION_MAX_WAIT_MS", 5)
+            )
+            app.config["PREDICTION_BATCHER"] = batcher
+        return batcher
+
+    def prediction_components_loaded():
+        return all(ai_component(key) is not None for key in
+                   ["MODEL", "CATEGORY_ENCODER", "FEATURE_SCALER", "TIME_SCALER", "USER_ENCODER"])
+
+
     @app.route("/predict", methods=["POST"])
     def predict_task_time():
         try:
             data = request.get_json()
             print(f"🔍 Incoming data: {data}")
 
-            model = app.config.get("MODEL")
-            category_encoder = app.config.get("CATEGORY_ENCODER")
-            feature_scaler = app.config.get("FEATURE_SCALER")
-            time_scaler = app.config.get("TIME_SCALER")
-            user_encoder = app.config.get("USER_ENCODER")
-
-            if not all([model, category_encoder, feature_scaler, time_scaler, user_encoder]):
+            if not prediction_components_loaded():
                 return jsonify({"error": "Model or encoders are not loaded properly."}), 500
 
-            # Extract inputs
-            category = data.get("category")
-            priority = data.get("priority")
-            estimated_time = data.get("estimated_time")
-            start_time = data.get("start_time")
-            deadline = data.get("deadline")
-            user_id = data.get("user_id")
+            parsed, error = parse_prediction_input(data)
+            if error:
+                return jsonify({"error": error}), 400
 
-            if not all([category, priority, estimated_time, start_time, user_id]):
-                return jsonify({"error": "Missing required fields: category, priority, estimated_time, start_time, user_id"}), 400
+            features, used_fallback = encode_prediction_inputs(
+                [parsed], ai_component("CATEGORY_ENCODER"), ai_component("USER_ENCODER")
+            )
 
-            try:
-                priority = int(priority)
-                estimated_time = float(estimated_time)
-                start_dt = parse_datetime(start_time)
-                start_time_hour = start_dt.hour
-                deadline_dt = parse_datetime(deadline) if deadline else None
-            except Exception as e:
-                return jsonify({"error": f"Invalid datetime format: {str(e)}"}), 400
-
-            available_time = None
-            if deadline_dt:
-                available_time = (deadline_dt - start_dt).total_seconds() / 60
-                print(f"🕒 Available Time Before Deadline: {available_time:.2f} minutes")
-
-            # Handle unknown category
-            if category not in category_encoder.classes_:
-                print(f"⚠️ Unknown category: {category}. Defaulting to 'General'")
-                category = "General"
-
-            category_encoded = int(category_encoder.transform([category])[0])
-
-            # Handle unknown user
-            completed_tasks_count = PersonalTask.query.filter_by(user_id=user_id, status='Done').count()
-            if completed_tasks_count == 0 or user_id not in user_encoder.classes_:
-                print(f"⚠️ Using fallback user (-1) for user {user_id}")
-                user_encoded = user_encoder.transform([-1])[0]
-                used_fallback = True
+            model = ai_component("MODEL")
+            if hasattr(model, "predict_minutes"):
+                # Microsecond forward pass: micro-batching would only add queueing delay
+                predicted_time = float(model.predict_minutes(features)[0])
             else:
-                user_encoded = user_encoder.transform([user_id])[0]
-                used_fallback = False
-
-            # Prepare input
-            input_data = pd.DataFrame([[
-                category_encoded,
-                priority,
-                estimated_time,
-                start_time_hour,
-                user_encoded
-            ]], columns=["category_encoded", "priority", "estimated_time", "start_time_hour", "user_encoded"])
-
-            scaled_input = feature_scaler.transform(input_data)
-            predicted_scaled = model.predict(scaled_input)[0][0]
-            print(f"🔎 Model raw output (scaled): {predicted_scaled}")
-
-            predicted_time = time_scaler.inverse_transform([[predicted_scaled]])[0][0]
-
-            # Sanity check
-            if np.isnan(predicted_time) or np.isinf(predicted_time) or predicted_time <= 1:
-                print("❌ Invalid prediction, defaulting to 120 minutes")
-                predicted_time = 120
-
-            available_minutes = (deadline_dt - start_dt).total_seconds() / 60 if deadline_dt else 480
-            predicted_time = max(10, min(float(predicted_time), available_minutes, 480))  # Clamp
-            print(f"✅ Final Predicted Time (Minutes): {predicted_time}")
-
-            adjusted_due_to_urgency = False
-            if priority == 1 and available_time and predicted_time > available_time:
-                predicted_time = available_time
-                adjusted_due_to_urgency = True
+                # ✅ Concurrent /predict calls are merged into one Keras forward pass by the batcher
+                predicted_time = get_prediction_batcher().predict(features[0])
+            print(f"🔎 Model output (minutes): {predicted_time}")
 
-            return jsonify({
-                "predicted_time_minutes": round(predicted_time, 2),
-                "predicted_time_hours": round(predicted_time / 60, 2),
-                "adjusted_due_to_urgency": adjusted_due_to_urgency,
-                "used_fallback": used_fallback
-            })
+            result = finalize_prediction(parsed, predicted_time, used_fallback[0])
+            print(f"✅ Final Predicted Time (Minutes): {result['predicted_time_minutes']}")
+            return jsonify(result)
 
         except Exception as e:
             print(f"❌ Prediction error: {e}")
             return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
+    @app.route("/predict/batch", methods=["POST"])
+    def predict_task_time_batch():
+        """
+        Predict durations for many tasks in one request.
+        Body: {"tasks": [{category, priority, estimated_time, start_time, deadline?, user_id}, ...]}
+        Invalid entries get an "error" item instead of failing the whole batch.
+        """
+        try:
+            data = request.get_json() or {}
+            task_list = data.get("tasks")
+
+            if not isinstance(task_list, list) or not task_list:
+                return jsonify({"error": "tasks must be a non-empty list"}), 400
+
+            if not prediction_components_loaded():
+                return jsonify({"error": "Model or encoders are not loaded properly."}), 500
+
+            results = [None] * len(task_list)
+            valid_indexes = []
+            parsed_rows = []
+            for index, task_data in enumerate(task_list):
+                parsed, error = parse_prediction_input(task_data if isinstance(task_data, dict) else {})
+                if error:
+                    results[index] = {"error": error}
+                else:
+                    valid_indexes.append(index)
+                    parsed_rows.append(parsed)
+
+            if parsed_rows:
+                from AI.batch_predictor import predict_minutes
+                features, used_fallback = encode_prediction_inputs(
+                    parsed_rows, ai_component("CATEGORY_ENCODER"), ai_component("USER_ENCODER")
+                )
+                predicted = predict_minutes(
+                    ai_component("MODEL"), ai_component("FEATURE_SCALER"), ai_component("TIME_SCALER"), features
+                )
+                for position, index in enumerate(valid_indexes):
+                    results[index] = finalize_prediction(
+                        parsed_rows[position], predicted[position], used_fallback[position]
+                    )
+
+            print(f"✅ Batch prediction for {len(parsed_rows)}/{len(task_list)} tasks")
+            return jsonify({"predictions": results})
+
+        except Exception as e:
+            print(f"❌ Batch prediction error: {e}")
+            return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
     @app.route("/ai/generate-schedule", methods=["POST"])
     def generate_schedule():
         try:
@@ -1704,10 +1864,28 @@ def routes(app):
             if not user_id or not raw_task_hours:
                 return jsonify({"error": "User ID and task hours are required"}), 400
 
-            # ✅ Convert and validate task hours
+            # ✅ Slot length in minutes (sub-hour scheduling); whole hours by default
+            try:
+                slot_minutes = int(data.get("slot_minutes", 60))
+            except (TypeError, ValueError):
+                return jsonify({"error": "slot_minutes must be an integer"}), 400
+            if not 5 <= slot_minutes <= MINUTES_PER_DAY:
+                return jsonify({"error": "slot_minutes must be between 5 and 1440"}), 400
+
+            # ✅ Solver: "greedy" (priority order, earliest slots) or "edf" (deadline-aware)
+            solver = data.get("solver", "greedy")
+            if solver not in SOLVERS:
+                return jsonify({"error": f"solver must be one of {', '.join(SOLVERS)}"}), 400
+            schedule_start = datetime.utcnow()  # naive UTC, like the stored deadlines and "start"
+            if data.get("start"):
+                schedule_start = parse_datetime_value(data["start"])
+                if not schedule_start:
+                    return jsonify({"error": "Invalid start format"}), 400
+
+            # ✅ Convert and validate task hours (rounded to whole slots)
             try:
-                task_hours = {
-                    int(task_id): int(round(float(hours)))
+                task_minutes = {
+                    int(task_id): int(round(float(hours) * 60 / slot_minutes)) * slot_minutes
                     for task_id, hours in raw_task_hours.items()
                     if hours and str(hours).replace('.', '', 1).isdigit()
                 }
@@ -1715,7 +1893,7 @@ def routes(app):
                 print(f"❌ Error processing task hours: {e}")
                 return jsonify({"error": "Invalid task hours data"}), 500
 
-            if not task_hours:
+            if not task_minutes:
                 print("⚠️ No valid task hours provided.")
                 return jsonify({"message": "No valid task hours found."}), 400
 
@@ -1730,108 +1908,58 @@ def routes(app):
                 PersonalTask.status == "In Progress"
             ).order_by(PersonalTask.priority.asc(), PersonalTask.due_date.asc()).all()
 
-            group_tasks = db.session.query(GroupTask).join(task_user_association).filter(
+            group_task_rows = db.session.query(GroupTask, Group.name).join(task_user_association).outerjoin(
+                Group, Group.id == GroupTask.group_id
+            ).filter(
                 task_user_association.c.user_id == user_id,
                 GroupTask.status == "In Progress"
             ).order_by(GroupTask.priority.asc(), GroupTask.deadline.asc()).all()
-
-
+            group_tasks = [task for task, _ in group_task_rows]
+            group_names = prime_group_names((task.group_id, name) for task, name in group_task_rows)
 
             if not tasks and not group_tasks:
                 return jsonify({"message": "No in-progress tasks found."}), 404
 
-            # ✅ Parse available time slots
-            def parse_time_slots(time_ranges):
-                    slots = []
-                    if not time_ranges:
-                        return slots
-                    for time_range in time_ranges.split(","):
-                        try:
-                            start_str, end_str = time_range.strip().split("-")
-                            start = datetime.strptime(start_str.strip(), "%H:%M")
-                            end = datetime.strptime(end_str.strip(), "%H:%M")
-
-                            if (end - start).total_seconds() < 3600:
-                                continue
-
-                            current = start
-                            while current + timedelta(hours=1) <= end:
-                                slots.append(current)
-                                current += timedelta(hours=1)
-
-                        except ValueError as ve:
-                            print(f"⚠️ Invalid time format: {time_range} -> {ve}")
-                    return sorted(slots)
-
-
-            week_days = {
-                "Sunday": parse_time_slots(user_schedule.sunday),
-                "Monday": parse_time_slots(user_schedule.monday),
-                "Tuesday": parse_time_slots(user_schedule.tuesday),
-                "Wednesday": parse_time_slots(user_schedule.wednesday),
-                "Thursday": parse_time_slots(user_schedule.thursday),
-                "Friday": parse_time_slots(user_schedule.friday),
-                "Saturday": parse_time_slots(user_schedule.saturday),
-            }
-
-            print(f"📅 Available Free Slots Per Day: {week_days}")
+            # ✅ Free time as merged intervals; each chunk is cut from the earliest one that fits
+            timeline = FreeTimeline(availability_by_user([user_schedule.user_id])[user_schedule.user_id])
+            print(f"📅 Free time per day: {timeline.intervals()}")
 
             schedule = []
             unassigned_tasks = []
+            daily_map = {day: [] for day in FREE_TIME_DAYS}
+            slot_hours = slot_minutes // 60 if slot_minutes % 60 == 0 else round(slot_minutes / 60, 2)
 
-            # Prepare schedule maps
-            week_days = {
-                "Sunday": parse_time_slots(user_schedule.sunday),
-                "Monday": parse_time_slots(user_schedule.monday),
-                "Tuesday": parse_time_slots(user_schedule.tuesday),
-                "Wednesday": parse_time_slots(user_schedule.wednesday),
-                "Thursday": parse_time_slots(user_schedule.thursday),
-                "Friday": parse_time_slots(user_schedule.friday),
-                "Saturday": parse_time_slots(user_schedule.saturday),
-            }
-
-            daily_map = {day: [] for day in week_days}
-            available_slots = {day: slots.copy() for day, slots in week_days.items()}
+            all_tasks = tasks + group_tasks
+            if solver == "edf":
+                return jsonify(edf_schedule(all_tasks, task_minutes, timeline, slot_minutes, slot_hours,
+                                            group_names, schedule_start))
 
             # Schedule each task across multiple available slots
-            all_tasks = tasks + group_tasks
             for task in all_tasks:
-                remaining_hours = task_hours.get(task.id, 0)
-                scheduled_chunks = 0
-
-                for day in week_days:
-                    slots = available_slots[day]
-                    while remaining_hours > 0 and slots:
-                        # Pop the earliest slot
-                        slot = slots.pop(0)
-                        start_time = slot.strftime("%H:%M")
-
-                        # Save to daily schedule
-                        is_group_task = hasattr(task, "group_id")
-                        group_name = None
-
-                        if is_group_task:
-                            group = db.session.query(Group).filter_by(id=task.group_id).first()
-                            group_name = group.name if group else "Unknown Group"
-
-                        daily_map[day].append({
-                            "task": task.title,
-                            "group_name": getattr(task.group, "name", None) if hasattr(task, "group") else None,
-                            "priority": task.priority,
-                            "time": 1,
-                            "start_time": start_time,
-                            "group": group_name if is_group_task else None
-                        })
-
+                remaining_minutes = task_minutes.get(task.id, 0)
 
+                # Group name resolved once per task from the joined query, not per slot
+                is_group_task = isinstance(task, GroupTask)
+                group_name = group_names.get(task.group_id) if is_group_task else None
 
-                        remaining_hours -= 1
-                        scheduled_chunks += 1
-
-                    if remaining_hours == 0:
+                while remaining_minutes > 0:
+                    chunk = timeline.allocate(slot_minutes)
+                    if chunk is None:
                         break
+                    day, start, _ = chunk
+
+                    # Save to daily schedule
+                    daily_map[day].append({
+                        "task": task.title,
+                        "group_name": group_name,
+                        "priority": task.priority,
+                        "time": slot_hours,
+                        "start_time": format_clock(start),
+                        "group": (group_name or "Unknown Group") if is_group_task else None
+                    })
+                    remaining_minutes -= slot_minutes
 
-                if remaining_hours > 0:
+                if remaining_minutes > 0:
                     unassigned_tasks.append(task.title)
 
             # Convert daily_map to final response format
@@ -1858,6 +1986,50 @@ def routes(app):
             return jsonify({"error": str(e)}), 500
 
 
+    def edf_schedule(all_tasks, task_minutes, timeline, slot_minutes, slot_hours, group_names, start):
+        """generate_schedule with solver="edf": dated days from `start`, deadlines respected, slack per task."""
+        chunks = dated_chunks(timeline.intervals(), slot_minutes, start)
+        solver_tasks = [
+            SolverTask(index, task_minutes.get(task.id, 0) // slot_minutes, task.deadline, task.priority or 4)
+            for index, task in enumerate(all_tasks)
+        ]
+        assignment, _ = solve_edf(solver_tasks, chunks)
+
+        days = {}
+        unassigned_tasks = []
+        report = []
+        for solver_task, task in zip(solver_tasks, all_tasks):
+            is_group_task = isinstance(task, GroupTask)
+            group_name = group_names.get(task.group_id) if is_group_task else None
+            assigned = assignment[solver_task.key]
+            for chunk in assigned:
+                days.setdefault(chunk.starts_at.date(), (chunk.day, []))[1].append({
+                    "task": task.title,
+                    "group_name": group_name,
+                    "priority": task.priority,
+                    "time": slot_hours,
+                    "start_time": format_clock(chunk.start_minute),
+                    "group": (group_name or "Unknown Group") if is_group_task else None
+                })
+            if len(assigned) < solver_task.chunks:
+                unassigned_tasks.append(task.title)
+            report.append({
+                "task": task.title,
+                "task_id": task.id,
+                "type": "group" if is_group_task else "personal",
+                **task_report(solver_task, assigned, slot_minutes)
+            })
+
+        schedule = []
+        for date in sorted(days):
+            day, task_list = days[date]
+            # Chunks were handed out task by task; show each day in clock order
+            task_list.sort(key=lambda entry: entry["start_time"])
+            schedule.append({"day": day, "date": date.isoformat(), "tasks": task_list})
+
+        print(f"✅ Final Schedule (edf): {schedule}")
+        return {"schedule": schedule, "unassigned_tasks": unassigned_tasks, "solver": "edf", "tasks": report}
+
     @app.route('/chat', methods=['POST'])
     def chat_with_ai():
         # Step 1: Parse incoming data
@@ -1869,31 +2041,44 @@ def routes(app):
         schedule_entry = UserSchedule.query.filter_by(user_id=user_id).first()
         schedule_json = schedule_entry.schedule_json if schedule_entry else None
 
-        # Step 3: Fetch personal tasks
-        personal_tasks = [
-            task.to_dict() for task in PersonalTask.query.filter_by(user_id=user_id).all()
-        ]
-
-        # Step 4: Fetch group tasks assigned to the user
-        group_tasks = [
-            task.to_dict()
-            for task in GroupTask.query.options(joinedload(GroupTask.assigned_users)).all()
-            if any(user.userId == int(user_id) for user in task.assigned_users)
-        ]
+        # Step 3: Fetch the user's open personal/group tasks and the urgent bucket (filtered in SQL)
+        context = load_task_context(user_id)
 
-        # Step 5: Filter urgent tasks (due within 2 days)
-        urgent_tasks = [
-            t for t in personal_tasks + group_tasks
-            if t.get('deadline')
-            and datetime.strptime(t['deadline'], "%Y-%m-%d %H:%M:%S") <= datetime.utcnow() + timedelta(days=2)
-        ]
+        # Step 4 (streaming): forward tokens as server-sent events while the model generates
+        if wants_event_stream(data):
+            return stream_chat_reply(message, schedule_json, context)
 
-        # Step 6: Call the AI advice function with proper arguments
-        reply = generate_ai_advice(message, schedule_json, personal_tasks, group_tasks, urgent_tasks)
+        # Step 4: Call the AI advice function with proper arguments
+        reply = generate_ai_advice(message, schedule_json, **context)
         print("AI response:", reply)
 
         return jsonify({"reply": reply})
 
+    def wants_event_stream(data):
+        """Streaming is opt-in: {"stream": true}, ?stream=1 or Accept: text/event-stream."""
+        if data.get("stream") is True or request.args.get("stream") in ("1", "true"):
+            return True
+        return request.accept_mimetypes.best == "text/event-stream"
+
+    def stream_chat_reply(message, schedule_json, context):
+        """
+        SSE response: one `data: {"token": ...}` event per chunk, then
+        `event: done` with the full reply (same text the JSON mode returns).
+        """
+        def events():
+            parts = []
+            for token in stream_ai_advice(message, schedule_json, **context):
+                parts.append(token)
+                yield sse_event({"token": token})
+            reply = "".join(parts).strip()
+            print("AI response (streamed):", reply)
+            yield sse_event({"reply": reply}, event="done")
+
+        response = Response(stream_with_context(events()), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"  # don't let a reverse proxy buffer the stream
+        return response
+
 
 
 
@@ -1918,94 +2103,14 @@ def routes(app):
         if not valid_members:
             return jsonify({"error": "No valid members"}), 400
 
-        # Step 2: Calculate free time per user
-        user_free_time = {}
-        for member in valid_members:
-            schedule_entry = UserSchedule.query.filter_by(user_id=member["id"]).first()
-            if schedule_entry:
-                try:
-                    schedule = json.loads(schedule_entry.schedule_json)
-                    total_minutes = sum(len(slots) * 60 for slots in schedule.values() if isinstance(slots, list))
-                except Exception:
-                    total_minutes = 0
-            else:
-                total_minutes = 0
-            user_free_time[member["id"]] = total_minutes
-
-        total_free_time = sum(user_free_time.values()) or 1
-
-        # Step 3: Build weighted queue based on free time
-        weighted_user_queue = []
-        for user_id, minutes in user_free_time.items():
-            weight = round((minutes / total_free_time) * 100)
-            weighted_user_queue.extend([user_id] * max(1, weight))
-        random.shuffle(weighted_user_queue)
-
-        user_task_counts = defaultdict(int)
-        distributed_tasks = []
-
-        # Step 4: Sort tasks — urgent first, then by priority, then deadline
-        def task_sort_key(task_data):
-            deadline = task_data.get("deadline")
-            parsed_deadline = None
-            try:
-                parsed_deadline = datetime.strptime(deadline, "%Y-%m-%d %H:%M:%S") if deadline else None
-            except:
-                parsed_deadline = None
-
-            is_urgent = (
-                task_data.get("priority") == 1 and
-                parsed_deadline and parsed_deadline <= datetime.utcnow() + timedelta(days=2)
-            )
-
-            return (not is_urgent, task_data.get("priority", 4), parsed_deadline or datetime.max)
-
-        tasks = sorted(tasks, key=task_sort_key)
-
-        # Step 5: Assign tasks
-        for task_data in tasks:
-            task = db.session.get(GroupTask, task_data["id"])
-            if not task or task.status.lower() == "done":
-                continue
-
-            deadline = task.deadline
-            is_urgent = (
-                task.priority == 1 and
-                deadline and deadline <= datetime.utcnow() + timedelta(days=2)
-            )
-
-            # Flexible number of assignees
-            if is_urgent:
-                num_assignees = min(3, len(current_member_ids))
-            elif task.priority == 1:
-                num_assignees = min(2, len(current_member_ids))
-            else:
-                num_assignees = 1
-
-            assigned_users = []
-
-            sorted_queue = sorted(
-                list(set(weighted_user_queue)),
-                key=lambda uid: (user_task_counts[uid], -user_free_time[uid])
-            )
-
-            for user_id in sorted_queue:
-                user = db.session.get(User, user_id)
-                if user and user not in task.assigned_users:
-                    task.assigned_users.append(user)
-                    assigned_users.append(user.userId)
-                    user_task_counts[user_id] += 1
-                if len(assigned_users) >= num_assignees:
-                    break
+        # Step 2: Assign by load and free time (one query for schedules, one commit)
+        distributed_tasks = distribute_group_tasks(tasks, [m["id"] for m in valid_members])
+        return jsonify(distributed_tasks), 200
 
-            db.session.commit()
-            task_dict = task.to_dict()
-            task_dict["new_assigned_users"] = assigned_users
-            distributed_tasks.append(task_dict)
 
-        return jsonify(distributed_tasks), 200
 
 
+    app.register_blueprint(analytics_bp)
 
 
 # ==================================================== Main ========================================================== #
@@ -0,0 +1,95 @@
+"""
+Weekly availability stored as rows (user, weekday, start_minute, end_minute).
+
+UserFreeSchedule used to hold each weekday as a comma-joined String(255). Parsing that
+string was repeated on every read, and long schedules were truncated. Ranges now live
+in UserAvailability, indexed on (user, weekday, start), so availability for any set
+of users comes back from one range scan. UserFreeSchedule keeps a precomputed
+weekly_free_minutes that is maintained on every write.
+"""
+from collections import defaultdict
+
+from sqlalchemy import func, inspect, text
+
+from extensions import db
+from free_time import merge_intervals, parse_time_ranges
+from models import UserAvailability, UserFreeSchedule, WEEKDAY_NAMES
+from serializers import chunked
+
+
+def save_availability(user_id, ranges_by_day):
+    """
+    Replace the ranges of the weekdays present in `ranges_by_day`, given as
+    {"monday": [(start_minute, end_minute), ...]}; other weekdays are left alone.
+    Overlapping ranges are merged. Creates the UserFreeSchedule row if needed,
+    refreshes its weekly_free_minutes and returns it. The caller commits.
+    """
+    user_schedule = UserFreeSchedule.query.filter_by(user_id=user_id).first()
+    if not user_schedule:
+        user_schedule = UserFreeSchedule(user_id=user_id)
+        db.session.add(user_schedule)
+
+    weekdays = [WEEKDAY_NAMES.index(day) for day in ranges_by_day]
+    if weekdays:
+        UserAvailability.query.filter(
+            UserAvailability.user_id == user_id,
+            UserAvailability.weekday.in_(weekdays)
+        ).delete(synchronize_session=False)
+
+    db.session.add_all([
+        UserAvailability(user_id=user_id, weekday=WEEKDAY_NAMES.index(day), start_minute=start, end_minute=end)
+        for day, intervals in ranges_by_day.items()
+        for start, end in merge_intervals(intervals)
+    ])
+    db.session.flush()
+
+    user_schedule.weekly_free_minutes = db.session.query(
+        func.coalesce(func.sum(UserAvailability.end_minute - UserAvailability.start_minute), 0)
+    ).filter(UserAvailability.user_id == user_id).scalar()
+    return user_schedule
+
+
+def availability_by_user(user_ids):
+    """
+    {user_id: {"Sunday": [(start, end), ...], ...}} for every user in `user_ids`
+    (day names as free_time.DAYS uses them), one indexed query per 1000 users.
+    """
+    result = defaultdict(lambda: defaultdict(list))
+    for batch in chunked(list(user_ids)):
+        rows = db.session.query(
+            UserAvailability.user_id, UserAvailability.weekday,
+            UserAvailability.start_minute, UserAvailability.end_minute
+        ).filter(UserAvailability.user_id.in_(batch)).order_by(
+            UserAvailability.user_id, UserAvailability.weekday, UserAvailability.start_minute
+        ).all()
+        for user_id, weekday, start, end in rows:
+            result[user_id][WEEKDAY_NAMES[weekday].capitalize()].append((start, end))
+    return result
+
+
+def migrate_free_schedule_strings():
+    """
+    One-off migration from the comma-joined UserFreeSchedule columns: adds the
+    WeeklyFreeMinutes column when missing, creates UserAvailability, and copies the
+    ranges of every schedule that has no rows yet. Safe to run again.
+    Returns the number of schedules migrated.
+    """
+    columns = {column["name"] for column in inspect(db.engine).get_columns("UserFreeSchedule", schema="dbo")}
+    if "WeeklyFreeMinutes" not in columns:
+        print("🛠 Adding dbo.UserFreeSchedule.WeeklyFreeMinutes...")
+        db.session.execute(text("ALTER TABLE dbo.UserFreeSchedule ADD WeeklyFreeMinutes INTEGER NOT NULL DEFAULT 0"))
+        db.session.commit()
+    UserAvailability.__table__.create(db.engine, checkfirst=True)
+
+    migrated_user_ids = {user_id for (user_id,) in db.session.query(UserAvailability.user_id).distinct()}
+    migrated = 0
+    for user_schedule in UserFreeSchedule.query.all():
+        if user_schedule.user_id in migrated_user_ids:
+            continue
+        save_availability(user_schedule.user_id, {
+            day: parse_time_ranges(getattr(user_schedule, day)) for day in WEEKDAY_NAMES
+        })
+        migrated += 1
+    db.session.commit()
+    print(f"✅ Migrated availability for {migrated} schedules")
+    return migrated
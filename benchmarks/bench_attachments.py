@@ -0,0 +1,96 @@
+"""
+Bytes moved per chat open for a chat with photo attachments, over repeated opens:
+the old client (originals, fetched again every time) against thumbnails served with
+strong ETags (revalidated with If-None-Match) and with Cache-Control: immutable
+(not requested again at all).
+
+Run from the repository root:
+    python benchmarks/bench_attachments.py [photos] [opens]
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from chat_uploads import ResumableUploads
+from extensions import db
+from models import User, Group
+from testing_utils import make_test_app
+
+PHOTOS = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+OPENS = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+
+def photo(seed):
+    # Phone-camera sized: 12 MP is typical, 2000x1500 keeps the setup quick
+    image = Image.linear_gradient("L").resize((2000, 1500)).convert("RGB")
+    noise = Image.effect_noise((2000, 1500), 24 + seed % 8).convert("RGB")
+    buffer = io.BytesIO()
+    Image.blend(image, noise, 0.5).save(buffer, "JPEG", quality=88)
+    return buffer.getvalue()
+
+
+def open_chat(client, group_id, use_thumbnails, cache, immutable):
+    """One chat open; returns (requests, body bytes)."""
+    response = client.get(f"/groups/{group_id}/chat")
+    requests_made, received = 1, len(response.data)
+    for message in response.get_json():
+        url = message["thumbnail_url"] if use_thumbnails else message["file_url"]
+        cached = cache.get(url)
+        if cached and immutable:
+            continue
+        headers = {"If-None-Match": cached} if cached else {}
+        response = client.get(url, headers=headers)
+        requests_made += 1
+        received += len(response.data)
+        if use_thumbnails and response.headers.get("ETag"):
+            cache[url] = response.headers["ETag"]
+    return requests_made, received
+
+
+def main():
+    root = tempfile.mkdtemp()
+    app = make_test_app()
+    app.config["CHAT_UPLOADS"] = ResumableUploads(root, max_bytes=50 * 1024 * 1024)
+    client = app.test_client()
+    try:
+        with app.app_context():
+            user = User(username="bench", email="bench@example.com")
+            db.session.add(user)
+            db.session.flush()
+            group = Group(name="photos", created_by=user.userId)
+            db.session.add(group)
+            db.session.commit()
+            user_id, group_id = user.userId, group.id
+
+        start = time.perf_counter()
+        for i in range(PHOTOS):
+            client.post(f"/groups/{group_id}/chat/upload", data={
+                "user_id": str(user_id), "file": (io.BytesIO(photo(i)), f"IMG_{i}.jpg")
+            }, content_type="multipart/form-data")
+        print(f"📤 {PHOTOS} photos uploaded with thumbnails in {time.perf_counter() - start:.1f} s")
+
+        for label, use_thumbnails, immutable in (("originals, no cache", False, False),
+                                                 ("thumbnails + ETag", True, False),
+                                                 ("thumbnails + immutable", True, True)):
+            cache = {}
+            first = open_chat(client, group_id, use_thumbnails, cache, immutable)
+            start = time.perf_counter()
+            repeat = [open_chat(client, group_id, use_thumbnails, cache, immutable) for _ in range(OPENS - 1)]
+            repeat_ms = (time.perf_counter() - start) / max(1, OPENS - 1) * 1000
+            total = first[1] + sum(received for _, received in repeat)
+            print(f"{label:>24}: first open {first[0]} requests / {first[1] / 1024:8.0f} KB, "
+                  f"repeat open {repeat[-1][0]} requests / {repeat[-1][1] / 1024:6.1f} KB in {repeat_ms:5.1f} ms, "
+                  f"{OPENS} opens {total / 1024 / 1024:7.2f} MB")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
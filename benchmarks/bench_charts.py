@@ -0,0 +1,73 @@
+"""
+Completion charts per second with concurrent clients.
+
+  pyplot        the old route body: global pyplot state, serialized by a lock since
+                it is not thread-safe
+  figure        Figure API in the request threads (thread-safe, but GIL-bound)
+  pool          ChartRenderer with worker processes, every chart different
+  cached        ChartRenderer when the counts have not changed
+
+Run from the repository root:
+    python benchmarks/bench_charts.py [clients] [charts]
+"""
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts import ChartRenderer, render_completion_chart
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+CHARTS = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+WORKERS = os.cpu_count() or 2
+
+pyplot_lock = threading.Lock()
+
+
+def old_render(personal, group):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    with pyplot_lock:
+        fig, ax = plt.subplots()
+        ax.pie([personal, group], labels=['Personal Tasks', 'Group Tasks'], autopct='%1.1f%%', startangle=90)
+        ax.axis('equal')
+        plt.title(f'Task Completion Breakdown (Total: {personal + group})')
+        buf = io.BytesIO()
+        plt.savefig(buf, format='png', bbox_inches='tight')
+        plt.close(fig)
+        return buf.getvalue()
+
+
+def charts_per_second(render, counts):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as clients:
+        list(clients.map(lambda args: render(*args), counts))
+    return len(counts) / (time.perf_counter() - start)
+
+
+def main():
+    distinct = [(i + 1, i % 7) for i in range(CHARTS)]
+    unchanged = [(10, 3)] * CHARTS
+    pool = ChartRenderer(workers=WORKERS, cache_size=CHARTS)
+    pool.render(render_completion_chart, 0, 0, "png")  # start the workers and import matplotlib there
+    render_completion_chart(0, 0)
+
+    print(f"{CHARTS} PNG charts, {CLIENTS} concurrent clients, {WORKERS} worker processes")
+    for label, render, counts in (
+        ("pyplot", old_render, distinct),
+        ("figure", lambda p, g: render_completion_chart(p, g, "png"), distinct),
+        ("pool", lambda p, g: pool.render(render_completion_chart, p, g, "png"), distinct),
+        ("cached", lambda p, g: pool.render(render_completion_chart, p, g, "png"), unchanged),
+    ):
+        print(f"{label:>8}: {charts_per_second(render, counts):9.1f} charts/s")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Load test for chat push: thousands of idle SSE connections on a threaded Werkzeug
+server. Measures what they cost while idle, fan-out latency when every group gets a
+message, and database queries compared with the polling the app did before
+(unread check every 10 s on the group screen, chat sync every 5 s on the chat screen).
+
+Run from the repository root:
+    python benchmarks/bench_chat_push.py [connections] [group_size] [idle_seconds]
+"""
+import logging
+import os
+import selectors
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+
+from extensions import db
+from models import User, Group, GroupMessage
+from testing_utils import make_test_app, count_queries
+
+CONNECTIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+GROUP_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+IDLE_SECONDS = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+UNREAD_POLL_SECONDS = 10
+CHAT_POLL_SECONDS = 5
+
+
+def rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def open_stream(port, group_id, user_id):
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.sendall(f"GET /groups/{group_id}/chat/events?user_id={user_id} HTTP/1.1\r\n"
+                 f"Host: localhost\r\nAccept: text/event-stream\r\n\r\n".encode())
+    received = b""
+    while b"event: unread" not in received:
+        received += sock.recv(65536)
+    sock.setblocking(False)
+    return sock
+
+
+def main():
+    app = make_test_app()
+    groups = max(1, CONNECTIONS // GROUP_SIZE)
+    with app.app_context():
+        users = [User(username=f"u{i}", email=f"u{i}@example.com") for i in range(CONNECTIONS)]
+        db.session.add_all(users)
+        db.session.flush()
+        user_ids = [u.userId for u in users]
+        group_rows = [Group(name=f"g{i}", created_by=user_ids[i * GROUP_SIZE]) for i in range(groups)]
+        db.session.add_all(group_rows)
+        db.session.flush()
+        group_ids = [g.id for g in group_rows]
+        db.session.add_all([GroupMessage(group_id=group_id, user_id=user_ids[0], content="hi")
+                            for group_id in group_ids])
+        db.session.commit()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    client = app.test_client()
+
+    baseline_rss, baseline_threads = rss_mb(), threading.active_count()
+    start = time.perf_counter()
+    sockets = [open_stream(port, group_ids[i % groups], user_ids[i]) for i in range(CONNECTIONS)]
+    print(f"🔌 {CONNECTIONS} streams over {groups} groups opened in {time.perf_counter() - start:.1f} s: "
+          f"+{rss_mb() - baseline_rss:.0f} MB RSS "
+          f"({(rss_mb() - baseline_rss) * 1024 / CONNECTIONS:.0f} KB each), "
+          f"+{threading.active_count() - baseline_threads} threads")
+
+    with app.app_context():
+        with count_queries() as counter:
+            time.sleep(IDLE_SECONDS)
+        print(f"💤 {IDLE_SECONDS:.0f} s idle: {counter.count} queries")
+
+        # One message per group; every member's stream gets the message and an unread event
+        selector = selectors.DefaultSelector()
+        for sock in sockets:
+            selector.register(sock, selectors.EVENT_READ)
+        pending = set(sockets)
+        with count_queries() as counter:
+            start = time.perf_counter()
+            for index, group_id in enumerate(group_ids):
+                client.post(f"/groups/{group_id}/chat", json={"user_id": user_ids[index * GROUP_SIZE], "content": "ping"})
+            posted = time.perf_counter() - start
+            buffers = {}
+            while pending:
+                for key, _ in selector.select(timeout=10):
+                    data = key.fileobj.recv(65536)
+                    buffers[key.fileobj] = buffers.get(key.fileobj, b"") + data
+                    if b"event: message" in buffers[key.fileobj]:
+                        pending.discard(key.fileobj)
+            delivered = time.perf_counter() - start
+        post_queries = counter.count
+        print(f"📣 {groups} messages posted in {posted * 1000:.0f} ms, delivered to all {CONNECTIONS} streams "
+              f"after {delivered * 1000:.0f} ms; {post_queries} queries ({post_queries / groups:.1f} per message)")
+
+        # What the same clients cost when polling instead
+        with count_queries() as counter:
+            client.get(f"/groups/{group_ids[0]}/chat/unread/{user_ids[1]}")
+        unread_queries = counter.count
+        with count_queries() as counter:
+            client.get(f"/groups/{group_ids[0]}/chat", query_string={"after_id": 1})
+        chat_queries = counter.count
+        polling_per_minute = CONNECTIONS * 60 * (unread_queries / UNREAD_POLL_SECONDS + chat_queries / CHAT_POLL_SECONDS)
+        print(f"📊 polling: {unread_queries} + {chat_queries} queries per client poll -> "
+              f"{polling_per_minute:,.0f} queries/min for {CONNECTIONS} clients; push: 0 while idle, "
+              f"{post_queries / groups:.1f} per message sent")
+
+    for sock in sockets:
+        sock.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
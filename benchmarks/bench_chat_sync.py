@@ -0,0 +1,69 @@
+"""
+Cost of one chat poll as a group's history grows: the old full fetch (every message,
+lazy username per author) against the after_id sync with 5 new messages.
+
+Run from the repository root:
+    python benchmarks/bench_chat_sync.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from models import User, Group, GroupMessage
+from testing_utils import make_test_app, count_queries
+
+AUTHORS = 50
+NEW_MESSAGES = 5
+
+
+def old_poll(group_id):
+    # get_group_messages before keyset pagination
+    messages = GroupMessage.query.filter_by(group_id=group_id).order_by(GroupMessage.timestamp.asc()).all()
+    return [{"id": m.id, "username": m.user.username, "content": m.content,
+             "timestamp": m.timestamp.isoformat()} for m in messages]
+
+
+def main():
+    app = make_test_app()
+    client = app.test_client()
+    with app.app_context():
+        users = [User(username=f"u{i}", email=f"u{i}@example.com") for i in range(AUTHORS)]
+        db.session.add_all(users)
+        db.session.flush()
+        user_ids = [u.userId for u in users]
+        group = Group(name="chatty", created_by=user_ids[0])
+        db.session.add(group)
+        db.session.commit()
+        group_id = group.id
+
+        print(f"{'history':>8} | {'old ms':>8} {'queries':>7} {'KB':>7} | {'sync ms':>8} {'queries':>7} {'KB':>7}")
+        total = 0
+        for history in (100, 1000, 10000, 50000):
+            db.session.execute(GroupMessage.__table__.insert(), [
+                {"group_id": group_id, "user_id": user_ids[i % AUTHORS], "content": f"message {i}"}
+                for i in range(total, history)
+            ])
+            db.session.commit()
+            total = history
+            last_seen = total - NEW_MESSAGES
+
+            db.session.expunge_all()
+            with count_queries() as counter:
+                start = time.perf_counter()
+                body = app.json.dumps(old_poll(group_id))
+                old_ms = (time.perf_counter() - start) * 1000
+            old_queries = counter.count
+
+            with count_queries() as counter:
+                start = time.perf_counter()
+                response = client.get(f"/groups/{group_id}/chat", query_string={"after_id": last_seen})
+                new_ms = (time.perf_counter() - start) * 1000
+            print(f"{history:>8} | {old_ms:8.1f} {old_queries:>7} {len(body) / 1024:7.1f} | "
+                  f"{new_ms:8.1f} {counter.count:>7} {len(response.data) / 1024:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Data screen load for a user with many completed tasks: the four endpoints the
+screen used to call (monthly, time taken, on-time, completion chart counts) against
+the single /api/data/dashboard.
+
+The old time_taken_stats, on_time_stats and chart queries are reproduced here (the
+first is MSSQL raw SQL, rewritten with the portable seconds_between()). The chart's
+matplotlib rendering is left out; only its two counts are timed. monthly_stats and the
+dashboard now read PersonalTaskRollups; see bench_rollups.py for that step.
+
+Run from the repository root:
+    python benchmarks/bench_dashboard.py [tasks]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+
+from analytics import rebuild_rollups
+from extensions import db
+from models import User, PersonalTask, GroupTask, task_user_association
+from sql_expressions import seconds_between
+from testing_utils import make_test_app, count_queries
+
+TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+ROUNDS = 10
+
+
+def old_time_taken(user_id):
+    return db.session.query(
+        PersonalTask.category, func.avg(seconds_between(PersonalTask.start_time, PersonalTask.actual_time))
+    ).filter(
+        PersonalTask.user_id == user_id, PersonalTask.status == 'Done',
+        PersonalTask.start_time.isnot(None), PersonalTask.actual_time.isnot(None)
+    ).group_by(PersonalTask.category).all()
+
+
+def old_on_time(user_id):
+    done_with_deadline = db.session.query(PersonalTask).filter(
+        PersonalTask.user_id == user_id, PersonalTask.status == 'Done',
+        PersonalTask.actual_time.isnot(None), PersonalTask.deadline.isnot(None)
+    )
+    on_time = done_with_deadline.filter(PersonalTask.actual_time <= PersonalTask.deadline).count()
+    late = done_with_deadline.filter(PersonalTask.actual_time > PersonalTask.deadline).count()
+    return on_time, late
+
+
+def old_chart_counts(user_id):
+    personal = db.session.query(PersonalTask).filter_by(user_id=user_id, status='Done').count()
+    group = db.session.query(task_user_association).join(GroupTask).filter(
+        task_user_association.c.user_id == user_id, GroupTask.status == 'Done'
+    ).count()
+    return personal, group
+
+
+def main():
+    app = make_test_app()
+    client = app.test_client()
+    with app.app_context():
+        users = [User(username=f"u{i}", email=f"u{i}@example.com") for i in range(5)]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [u.userId for u in users]
+        rng = random.Random(1)
+        rows = []
+        for i in range(TASKS):
+            start = datetime(2022, 1, 1) + timedelta(hours=rng.randrange(24 * 365 * 3))
+            rows.append({
+                "title": f"t{i}", "priority": 2, "user_id": user_ids[i % 5],
+                "category": rng.choice(["Work", "Study", "Health", "Home", "Other"]),
+                "status": rng.choice(["Done", "Done", "Done", "To Do"]),
+                "start_time": start, "actual_time": start + timedelta(minutes=rng.randrange(10, 900)),
+                "deadline": start + timedelta(minutes=rng.randrange(10, 900)),
+            })
+        db.session.execute(PersonalTask.__table__.insert(), rows)
+        db.session.commit()
+        rebuild_rollups()
+        user_id = user_ids[0]
+
+        def old_screen():
+            client.get(f"/api/data/monthly_stats/{user_id}")
+            old_time_taken(user_id)
+            old_on_time(user_id)
+            old_chart_counts(user_id)
+
+        def new_screen():
+            client.get(f"/api/data/dashboard/{user_id}")
+
+        print(f"{TASKS} tasks, {TASKS // 5} for the user")
+        for label, call, round_trips in (("4 endpoints", old_screen, 4), ("dashboard", new_screen, 1)):
+            with count_queries() as counter:
+                call()
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                call()
+            elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+            print(f"{label:>12}: {elapsed:7.1f} ms, {round_trips} round trips, {counter.count} queries")
+
+
+if __name__ == "__main__":
+    main()
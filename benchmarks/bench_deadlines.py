@@ -0,0 +1,68 @@
+"""
+Deadline handling over 100k task dicts: the old try-every-format parser versus the
+memoized parser, and find_most_urgent() over string versus native datetime deadlines.
+
+Run from the repository root:
+    python benchmarks/bench_deadlines.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI.AiChat import find_most_urgent
+from date_parsing import parse_datetime_value
+
+TASKS = 100_000
+OLD_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'
+]
+
+
+def old_parse_deadline(deadline_str):
+    # AiChat.parse_deadline before the shared parser
+    for fmt in OLD_FORMATS:
+        try:
+            return datetime.strptime(deadline_str, fmt)
+        except:
+            continue
+    return None
+
+
+def make_tasks():
+    rng = random.Random(10)
+    base = datetime(2025, 1, 1)
+    tasks = []
+    for i in range(TASKS):
+        deadline = base + timedelta(minutes=rng.randint(0, 500_000))
+        tasks.append({"title": f"task {i}", "status": "To Do", "priority": rng.randint(1, 4), "deadline": deadline})
+    return tasks
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed * 1000:8.1f} ms  ({elapsed / TASKS * 1e6:.2f} µs/task)")
+
+
+def main():
+    native = make_tasks()
+    # The strings to_dict() produces, plus the ISO "Z" strings the frontend sends
+    strings = [dict(t, deadline=t["deadline"].strftime("%Y-%m-%d %H:%M:%S")) for t in native]
+    iso_z = [t["deadline"].strftime("%Y-%m-%dT%H:%M:%S.000Z") for t in native]
+
+    timed("old parser, '%Y-%m-%d %H:%M:%S'", lambda: [old_parse_deadline(t["deadline"]) for t in strings])
+    timed("memoized parser, '%Y-%m-%d %H:%M:%S'", lambda: [parse_datetime_value(t["deadline"]) for t in strings])
+    timed("old parser, '...T...000Z'", lambda: [old_parse_deadline(v) for v in iso_z])
+    timed("memoized parser, '...T...000Z'", lambda: [parse_datetime_value(v) for v in iso_z])
+    timed("find_most_urgent, string deadlines", lambda: find_most_urgent(strings))
+    timed("find_most_urgent, native deadlines", lambda: find_most_urgent(native))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+/groups/<id>/ai-distribute on a group of 500 members and 5,000 tasks: the old
+per-member schedule queries, per-task re-sort and per-task commit, against the
+bulk loader, load heap and single commit.
+
+Run from the repository root:
+    python benchmarks/bench_distribution.py
+"""
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from models import User, Group, GroupTask, UserSchedule, group_user_association, task_user_association
+from testing_utils import make_test_app, count_queries
+
+MEMBERS = 500
+TASKS = 5000
+
+
+def seed():
+    rng = random.Random(14)
+    users = [User(username=f"m{i}", email=f"m{i}@example.com") for i in range(MEMBERS)]
+    db.session.add_all(users)
+    db.session.flush()
+    group = Group(name="big team", created_by=users[0].userId)
+    db.session.add(group)
+    db.session.flush()
+    db.session.execute(group_user_association.insert(), [{"group_id": group.id, "user_id": u.userId} for u in users])
+    db.session.add_all([
+        UserSchedule(user_id=u.userId, schedule_json=json.dumps({"Monday": ["09:00"] * rng.randint(0, 8),
+                                                                 "Tuesday": ["10:00"] * rng.randint(0, 8)}))
+        for u in users
+    ])
+    tasks = [GroupTask(title=f"t{i}", group_id=group.id, priority=rng.randint(1, 4), status="To Do")
+             for i in range(TASKS)]
+    db.session.add_all(tasks)
+    db.session.commit()
+    return group.id, [u.userId for u in users], [{"id": t.id, "priority": t.priority} for t in tasks]
+
+
+def old_distribute(member_ids, tasks):
+    # ai_distribute_tasks before the distribution engine (steps 2-5)
+    user_free_time = {}
+    for user_id in member_ids:
+        entry = UserSchedule.query.filter_by(user_id=user_id).first()
+        schedule = json.loads(entry.schedule_json) if entry else {}
+        user_free_time[user_id] = sum(len(s) * 60 for s in schedule.values() if isinstance(s, list))
+    total = sum(user_free_time.values()) or 1
+    queue = []
+    for user_id, minutes in user_free_time.items():
+        queue.extend([user_id] * max(1, round(minutes / total * 100)))
+    counts = defaultdict(int)
+    for task_data in sorted(tasks, key=lambda t: t["priority"]):
+        task = db.session.get(GroupTask, task_data["id"])
+        wanted = 2 if task.priority == 1 else 1
+        assigned = []
+        for user_id in sorted(set(queue), key=lambda uid: (counts[uid], -user_free_time[uid])):
+            user = db.session.get(User, user_id)
+            if user not in task.assigned_users:
+                task.assigned_users.append(user)
+                assigned.append(user_id)
+                counts[user_id] += 1
+            if len(assigned) >= wanted:
+                break
+        db.session.commit()
+
+
+def main():
+    app = make_test_app()
+    client = app.test_client()
+    with app.app_context():
+        group_id, member_ids, tasks = seed()
+
+        with count_queries() as counter:
+            start = time.perf_counter()
+            old_distribute(member_ids, tasks)
+            old_s = time.perf_counter() - start
+        print(f"old: {old_s:8.2f} s  {counter.count:>6} queries")
+
+        db.session.execute(task_user_association.delete())
+        db.session.commit()
+
+        with count_queries() as counter:
+            start = time.perf_counter()
+            response = client.post(f"/groups/{group_id}/ai-distribute",
+                                   json={"tasks": tasks, "members": [{"id": m} for m in member_ids]})
+            new_s = time.perf_counter() - start
+        assert response.status_code == 200, response.get_data(as_text=True)
+        print(f"new: {new_s:8.2f} s  {counter.count:>6} queries")
+
+
+if __name__ == "__main__":
+    main()
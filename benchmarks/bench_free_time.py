@@ -0,0 +1,104 @@
+"""
+Scheduling cost of the interval free-time engine against the old hourly slot lists
+(one datetime per free hour, allocated with list.pop(0)), as tasks and free time grow.
+
+Run from the repository root:
+    python benchmarks/bench_free_time.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from free_time import DAYS, FreeTimeline, format_clock, parse_time_ranges
+
+
+def old_schedule(ranges_by_day, task_hours):
+    # generate_schedule before the free-time engine
+    def parse_time_slots(time_ranges):
+        slots = []
+        for time_range in time_ranges.split(","):
+            start_str, end_str = time_range.strip().split("-")
+            start = datetime.strptime(start_str.strip(), "%H:%M")
+            end = datetime.strptime(end_str.strip(), "%H:%M")
+            if (end - start).total_seconds() < 3600:
+                continue
+            current = start
+            while current + timedelta(hours=1) <= end:
+                slots.append(current)
+                current += timedelta(hours=1)
+        return sorted(slots)
+
+    available = {day: parse_time_slots(ranges_by_day[day]) for day in DAYS}
+    placed = 0
+    for hours in task_hours:
+        for day in DAYS:
+            slots = available[day]
+            while hours > 0 and slots:
+                slots.pop(0).strftime("%H:%M")
+                hours -= 1
+                placed += 1
+            if hours == 0:
+                break
+    return placed
+
+
+def new_schedule(ranges_by_day, task_hours, slot_minutes=60):
+    timeline = FreeTimeline({day: parse_time_ranges(ranges_by_day[day]) for day in DAYS})
+    placed = 0
+    for hours in task_hours:
+        remaining = hours * 60
+        while remaining > 0:
+            chunk = timeline.allocate(slot_minutes)
+            if chunk is None:
+                break
+            format_clock(chunk[1])
+            remaining -= slot_minutes
+            placed += 1
+    return placed
+
+
+def make_ranges(ranges_per_day, rng):
+    # Non-overlapping two-hour windows separated by gaps, repeated across the day
+    step = (24 * 60) // ranges_per_day
+    ranges = {}
+    for day in DAYS:
+        parts = []
+        for i in range(ranges_per_day):
+            start = i * step
+            parts.append(f"{format_clock(start)}-{format_clock(min(start + rng.choice([60, 120]), start + step, 24 * 60 - 1))}")
+        ranges[day] = ",".join(parts)
+    return ranges
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rng = random.Random(11)
+    print(f"{'ranges/day':>10} {'tasks':>6} | {'old ms':>9} {'new ms':>9} {'placed':>7}")
+    for ranges_per_day in (3, 6, 12):
+        ranges = make_ranges(ranges_per_day, rng)
+        for task_count in (30, 300, 3000):
+            # A month of work: 1-4 hours per task
+            task_hours = [rng.randint(1, 4) for _ in range(task_count)]
+            old_placed, old_ms = timed(old_schedule, ranges, task_hours)
+            new_placed, new_ms = timed(new_schedule, ranges, task_hours)
+            assert old_placed == new_placed
+            print(f"{ranges_per_day:>10} {task_count:>6} | {old_ms:9.2f} {new_ms:9.2f} {new_placed:>7}")
+
+    # Sub-hour granularity over the same week
+    ranges = make_ranges(12, rng)
+    task_hours = [rng.randint(1, 4) for _ in range(300)]
+    placed, ms = timed(new_schedule, ranges, task_hours, 15)
+    print(f"15-minute slots, 300 tasks: {ms:.2f} ms, {placed} chunks")
+
+
+if __name__ == "__main__":
+    main()
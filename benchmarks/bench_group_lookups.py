@@ -0,0 +1,64 @@
+"""
+Query count and latency of /group-tasks/user/<id> and /ai/generate-schedule as the
+number of group tasks (and therefore scheduled hour slots) grows.
+
+Run from the repository root:
+    python benchmarks/bench_group_lookups.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from availability import save_availability
+from models import User, Group, GroupTask, WEEKDAY_NAMES, group_user_association, task_user_association
+from testing_utils import make_test_app, count_queries
+
+GROUPS = 10
+
+
+def seed(task_count):
+    db.drop_all()
+    db.create_all()
+    user = User(username="bench", email="bench@example.com")
+    db.session.add(user)
+    db.session.flush()
+    groups = [Group(name=f"group {i}", created_by=user.userId) for i in range(GROUPS)]
+    db.session.add_all(groups)
+    db.session.flush()
+    db.session.execute(group_user_association.insert(), [{"group_id": g.id, "user_id": user.userId} for g in groups])
+    tasks = [GroupTask(title=f"task {i}", group_id=groups[i % GROUPS].id, priority=2, status="In Progress")
+             for i in range(task_count)]
+    db.session.add_all(tasks)
+    db.session.flush()
+    db.session.execute(task_user_association.insert(), [{"task_id": t.id, "user_id": user.userId} for t in tasks])
+    save_availability(user.userId, {day: [(0, 23 * 60 + 59)] for day in WEEKDAY_NAMES})
+    db.session.commit()
+    return user.userId, {str(t.id): 1 for t in tasks}
+
+
+def measure(client, method, url, **kwargs):
+    with count_queries() as counter:
+        start = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    return counter.count, elapsed * 1000
+
+
+def main():
+    app = make_test_app()
+    client = app.test_client()
+    with app.app_context():
+        print(f"{'tasks':>6} | {'/group-tasks/user':>24} | {'/ai/generate-schedule':>24}")
+        for task_count in (10, 50, 150):
+            user_id, task_hours = seed(task_count)
+            q1, t1 = measure(client, "get", f"/group-tasks/user/{user_id}")
+            q2, t2 = measure(client, "post", "/ai/generate-schedule", json={"user_id": user_id, "task_hours": task_hours})
+            print(f"{task_count:>6} | {q1:>4} queries {t1:>8.1f} ms | {q2:>4} queries {t2:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Read routes on a million-row synthetic dataset, before and after the route-filter
+indexes and unique association keys declared in models.py.
+
+"before" drops the indexes listed in NEW_INDEXES (the tables keep their primary keys
+and older indexes); "after" recreates them with create_missing_indexes(), as
+`flask --app app create-indexes` does. Each state also runs the EXPLAIN audit.
+
+Run from the repository root:
+    python benchmarks/bench_indexes.py [personal tasks]
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands import create_missing_indexes
+from extensions import db
+from query_audit import AUDITED_ROUTES, audit_routes, seed_audit_data
+from testing_utils import make_test_app
+
+PERSONAL_TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+ROUNDS = 5
+NEW_INDEXES = {
+    "IX_PersonalTasks_User_DueDate", "IX_Groups_CreatedBy", "IX_GroupTasks_Group_Status",
+    "IX_GroupMessages_Group_Timestamp", "UQ_group_user_association_Group_User",
+    "IX_group_user_association_User_Group", "UQ_task_user_association_Task_User",
+    "IX_task_user_association_User_Task",
+}
+
+
+def time_routes(client, ids):
+    timings = {}
+    for template in AUDITED_ROUTES:
+        route = template.format(**ids)
+        client.get(route)
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            client.get(route)
+        timings[template] = (time.perf_counter() - start) / ROUNDS * 1000
+    return timings
+
+
+def main():
+    app = make_test_app()
+    client = app.test_client()
+    with app.app_context():
+        start = time.perf_counter()
+        scale = PERSONAL_TASKS / 1000000
+        ids = seed_audit_data(users=int(5000 * scale) or 1, personal_tasks=PERSONAL_TASKS,
+                              groups=int(2000 * scale) or 1, group_tasks=int(200000 * scale) or 1,
+                              messages=int(300000 * scale) or 1)
+        counts = {table.name: db.session.execute(db.select(db.func.count()).select_from(table)).scalar()
+                  for table in db.metadata.sorted_tables if table.schema is None}
+        print(f"seeded in {time.perf_counter() - start:.0f} s: "
+              + ", ".join(f"{name} {count}" for name, count in counts.items() if count))
+
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in NEW_INDEXES:
+                    index.drop(db.engine)
+        before = time_routes(client, ids)
+        before_scans = sum(bool(result.full_scans) for result in audit_routes(client, ids))
+
+        start = time.perf_counter()
+        created = create_missing_indexes()
+        print(f"created {len(created)} indexes in {time.perf_counter() - start:.1f} s")
+        after = time_routes(client, ids)
+        after_scans = sum(bool(result.full_scans) for result in audit_routes(client, ids))
+
+    print(f"{'route':>62} {'before':>10} {'after':>10}")
+    for template in AUDITED_ROUTES:
+        print(f"{template:>62} {before[template]:8.2f}ms {after[template]:8.2f}ms")
+    print(f"{'queries with full scans':>62} {before_scans:>10} {after_scans:>10}")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    main()
@@ -0,0 +1,43 @@
+"""
+Classification cost per chat message: AiChat's sequential keyword helpers versus the
+single-pass intent router.
+
+Run from the repository root:
+    python benchmarks/bench_intents.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI.AiChat import (
+    is_small_talk, is_urgent_query, is_time_query, is_status_query,
+    is_personal_task_query, is_group_task_query, extract_requested_status
+)
+from AI.intent_router import classify_message
+
+MESSAGES = [
+    "hi", "What time is it?", "What should I focus on today? Anything urgent in my team tasks?",
+    "show me my personal tasks that are in progress",
+    "I finished the report yesterday and want to plan the rest of the week around the deadlines " * 3,
+]
+
+
+def sequential(message):
+    # Worst case for the old router: every helper runs
+    return (is_status_query(message), extract_requested_status(message), is_urgent_query(message),
+            is_time_query(message), is_small_talk(message), is_group_task_query(message),
+            is_personal_task_query(message))
+
+
+def main():
+    runs = 20000
+    for message in MESSAGES:
+        old = timeit.timeit(lambda: sequential(message), number=runs) / runs
+        new = timeit.timeit(lambda: classify_message(message), number=runs) / runs
+        print(f"{len(message):4d} chars  helpers {old * 1e6:7.2f} µs  router {new * 1e6:7.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
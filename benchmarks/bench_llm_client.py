@@ -0,0 +1,62 @@
+"""
+Latency/throughput of concurrent chat completions against a local stub upstream:
+the old bare requests.post per message vs the pooled LLMClient (with and without cache).
+
+Run from the repository root:
+    python benchmarks/bench_llm_client.py [concurrency] [messages] [upstream_delay_ms]
+"""
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from AI.llm_client import LLMClient
+from testing_utils import StubLLMServer
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+MESSAGES = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+DELAY = (int(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000.0
+
+PROMPT = [{"role": "user", "content": "It's the morning on Monday. Greet the user warmly."}]
+
+
+def run(label, call):
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        list(pool.map(one, range(MESSAGES)))
+    elapsed = time.perf_counter() - start
+    p50 = statistics.median(latencies) * 1000
+    p95 = sorted(latencies)[int(len(latencies) * 0.95)] * 1000
+    print(f"{label:<24} {MESSAGES / elapsed:8.1f} msg/s   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms")
+
+
+def main():
+    print(f"📊 {MESSAGES} messages, concurrency {CONCURRENCY}, upstream delay {DELAY * 1000:.0f} ms")
+    with StubLLMServer(delay=DELAY) as stub:
+        url = stub.base_url + "/chat/completions"
+        headers = {"Authorization": "Bearer bench", "Content-Type": "application/json"}
+        run("requests.post (old)", lambda: requests.post(url, headers=headers, json={"messages": PROMPT}).json())
+        old_connections = stub.connections
+
+        client = LLMClient("bench", "bench-model", base_url=stub.base_url, pool_size=CONCURRENCY)
+        stub.connections = 0
+        run("LLMClient pooled", lambda: client.complete(PROMPT))
+        pooled_connections = stub.connections
+        run("LLMClient cached", lambda: client.complete(PROMPT, cache=True))
+        print(f"TCP connections opened: old {old_connections}, pooled {pooled_connections}")
+
+
+if __name__ == "__main__":
+    main()
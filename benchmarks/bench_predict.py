@@ -0,0 +1,91 @@
+"""
+Compare the old one-request-per-task prediction path with the batched path.
+
+Run from the repository root:
+    python benchmarks/bench_predict.py [num_tasks]
+"""
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+from AI.batch_predictor import FEATURE_COLUMNS, PredictionBatcher, predict_minutes
+from AI.inference_engine import MlpInferenceEngine
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+model = tf.keras.models.load_model("AI/task_prediction_model.keras")
+feature_scaler = joblib.load("AI/feature_scaler.pkl")
+time_scaler = joblib.load("AI/time_scaler.pkl")
+engine = MlpInferenceEngine.load("AI/task_prediction_model.npz")
+
+rng = np.random.default_rng(0)
+features = np.column_stack([
+    rng.integers(0, 5, N), rng.integers(1, 5, N), rng.uniform(10, 240, N),
+    rng.integers(0, 24, N), rng.integers(0, 3, N)
+]).astype(np.float64)
+
+
+def per_row():
+    out = []
+    for row in features:
+        frame = pd.DataFrame([row], columns=FEATURE_COLUMNS)
+        scaled = feature_scaler.transform(frame)
+        predicted_scaled = model.predict(scaled, verbose=0)[0][0]
+        out.append(time_scaler.inverse_transform([[predicted_scaled]])[0][0])
+    return np.array(out)
+
+
+def batched():
+    return predict_minutes(model, feature_scaler, time_scaler, features)
+
+
+def numpy_per_row():
+    return np.array([engine.predict_minutes(row)[0] for row in features])
+
+
+def numpy_batched():
+    return engine.predict_minutes(features)
+
+
+def concurrent_micro_batched(threads=32):
+    batcher = PredictionBatcher(lambda x: predict_minutes(model, feature_scaler, time_scaler, x))
+    results = [None] * N
+
+    def worker(offset):
+        for i in range(offset, N, threads):
+            results[i] = batcher.predict(features[i])
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return np.array(results)
+
+
+def timed(label, fn):
+    fn()  # warm-up
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms total  {elapsed / N * 1e6:9.1f} µs/task")
+    return result
+
+
+print(f"📊 {N} tasks")
+reference = timed("per-row (old /predict)", per_row)
+batch = timed("/predict/batch", batched)
+micro = timed("micro-batched /predict x32", concurrent_micro_batched)
+numpy_single = timed("NumPy engine per-row", numpy_per_row)
+numpy_batch = timed("NumPy engine batch", numpy_batched)
+print(f"max |diff| batch vs per-row: {np.max(np.abs(batch - reference)):.2e}")
+print(f"max |diff| micro vs per-row: {np.max(np.abs(micro - reference)):.2e}")
+print(f"max |diff| NumPy vs per-row: {np.max(np.abs(numpy_batch - reference)):.2e}")
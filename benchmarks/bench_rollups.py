@@ -0,0 +1,76 @@
+"""
+Data screen reads for a power user: aggregating every completed PersonalTask on each
+request (what /api/data/dashboard did before) against reading PersonalTaskRollups.
+Also times PUT /tasks/<id> moving a task to Done, which now updates one rollup row.
+
+Run from the repository root:
+    python benchmarks/bench_rollups.py [tasks]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import personal_rollup_rows, rebuild_rollups, rollup_rows, summarize
+from extensions import db
+from models import User, PersonalTask
+from testing_utils import make_test_app, count_queries
+
+TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+ROUNDS = 20
+TRANSITIONS = 200
+
+
+def timed(call, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        call()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    app = make_test_app()
+    client = app.test_client()
+    with app.app_context():
+        user = User(username="power", email="power@example.com")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.userId
+        rng = random.Random(1)
+        rows = []
+        for i in range(TASKS):
+            start = datetime(2022, 1, 1) + timedelta(hours=rng.randrange(24 * 365 * 3))
+            rows.append({
+                "title": f"t{i}", "priority": 2, "user_id": user_id,
+                "category": rng.choice(["Work", "Study", "Health", "Home", "Other"]),
+                "status": "Done" if i >= TRANSITIONS else "In Progress",
+                "start_time": start, "actual_time": start + timedelta(minutes=rng.randrange(10, 900)),
+                "deadline": start + timedelta(minutes=rng.randrange(10, 900)),
+            })
+        db.session.execute(PersonalTask.__table__.insert(), rows)
+        db.session.commit()
+
+        start = time.perf_counter()
+        count = rebuild_rollups()
+        print(f"{TASKS} tasks for one user; rebuild: {count} rollup rows in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+        live, stored = summarize(personal_rollup_rows(user_id)), summarize(rollup_rows(user_id))
+        assert live == stored, "rollup out of date"
+        for label, rows_of in (("per task", personal_rollup_rows), ("rollups", rollup_rows)):
+            print(f"{label:>12}: {timed(lambda: summarize(rows_of(user_id)), ROUNDS):7.2f} ms per read")
+
+        task_ids = [task_id for (task_id,) in db.session.query(PersonalTask.id).filter(
+            PersonalTask.status == "In Progress")]
+        with count_queries() as counter:
+            client.put(f"/tasks/{task_ids.pop()}", json={"status": "Done"})
+        elapsed = timed(lambda: client.put(f"/tasks/{task_ids.pop()}", json={"status": "Done"}), TRANSITIONS - 1)
+        print(f"{'-> Done':>12}: {elapsed:7.2f} ms per PUT, {counter.count} queries")
+        assert summarize(personal_rollup_rows(user_id)) == summarize(rollup_rows(user_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Greedy (priority order, earliest slots) versus the EDF solver on synthetic workloads:
+solve time, unscheduled hours and missed deadlines, from 10 to 10,000 tasks.
+
+Free time is 08:00-20:00 every day. Workloads aim at about 1.2x the week's free hours.
+Every task needs at least one slot, so the large task counts overload the week much
+further. Both solvers face the same overload.
+
+Run from the repository root:
+    python benchmarks/bench_schedule_solver.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from free_time import DAYS
+from schedule_solver import SolverTask, dated_chunks, solve_edf
+
+START = datetime(2030, 1, 6, 0, 0)
+WEEK_MINUTES = 7 * 12 * 60
+
+
+def greedy(tasks, chunks):
+    # generate_schedule's default loop, over the same dated chunks
+    assignment = {}
+    position = 0
+    for task in sorted(tasks, key=lambda t: (t.priority, t.deadline or datetime.max)):
+        take = min(task.chunks, len(chunks) - position)
+        assignment[task.key] = chunks[position:position + take]
+        position += take
+    return assignment
+
+
+def outcome(tasks, chunks_by_task, slot_minutes):
+    unscheduled = sum(t.chunks - len(chunks_by_task.get(t.key, [])) for t in tasks) * slot_minutes / 60
+    missed = 0
+    for t in tasks:
+        assigned = chunks_by_task.get(t.key, [])
+        if t.deadline and (len(assigned) < t.chunks or assigned[-1].ends_at > t.deadline):
+            missed += 1
+    return unscheduled, missed
+
+
+def workload(task_count, slot_minutes, rng):
+    # Total demand ~1.2x capacity, split across the tasks
+    chunk_budget = int(WEEK_MINUTES / slot_minutes * 1.2)
+    tasks = []
+    for i in range(task_count):
+        chunks = max(1, rng.randint(1, max(1, 2 * chunk_budget // task_count)))
+        deadline = START + timedelta(minutes=rng.randint(12 * 60, 7 * 24 * 60)) if rng.random() < 0.8 else None
+        tasks.append(SolverTask(i, chunks, deadline, rng.randint(1, 4)))
+    return tasks
+
+
+def main():
+    rng = random.Random(12)
+    for slot_minutes in (60, 15):
+        chunks = dated_chunks({day: [(8 * 60, 20 * 60)] for day in DAYS}, slot_minutes, START)
+        print(f"\n{slot_minutes}-minute slots, {len(chunks)} chunks")
+        print(f"{'tasks':>6} | {'greedy ms':>9} {'unsched h':>9} {'missed':>6} | {'edf ms':>9} {'unsched h':>9} {'missed':>6}")
+        for task_count in (10, 100, 1000, 10000):
+            tasks = workload(task_count, slot_minutes, rng)
+
+            t0 = time.perf_counter()
+            greedy_assignment = greedy(tasks, chunks)
+            greedy_ms = (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            edf_assignment, _ = solve_edf(tasks, chunks)
+            edf_ms = (time.perf_counter() - t0) * 1000
+
+            g_unsched, g_missed = outcome(tasks, greedy_assignment, slot_minutes)
+            e_unsched, e_missed = outcome(tasks, edf_assignment, slot_minutes)
+            print(f"{task_count:>6} | {greedy_ms:9.2f} {g_unsched:9.1f} {g_missed:>6} | "
+                  f"{edf_ms:9.2f} {e_unsched:9.1f} {e_missed:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Cold start benchmark for the app factory: fresh interpreter -> import app ->
+create_app() -> first request served (and, separately, first /predict).
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+flask_app = app_module.create_app()
+client = flask_app.test_client()
+t2 = time.perf_counter()
+client.post("/register", json={})
+t3 = time.perf_counter()
+client.post("/predict/batch", json={"tasks": [{"category": "General"}]})
+t4 = time.perf_counter()
+print(f"RESULT {t1 - t0} {t2 - t1} {t3 - t0} {t4 - t3}")
+'''
+
+
+def run_once(env):
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True)
+    for line in out.stdout.splitlines():
+        if line.startswith("RESULT"):
+            return [float(v) for v in line.split()[1:]]
+    raise RuntimeError(out.stderr[-2000:])
+
+
+def main():
+    env = dict(os.environ)
+    env.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite:///:memory:")
+    for warmup in ("0", "1"):
+        env["AI_WARMUP"] = warmup
+        samples = [run_once(env) for _ in range(RUNS)]
+        medians = [statistics.median(col) * 1000 for col in zip(*samples)]
+        print(f"📊 AI_WARMUP={warmup} (median of {RUNS})")
+        print(f"   import app            {medians[0]:8.1f} ms")
+        print(f"   create_app()          {medians[1]:8.1f} ms")
+        print(f"   import -> 1st request {medians[2]:8.1f} ms")
+        print(f"   first AI request      {medians[3]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Unread state for a home screen of 50 groups: one /groups/<id>/chat/unread/<user>
+call per group (the old way) against a single /chat/unread/<user>.
+
+Run from the repository root:
+    python benchmarks/bench_unread.py [groups] [messages_per_group]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from models import User, Group, GroupMessage, group_user_association
+from testing_utils import make_test_app, count_queries
+
+GROUPS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+MESSAGES = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+ROUNDS = 20
+
+
+def main():
+    app = make_test_app()
+    client = app.test_client()
+    with app.app_context():
+        me, other = User(username="me", email="me@example.com"), User(username="other", email="o@example.com")
+        db.session.add_all([me, other])
+        db.session.flush()
+        me_id, other_id = me.userId, other.userId
+        groups = [Group(name=f"g{i}", created_by=other_id) for i in range(GROUPS)]
+        db.session.add_all(groups)
+        db.session.flush()
+        group_ids = [g.id for g in groups]
+        db.session.execute(group_user_association.insert(), [{"group_id": g, "user_id": me_id} for g in group_ids])
+        start = datetime(2030, 1, 1)
+        db.session.execute(GroupMessage.__table__.insert(), [
+            {"group_id": g, "user_id": other_id, "content": "x", "timestamp": start + timedelta(minutes=i)}
+            for g in group_ids for i in range(MESSAGES)
+        ])
+        db.session.commit()
+        for g in group_ids:
+            client.post(f"/groups/{g}/chat/mark_read/{me_id}")
+        db.session.execute(GroupMessage.__table__.insert(), [
+            {"group_id": g, "user_id": other_id, "content": "new", "timestamp": datetime.utcnow()}
+            for g in group_ids[::2]
+        ])
+        db.session.commit()
+
+        def per_group():
+            return [client.get(f"/groups/{g}/chat/unread/{me_id}").get_json()["hasNewMessages"] for g in group_ids]
+
+        def batched():
+            return client.get(f"/chat/unread/{me_id}").get_json()
+
+        for label, call in (("per-group calls", per_group), ("/chat/unread", batched)):
+            with count_queries() as counter:
+                call()
+            start_time = time.perf_counter()
+            for _ in range(ROUNDS):
+                call()
+            elapsed = (time.perf_counter() - start_time) / ROUNDS * 1000
+            requests_made = GROUPS if call is per_group else 1
+            print(f"{label:>16}: {elapsed:7.1f} ms, {requests_made} requests, {counter.count} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Chat attachment throughput: the old FileStorage.save into a flat directory against
+the streamed, hashed, content-addressed store, for one large file and for many
+concurrent small ones (half of them duplicates), plus the resumable path.
+
+Run from the repository root:
+    python benchmarks/bench_uploads.py [large_mb] [small_files] [threads]
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+
+from chat_uploads import ResumableUploads, store_stream
+from extensions import db
+from models import User, Group
+from testing_utils import make_test_app
+
+LARGE_MB = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+SMALL_FILES = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+THREADS = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+SMALL_BYTES = 32 * 1024
+
+
+def old_save(root, data, filename):
+    # upload_chat_file before: FileStorage.save into uploads/<client filename>
+    FileStorage(io.BytesIO(data), filename).save(os.path.join(root, secure_filename(filename)))
+
+
+def new_save(root, data, filename):
+    store_stream(root, io.BytesIO(data), filename, max_bytes=1 << 40)
+
+
+def timed(call):
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def disk_usage(root):
+    return sum(os.path.getsize(os.path.join(path, name)) for path, _, names in os.walk(root) for name in names)
+
+
+def main():
+    large = os.urandom(LARGE_MB * 1024 * 1024)
+    unique = [os.urandom(SMALL_BYTES) for _ in range(SMALL_FILES // 2)]
+    small = unique + unique  # every file uploaded twice under a different name
+
+    print(f"{'':>10} | {LARGE_MB} MB file | {SMALL_FILES} x {SMALL_BYTES // 1024} KB, {THREADS} threads | on disk")
+    for label, save in (("old save", old_save), ("streamed", new_save)):
+        root = tempfile.mkdtemp()
+        try:
+            large_seconds = timed(lambda: save(root, large, "video.mp4"))
+            with ThreadPoolExecutor(THREADS) as pool:
+                small_seconds = timed(lambda: list(pool.map(
+                    lambda item: save(root, item[1], f"photo{item[0]}.jpg"), enumerate(small))))
+            print(f"{label:>10} | {LARGE_MB / large_seconds:7.0f} MB/s | {SMALL_FILES / small_seconds:7.0f} files/s "
+                  f"| {disk_usage(root) / 1024 / 1024:7.1f} MB")
+        finally:
+            shutil.rmtree(root)
+
+    # End to end through the routes, including the chat message insert
+    root = tempfile.mkdtemp()
+    app = make_test_app()
+    app.config["CHAT_UPLOADS"] = ResumableUploads(root, max_bytes=1 << 40)
+    client = app.test_client()
+    with app.app_context():
+        user = User(username="bench", email="bench@example.com")
+        db.session.add(user)
+        db.session.flush()
+        group = Group(name="bench", created_by=user.userId)
+        db.session.add(group)
+        db.session.commit()
+        user_id, group_id = user.userId, group.id
+    try:
+        seconds = timed(lambda: client.post(f"/groups/{group_id}/chat/upload", data={
+            "user_id": str(user_id), "file": (io.BytesIO(large), "video.mp4")
+        }, content_type="multipart/form-data"))
+        print(f"POST /chat/upload, {LARGE_MB} MB multipart: {LARGE_MB / seconds:.0f} MB/s")
+
+        def resumable():
+            location = client.post(f"/groups/{group_id}/chat/uploads", json={
+                "user_id": user_id, "filename": "video2.mp4", "size": len(large)
+            }).headers["Location"]
+            part = 4 * 1024 * 1024
+            for offset in range(0, len(large), part):
+                client.patch(location, data=large[offset:offset + part], headers={"Upload-Offset": str(offset)})
+
+        seconds = timed(resumable)
+        print(f"resumable upload, {LARGE_MB} MB in 4 MB PATCHes: {LARGE_MB / seconds:.0f} MB/s")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
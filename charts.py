@@ -0,0 +1,120 @@
+"""
+Chart images for the Data screen, rendered off the request thread.
+
+Charts are drawn with matplotlib's object-oriented Figure API. Nothing touches the
+global pyplot state, so concurrent renders cannot draw into each other's figure.
+ChartRenderer runs the drawing in a process pool, so the CPU work neither blocks
+request threads on the GIL nor shares matplotlib between threads. It also keeps
+recent results keyed by the render arguments (the counts), so an unchanged chart
+costs a lookup. Concurrent requests for the same chart wait on a single render.
+
+A chart's ETag comes from its counts too (chart_etag), so a client that has the
+current image gets a 304 before anything is rendered.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+CHART_VERSION = 1  # bump when the drawing changes, so clients drop cached images
+CHART_MIMETYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def chart_etag(*parts):
+    return hashlib.sha1(repr((CHART_VERSION,) + parts).encode()).hexdigest()
+
+
+def completion_chart_data(personal, group):
+    """What the completion chart shows, for clients that draw it themselves."""
+    total = personal + group
+    return {
+        "title": f"Task Completion Breakdown (Total: {total})" if total else "Task Completion Breakdown (No Data)",
+        "labels": ["Personal Tasks", "Group Tasks"],
+        "values": [personal, group],
+        "total": total,
+    }
+
+
+def render_completion_chart(personal, group, fmt="png"):
+    """Pie chart of completed personal vs group tasks as `fmt` ("png" or "svg") bytes."""
+    # Imported here so app startup (and the request process) does not pay for matplotlib
+    from matplotlib.figure import Figure
+
+    data = completion_chart_data(personal, group)
+    fig = Figure()
+    ax = fig.subplots()
+    if data["total"] == 0:
+        ax.text(0.5, 0.5, 'No completed tasks yet', ha='center', va='center', fontsize=12)
+        ax.axis('off')
+    else:
+        ax.pie(data["values"], labels=data["labels"], autopct='%1.1f%%', startangle=90)
+        ax.axis('equal')
+    ax.set_title(data["title"])
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches='tight')
+    return buf.getvalue()
+
+
+class ChartRenderer:
+    """
+    Calls render functions in a pool of `workers` processes (in the calling thread
+    when 0) and caches the last `cache_size` results by (function, arguments).
+    Render functions must be module-level so the pool can pickle them.
+    """
+
+    def __init__(self, workers=2, cache_size=256, timeout=30):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self._pool = None  # started by the first render
+        self._cache = OrderedDict()  # key -> Future of the rendered bytes
+        self._lock = threading.Lock()
+
+    def _submit(self, render, args):
+        # Called with the lock held; None means render inline
+        if self.workers == 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool.submit(render, *args)
+
+    def render(self, render, *args):
+        """render(*args), from the cache when the same call was made before."""
+        key = (render.__module__, render.__qualname__, args)
+        inline = False
+        with self._lock:
+            future = self._cache.get(key)
+            if future is not None:
+                self._cache.move_to_end(key)
+            else:
+                future = self._submit(render, args)
+                if future is None:
+                    future, inline = Future(), True
+                self._cache[key] = future
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if inline:
+            try:
+                future.set_result(render(*args))
+            except Exception as e:
+                future.set_exception(e)
+        try:
+            return future.result(self.timeout)
+        except Exception as e:
+            with self._lock:
+                if self._cache.get(key) is future:
+                    del self._cache[key]  # a failed render is retried by the next request
+                if isinstance(e, BrokenProcessPool):
+                    self._pool = None
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._cache.clear()
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,163 @@
+"""
+Push delivery of group chat activity over server-sent events.
+
+The chat routes publish to a channel per group after they commit, and every open
+GET /groups/<id>/chat/events stream is subscribed to its group's channel:
+    "message"  a new message, serialized like GET /groups/<id>/chat
+    "read"     {"group_id", "user_id"} after mark_read
+A stream keeps its own unread counter from these events, so an idle connection costs
+no database queries. It only queries when it connects, to catch up and to get the
+initial count.
+
+The broker lives in app.config["CHAT_BROKER"]. InProcessBroker fans out within
+one process. Running several workers needs a shared broker, such as a Redis
+pub/sub wrapper. Any object with the same publish(channel, event, payload) and
+subscribe(channel) methods can be set there before the first request.
+"""
+import json
+import queue
+import threading
+
+from sqlalchemy import func
+
+from extensions import db
+from models import GroupMessage, GroupMessageRead
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def sse_event(payload, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def group_channel(group_id):
+    return f"group:{group_id}"
+
+
+class Subscription:
+    """One subscriber's queue of (event, payload) pairs."""
+
+    def __init__(self, broker, channel, maxsize):
+        self._broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def get(self, timeout=None):
+        """Next (event, payload), or None after `timeout` seconds without one."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Unsubscribe; safe to call more than once."""
+        self._broker._remove(self)
+
+
+class InProcessBroker:
+    """
+    Thread-safe fan-out to subscribers of the same process.
+
+        subscription = broker.subscribe("group:3")
+        broker.publish("group:3", "message", {...})
+        subscription.get(timeout=15)   # -> ("message", {...})
+
+    A subscriber that falls `queue_size` events behind is dropped and marked
+    overflowed. Its stream then ends, and the client reconnects with after_id.
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self._queue_size)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def publish(self, channel, event, payload):
+        """Queue the event for every subscriber of `channel`; returns how many got it."""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription._queue.put_nowait((event, payload))
+                delivered += 1
+            except queue.Full:
+                subscription.overflowed = True
+                self._remove(subscription)
+        return delivered
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._channels.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+    def _remove(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+
+def unread_count(group_id, user_id):
+    """Messages from other members after the user's last read message, in one query."""
+    last_read_id = db.session.query(GroupMessageRead.last_read_message_id).filter_by(
+        user_id=user_id, group_id=group_id
+    ).scalar_subquery()
+    return db.session.query(func.count(GroupMessage.id)).filter(
+        GroupMessage.group_id == group_id,
+        GroupMessage.user_id != user_id,
+        GroupMessage.id > func.coalesce(last_read_id, 0)
+    ).scalar()
+
+
+def chat_event_stream(subscription, group_id, user_id, unread, backlog=(), after_id=None, resync=False,
+                      include_messages=True, heartbeat=HEARTBEAT_SECONDS):
+    """
+    Generator of SSE frames for one subscriber. `backlog` holds the catch-up messages
+    newer than `after_id`, loaded after subscribing. A message published in between
+    can arrive from both sources, and the duplicate is skipped by id. `resync` replaces
+    the backlog with a "resync" event when the client is too far behind to catch up
+    here; it then reloads the latest page over GET.
+    """
+    last_id = after_id or 0
+    try:
+        if resync:
+            yield sse_event({"group_id": group_id}, event="resync")
+            backlog = ()
+        for message in backlog:
+            last_id = max(last_id, message["id"])
+            if include_messages:
+                yield sse_event(message, event="message")
+        yield sse_event({"group_id": group_id, "unread": unread}, event="unread")
+
+        while not subscription.overflowed:
+            item = subscription.get(timeout=heartbeat)
+            if item is None:
+                yield ": ping\n\n"  # keeps proxies from closing the idle connection
+                continue
+            event, payload = item
+            if event == "message":
+                if payload["id"] <= last_id:
+                    continue
+                last_id = payload["id"]
+                if include_messages:
+                    yield sse_event(payload, event="message")
+                if payload["user_id"] != user_id:
+                    unread += 1
+                    yield sse_event({"group_id": group_id, "unread": unread}, event="unread")
+            elif event == "read" and payload["user_id"] == user_id:
+                unread = 0
+                yield sse_event({"group_id": group_id, "unread": unread}, event="unread")
+    finally:
+        subscription.close()
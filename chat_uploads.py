@@ -0,0 +1,261 @@
+"""
+Chat attachment storage: streamed, size-limited, content-addressed, resumable.
+
+Files are copied from the request stream in CHUNK_SIZE pieces into a temp file,
+with a SHA-256 updated as they go. The finished file is moved to
+<root>/<h[:2]>/<h[2:4]>/<h><ext>. The same content is therefore stored once, and
+clients with different file names can no longer overwrite each other. The size
+limit is checked while copying, so an oversized body is never held in full.
+
+Resumable uploads keep their bytes in <root>/tmp/<upload_id>.part with a small JSON
+sidecar. A client PATCHes ranges at the current offset, asks for that offset with
+HEAD after a drop, and the file is stored like any other once the last byte arrives.
+
+Images also get a JPEG thumbnail next to them, <h>.thumb.jpg, for chat listings.
+A stored path never changes content, so it is served with its hash as a strong ETag
+and as immutable (see content_etag).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from collections import namedtuple
+
+from werkzeug.utils import secure_filename
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+THUMBNAIL_SIZE = 320
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+StoredFile = namedtuple("StoredFile", ["digest", "size", "relative_path", "deduplicated"])
+
+_CONTENT_PATH = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(\.thumb)?(\.[a-z0-9]+)?$")
+
+
+class UploadError(Exception):
+    status_code = 400
+
+
+class UploadNotFound(UploadError):
+    status_code = 404
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+class UploadOffsetMismatch(UploadError):
+    status_code = 409
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+def _extension(filename):
+    # Kept so clients can still tell images from other files by the URL
+    return os.path.splitext(secure_filename(filename or ""))[1].lower()[:16]
+
+
+def _tmp_dir(root):
+    path = os.path.join(root, "tmp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _copy_stream(stream, target, hasher, limit, chunk_size=CHUNK_SIZE):
+    """Copy up to `limit` bytes from `stream`; raises UploadTooLarge past it. Returns bytes copied."""
+    copied = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return copied
+        copied += len(chunk)
+        if copied > limit:
+            raise UploadTooLarge(f"upload exceeds {limit} bytes")
+        hasher.update(chunk)
+        target.write(chunk)
+
+
+def _commit_file(root, temp_path, digest, size, filename):
+    """Move a finished temp file to its content address, or drop it if that file exists."""
+    relative_path = "/".join((digest[:2], digest[2:4], digest + _extension(filename)))
+    final_path = os.path.join(root, *relative_path.split("/"))
+    if os.path.exists(final_path):
+        os.remove(temp_path)
+        return StoredFile(digest, size, relative_path, True)
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(temp_path, final_path)
+    return StoredFile(digest, size, relative_path, False)
+
+
+def content_etag(relative_path):
+    """Strong ETag for a content-addressed path (thumbnails get their own), None for legacy names."""
+    match = _CONTENT_PATH.match(relative_path)
+    if not match:
+        return None
+    return match.group(1) + (match.group(2) or "")
+
+
+def thumbnail_path(relative_path):
+    digest = content_etag(relative_path)
+    if digest is None or os.path.splitext(relative_path)[1].lower() not in IMAGE_EXTENSIONS:
+        return None
+    return "/".join((digest[:2], digest[2:4], digest + ".thumb.jpg"))
+
+
+def make_thumbnail(root, relative_path, size=THUMBNAIL_SIZE):
+    """
+    Write the downscaled JPEG of a stored image, if not there yet; returns its relative
+    path. None for non-images, unreadable images, or when Pillow is not installed.
+    """
+    target = thumbnail_path(relative_path)
+    if target is None:
+        return None
+    target_path = os.path.join(root, *target.split("/"))
+    if os.path.exists(target_path):
+        return target
+
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+
+    temp_path = os.path.join(_tmp_dir(root), f"{uuid.uuid4().hex}.thumb")
+    try:
+        with Image.open(os.path.join(root, *relative_path.split("/"))) as image:
+            image.draft("RGB", (size * 2, size * 2))  # JPEG: decode at a reduced scale
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+            image.convert("RGB").save(temp_path, "JPEG", quality=80, optimize=True)
+    except Exception as e:
+        print(f"⚠️ No thumbnail for {relative_path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None
+    os.replace(temp_path, target_path)
+    return target
+
+
+def store_stream(root, stream, filename, max_bytes=DEFAULT_MAX_UPLOAD_BYTES, chunk_size=CHUNK_SIZE):
+    """Store everything readable from `stream` under its content address. Returns a StoredFile."""
+    temp_path = os.path.join(_tmp_dir(root), f"{uuid.uuid4().hex}.upload")
+    hasher = hashlib.sha256()
+    try:
+        with open(temp_path, "wb") as target:
+            size = _copy_stream(stream, target, hasher, max_bytes, chunk_size)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return _commit_file(root, temp_path, hasher.hexdigest(), size, filename)
+
+
+class ResumableUploads:
+    """
+    Upload sessions under <root>/tmp. Hash state for a session stays in memory, so
+    consecutive PATCHes never re-read the file. After a restart, or a PATCH that
+    lands on another worker, the stored prefix is hashed once and hashing goes on
+    from there.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_UPLOAD_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._hashers = {}  # upload_id -> (offset, sha256 state)
+        self._active = set()  # uploads with a PATCH in progress
+        self._lock = threading.Lock()
+
+    def _paths(self, upload_id):
+        if not upload_id.isalnum():
+            raise UploadError("invalid upload id")
+        base = os.path.join(_tmp_dir(self.root), upload_id)
+        return base + ".part", base + ".json"
+
+    def create(self, size, filename, metadata=None):
+        """Start a session for `size` bytes; returns its id. `metadata` is kept for completion."""
+        if size < 0:
+            raise UploadError("size must not be negative")
+        if size > self.max_bytes:
+            raise UploadTooLarge(f"upload exceeds {self.max_bytes} bytes")
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = self._paths(upload_id)
+        open(part_path, "wb").close()
+        with open(meta_path, "w") as meta_file:
+            json.dump({"size": size, "filename": filename, "metadata": metadata or {}}, meta_file)
+        return upload_id
+
+    def info(self, upload_id):
+        """{"size", "filename", "metadata", "offset"}, or None for an unknown id."""
+        part_path, meta_path = self._paths(upload_id)
+        try:
+            with open(meta_path) as meta_file:
+                info = json.load(meta_file)
+            info["offset"] = os.path.getsize(part_path)
+        except FileNotFoundError:
+            return None
+        return info
+
+    def _hasher_at(self, upload_id, part_path, offset):
+        with self._lock:
+            cached = self._hashers.pop(upload_id, None)
+        if cached and cached[0] == offset:
+            return cached[1]
+        hasher = hashlib.sha256()
+        with open(part_path, "rb") as part:
+            for chunk in iter(lambda: part.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher
+
+    def append(self, upload_id, offset, stream, chunk_size=CHUNK_SIZE):
+        """
+        Append the bytes of `stream` at `offset`, which must equal the current offset.
+        Returns (new offset, StoredFile once the upload is complete else None).
+        """
+        info = self.info(upload_id)
+        if info is None:
+            raise UploadNotFound("unknown upload")
+        if offset != info["offset"]:
+            raise UploadOffsetMismatch(f"expected offset {info['offset']}", info["offset"])
+
+        with self._lock:
+            if upload_id in self._active:
+                raise UploadOffsetMismatch("another request is writing this upload", info["offset"])
+            self._active.add(upload_id)
+        try:
+            return self._append(upload_id, info, stream, chunk_size)
+        finally:
+            with self._lock:
+                self._active.discard(upload_id)
+
+    def _append(self, upload_id, info, stream, chunk_size):
+        part_path, meta_path = self._paths(upload_id)
+        offset = info["offset"]
+        hasher = self._hasher_at(upload_id, part_path, offset)
+        with open(part_path, "ab") as part:
+            try:
+                # A dropped connection keeps what was written; the next PATCH resumes there
+                offset += _copy_stream(stream, part, hasher, info["size"] - offset, chunk_size)
+            except UploadTooLarge:
+                # Nothing from a request that overruns the declared size is kept
+                part.truncate(info["offset"])
+                raise UploadTooLarge(f"upload is declared as {info['size']} bytes")
+
+        if offset < info["size"]:
+            with self._lock:
+                self._hashers[upload_id] = (offset, hasher)
+            return offset, None
+
+        stored = _commit_file(self.root, part_path, hasher.hexdigest(), offset, info["filename"])
+        os.remove(meta_path)
+        return offset, stored
+
+    def discard(self, upload_id):
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+        for path in self._paths(upload_id):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,115 @@
+"""
+Maintenance commands, run with the Flask CLI:
+
+    flask --app app migrate-availability
+    flask --app app create-indexes
+    flask --app app backfill-read-markers
+    flask --app app migrate-chat-thumbnails
+    flask --app app rebuild-analytics-rollups
+    flask --app app audit-queries
+"""
+import click
+
+
+def remove_duplicate_rows(table, columns):
+    """Delete rows repeating another row's `columns`, keeping the lowest id; returns how many went."""
+    from sqlalchemy import func, select
+    from extensions import db
+
+    (key,) = table.primary_key.columns
+    # Wrapped in a derived table, which MySQL needs to delete from the table it selects from
+    keep = select(func.min(key).label("id")).group_by(*columns).subquery()
+    result = db.session.execute(table.delete().where(key.not_in(select(keep.c.id))))
+    db.session.commit()
+    return result.rowcount
+
+
+def create_missing_indexes():
+    """
+    Create every index declared on the models that the database does not have yet; returns
+    their names. Duplicates are removed before a unique index is created (see remove_duplicate_rows).
+    """
+    from sqlalchemy import inspect
+    from extensions import db
+
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name, schema=table.schema):
+            continue  # db.create_all() creates new tables together with their indexes
+        existing = {index["name"] for index in inspector.get_indexes(table.name, schema=table.schema)}
+        for index in table.indexes:
+            if index.name not in existing:
+                if index.unique:
+                    removed = remove_duplicate_rows(table, list(index.columns))
+                    if removed:
+                        print(f"🧹 Removed {removed} duplicate rows from {table.name} for {index.name}")
+                index.create(db.engine)
+                created.append(index.name)
+    return created
+
+
+def register_commands(app):
+
+    @app.cli.command("migrate-availability")
+    def migrate_availability_command():
+        """Copy UserFreeSchedule's comma-joined ranges into UserAvailability rows."""
+        from availability import migrate_free_schedule_strings
+        count = migrate_free_schedule_strings()
+        click.echo(f"{count} schedules migrated")
+
+    @app.cli.command("create-indexes")
+    def create_indexes_command():
+        """Add indexes declared in models.py to existing tables."""
+        created = create_missing_indexes()
+        click.echo(f"Created {len(created)} indexes: {', '.join(created) or '-'}")
+
+    @app.cli.command("backfill-read-markers")
+    def backfill_read_markers_command():
+        """Fill GroupMessageReads.last_read_message_id from last_read_time on older rows."""
+        from group_chat import backfill_read_markers
+        count = backfill_read_markers()
+        click.echo(f"{count} read markers backfilled")
+
+    @app.cli.command("migrate-chat-thumbnails")
+    def migrate_chat_thumbnails_command():
+        """Add GroupMessages.thumbnail_url and create thumbnails for stored images."""
+        from group_chat import migrate_chat_thumbnails
+        count = migrate_chat_thumbnails(app.config["CHAT_UPLOADS"].root)
+        click.echo(f"{count} thumbnails created")
+
+    @app.cli.command("rebuild-analytics-rollups")
+    def rebuild_analytics_rollups_command():
+        """Recompute PersonalTaskRollups from PersonalTasks (first deploy, or after bulk edits)."""
+        from analytics import rebuild_rollups
+        count = rebuild_rollups()
+        click.echo(f"{count} rollup rows written")
+
+    @app.cli.command("audit-queries")
+    @click.option("--database-uri", default="sqlite:///:memory:",
+                  help="Throwaway database to seed (SQLite or PostgreSQL); its tables are recreated.")
+    @click.option("--scale", default=1.0, help="Multiplier for the size of the seeded dataset.")
+    def audit_queries_command(database_uri, scale):
+        """EXPLAIN the read routes' queries on a seeded local database and list full table scans."""
+        from query_audit import audit_routes, seed_audit_data
+        from testing_utils import make_test_app
+
+        audit_app = make_test_app(database_uri)
+        with audit_app.app_context():
+            from extensions import db
+            db.drop_all()
+            db.create_all()
+            ids = seed_audit_data(users=int(200 * scale), personal_tasks=int(20000 * scale),
+                                  groups=int(100 * scale), group_tasks=int(5000 * scale),
+                                  messages=int(20000 * scale))
+            results = audit_routes(audit_app.test_client(), ids)
+
+        flagged = [result for result in results if result.full_scans]
+        for result in flagged:
+            click.echo(f"⚠️ {result.route}: full scan of {', '.join(result.full_scans)}")
+            click.echo("    " + " ".join(result.statement.split())[:200])
+            click.echo("    " + " | ".join(result.plan))
+        click.echo(f"{len(results)} queries from {len({r.route for r in results})} routes, "
+                   f"{len(flagged)} with full scans")
+        if flagged:
+            raise SystemExit(1)
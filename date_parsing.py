@@ -0,0 +1,76 @@
+"""
+Datetime parsing shared by the routes and the AI layer.
+
+Task deadlines reach us in a handful of string formats (model to_dict(), ISO strings
+from the app, "...Z" strings from JavaScript). Instead of trying every strptime format
+on every value, the parser for a given string shape is found once and memoized, and
+datetime.fromisoformat() (implemented in C) handles every ISO shape.
+"""
+from datetime import date, datetime, timezone
+
+# Formats that fromisoformat() does not cover; tried in order for an unknown shape
+FALLBACK_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S.%fZ',          # more than 6 fractional digits are rejected by fromisoformat
+    '%a, %d %b %Y %H:%M:%S GMT',      # Flask's JSON encoding of datetimes
+]
+
+# Every digit maps to "0", so "2025-04-01 10:00:00" and "2024-12-31 23:59:59" share a shape
+_SHAPE = str.maketrans("123456789", "000000000")
+_ISO = "iso"
+_parsers_by_shape = {}
+MAX_CACHED_SHAPES = 256
+
+
+def _from_iso(value):
+    if value.endswith("Z"):
+        # Already UTC; skip the aware round trip
+        return datetime.fromisoformat(value[:-1])
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # Deadlines are stored and compared as naive UTC
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _detect_parser(value):
+    try:
+        _from_iso(value)
+        return _ISO
+    except ValueError:
+        pass
+    for fmt in FALLBACK_FORMATS:
+        try:
+            datetime.strptime(value, fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+
+def parse_datetime_value(value):
+    """
+    Return a naive (UTC) datetime for `value`, or None when it is empty or unparseable.
+    datetime objects pass through unchanged and dates become midnight.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if not value or not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    shape = value.translate(_SHAPE)
+    parser = _parsers_by_shape.get(shape)
+    if parser is None:
+        # Only successful detections are memoized: "2025-13-01" must not poison its shape
+        parser = _detect_parser(value)
+        if parser is None:
+            return None
+        if len(_parsers_by_shape) < MAX_CACHED_SHAPES:
+            _parsers_by_shape[shape] = parser
+    try:
+        # A shape can still hold an invalid value ("2025-02-30")
+        return _from_iso(value) if parser is _ISO else datetime.strptime(value, parser)
+    except ValueError:
+        return None
@@ -0,0 +1,138 @@
+"""
+Weekly free time as sorted minute intervals, for the schedule generator.
+
+A user's availability arrives as (start_minute, end_minute) intervals per weekday
+(see availability.py), or as "09:00-12:00,14:30-16:00" strings that parse_time_ranges()
+turns into them. Overlapping and touching ranges are merged, and each interval is kept
+whole instead of being expanded into one-hour slots. Allocation always takes the earliest interval that can hold a chunk and trims
+it from the front. A max-length segment tree finds that interval in O(log n), so
+scheduling cost grows with the number of chunks placed, not with the free time
+available.
+"""
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_clock(value):
+    """"HH:MM" -> minutes after midnight; "24:00" is accepted as the end of the day."""
+    hours, minutes = value.strip().split(":")
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"invalid time {value!r}")
+    return hours * 60 + minutes
+
+
+def format_clock(minute_of_day):
+    return f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+
+
+def hourly_slots(start, end):
+    """Split (start, end) at the hour into the app's "H:MM-H:MM" slot strings (unpadded hours)."""
+    slots = []
+    while start < end:
+        slot_end = min((start // 60 + 1) * 60, end)
+        slots.append(f"{start // 60}:{start % 60:02d}-{slot_end // 60}:{slot_end % 60:02d}")
+        start = slot_end
+    return slots
+
+
+def parse_time_ranges(time_ranges):
+    """Parse "HH:MM-HH:MM,..." into a list of (start, end) minute pairs, skipping bad entries."""
+    if not time_ranges:
+        return []
+    return parse_range_list(time_ranges.split(","))
+
+
+def parse_range_list(time_ranges):
+    """Parse a list of "HH:MM-HH:MM" strings into (start, end) minute pairs, skipping bad entries."""
+    intervals = []
+    for time_range in time_ranges:
+        time_range = str(time_range).strip()
+        if not time_range:
+            continue
+        try:
+            start_str, end_str = time_range.split("-")
+            start, end = parse_clock(start_str), parse_clock(end_str)
+        except ValueError as ve:
+            print(f"⚠️ Invalid time format: {time_range} -> {ve}")
+            continue
+        if end > start:
+            intervals.append((start, end))
+    return intervals
+
+
+def merge_intervals(intervals):
+    """Sort and merge overlapping or touching (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class FreeTimeline:
+    """
+    Free intervals for one week, in day order (Sunday first), earliest first.
+
+        timeline = FreeTimeline(availability_by_user([user_id])[user_id])
+        chunk = timeline.allocate(60)   # -> ("Monday", 540, 600) or None
+    """
+
+    def __init__(self, intervals_by_day):
+        self._days = []
+        self._starts = []
+        self._ends = []
+        for day in DAYS:
+            # Merged per day: a chunk never runs past midnight into the next day
+            for start, end in merge_intervals(intervals_by_day.get(day, [])):
+                self._days.append(day)
+                self._starts.append(start)
+                self._ends.append(end)
+
+        self._size = 1
+        while self._size < len(self._starts):
+            self._size *= 2
+        # _tree[1] is the root; leaves start at _size and hold interval lengths
+        self._tree = [0] * (2 * self._size)
+        for index, (start, end) in enumerate(zip(self._starts, self._ends)):
+            self._tree[self._size + index] = end - start
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    @property
+    def free_minutes(self):
+        return sum(self._tree[self._size:])
+
+    def intervals(self):
+        """Remaining free time as {day: [(start, end), ...]}."""
+        remaining = {day: [] for day in DAYS}
+        for day, start, end in zip(self._days, self._starts, self._ends):
+            if end > start:
+                remaining[day].append((start, end))
+        return remaining
+
+    def allocate(self, minutes):
+        """
+        Reserve `minutes` at the start of the earliest interval long enough to hold them.
+        Returns (day, start, end) or None when no interval is long enough.
+        """
+        if minutes <= 0 or self._tree[1] < minutes:
+            return None
+
+        node = 1
+        while node < self._size:
+            # Leftmost child that still fits gives the earliest interval
+            node = 2 * node if self._tree[2 * node] >= minutes else 2 * node + 1
+        index = node - self._size
+
+        start = self._starts[index]
+        self._starts[index] = start + minutes
+        self._tree[node] -= minutes
+        node //= 2
+        while node:
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+        return self._days[index], start, start + minutes
@@ -0,0 +1,129 @@
+"""
+Group chat reads with keyset pagination.
+
+Pages are keyed on the message id, so a query seeks the (group_id, id) index and
+never scans or skips history:
+    after_id=X   messages newer than X, oldest first (the polling / sync mode)
+    before_id=X  the `limit` messages just before X (scrolling back)
+    neither      the latest `limit` messages
+Usernames come from the same query through an outer join, not one lazy load per message.
+
+Read state is the id of the last message a member has seen (GroupMessageRead.
+last_read_message_id). Unread counts are then id range seeks on the same index.
+"""
+from sqlalchemy import func, inspect, text
+
+from extensions import db
+from chat_uploads import make_thumbnail
+from models import Group, GroupMessage, GroupMessageRead, User, group_user_association
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def serialize_message(message, username):
+    return {
+        "id": message.id,
+        "group_id": message.group_id,
+        "user_id": message.user_id,
+        "username": username or "Unknown",
+        "content": message.content,
+        "file_url": message.file_url,
+        "thumbnail_url": message.thumbnail_url,
+        "timestamp": message.timestamp.isoformat() if message.timestamp else None,
+    }
+
+
+def message_page(group_id, before_id=None, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return (messages, has_more): serialized messages in ascending id order. has_more
+    says whether further messages exist in the paging direction (older for
+    before_id/latest, newer for after_id).
+    """
+    query = db.session.query(GroupMessage, User.username).outerjoin(
+        User, User.userId == GroupMessage.user_id
+    ).filter(GroupMessage.group_id == group_id)
+
+    # One extra row tells whether another page exists
+    if after_id is not None:
+        rows = query.filter(GroupMessage.id > after_id).order_by(GroupMessage.id.asc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    else:
+        if before_id is not None:
+            query = query.filter(GroupMessage.id < before_id)
+        rows = query.order_by(GroupMessage.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit][::-1]
+
+    return [serialize_message(message, username) for message, username in rows], has_more
+
+
+def unread_counts(user_id, group_ids=None):
+    """
+    {group_id: unread} for every group the user created or belongs to (or only
+    `group_ids`), in one grouped query. Unread means messages from other members after
+    the user's last read message id. Groups with nothing unread are included with 0.
+    """
+    member_group_ids = db.session.query(group_user_association.c.group_id).filter(
+        group_user_association.c.user_id == user_id
+    )
+    last_read_id = func.coalesce(GroupMessageRead.last_read_message_id, 0)
+    query = db.session.query(Group.id, func.count(GroupMessage.id)).outerjoin(
+        GroupMessageRead, (GroupMessageRead.group_id == Group.id) & (GroupMessageRead.user_id == user_id)
+    ).outerjoin(
+        GroupMessage, (GroupMessage.group_id == Group.id) & (GroupMessage.id > last_read_id)
+        & (GroupMessage.user_id != user_id)
+    ).filter(
+        db.or_(Group.created_by == user_id, Group.id.in_(member_group_ids))
+    )
+    if group_ids is not None:
+        query = query.filter(Group.id.in_(list(group_ids)))
+    return dict(query.group_by(Group.id).order_by(Group.id).all())
+
+
+def latest_message_id(group_id):
+    return db.session.query(func.max(GroupMessage.id)).filter(GroupMessage.group_id == group_id).scalar()
+
+
+def backfill_read_markers():
+    """
+    Set last_read_message_id on read rows written before it was maintained, from their
+    last_read_time, in one UPDATE. Returns the number of rows updated.
+    """
+    latest_seen = db.session.query(func.max(GroupMessage.id)).filter(
+        GroupMessage.group_id == GroupMessageRead.group_id,
+        GroupMessage.timestamp <= GroupMessageRead.last_read_time
+    ).scalar_subquery()
+    updated = GroupMessageRead.query.filter(
+        GroupMessageRead.last_read_message_id.is_(None),
+        GroupMessageRead.last_read_time.isnot(None)
+    ).update({GroupMessageRead.last_read_message_id: latest_seen}, synchronize_session=False)
+    db.session.commit()
+    return updated
+
+
+def migrate_chat_thumbnails(upload_root):
+    """
+    Add GroupMessages.thumbnail_url when missing, then create thumbnails for image
+    messages stored by content hash that have none yet. Safe to run again.
+    Returns the number of messages updated.
+    """
+    columns = {column["name"] for column in inspect(db.engine).get_columns("GroupMessages")}
+    if "thumbnail_url" not in columns:
+        print("🛠 Adding GroupMessages.thumbnail_url...")
+        db.session.execute(text("ALTER TABLE GroupMessages ADD thumbnail_url VARCHAR(255) NULL"))
+        db.session.commit()
+
+    updated = 0
+    messages = GroupMessage.query.filter(
+        GroupMessage.file_url.isnot(None), GroupMessage.thumbnail_url.is_(None)
+    ).all()
+    for message in messages:
+        thumbnail = make_thumbnail(upload_root, message.file_url.removeprefix("/uploads/"))
+        if thumbnail:
+            message.thumbnail_url = f"/uploads/{thumbnail}"
+            updated += 1
+    db.session.commit()
+    print(f"✅ Added thumbnails to {updated} messages")
+    return updated
@@ -1,5 +1,6 @@
 from datetime import datetime
 from extensions import db
+from free_time import hourly_slots
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.dialects.mssql import NVARCHAR
 from sqlalchemy import Unicode, UnicodeText  
@@ -52,6 +53,13 @@ class PersonalTask(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
+    __table_args__ = (
+        # Analytics read a user's Done tasks by completion time (see analytics.py)
+        db.Index('IX_PersonalTasks_User_Status_ActualTime', 'user_id', 'status', 'actual_time'),
+        # /tasks/dates: a user's tasks in a due date range
+        db.Index('IX_PersonalTasks_User_DueDate', 'user_id', 'due_date'),
+    )
+
     def to_dict(self):
         time_taken = None
         formatted_time = None
@@ -82,6 +90,26 @@ class PersonalTask(db.Model):
             "time_taken": formatted_time if formatted_time else None  
         }
     
+class PersonalTaskRollup(db.Model):
+    """A user's Done personal tasks in one (year, month, category); year/month are 0 without actual_time."""
+    __tablename__ = 'PersonalTaskRollups'
+    __table_args__ = (
+        # Also the index the analytics read a user's rollup rows by
+        db.UniqueConstraint('user_id', 'year', 'month', 'category', name='uq_rollup_user_month_category'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('Users.userId'), nullable=False)
+    year = db.Column(db.SmallInteger, nullable=False)
+    month = db.Column(db.SmallInteger, nullable=False)
+    category = db.Column(Unicode(100), nullable=False)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    on_time = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    duration_seconds = db.Column(db.Float, nullable=False, default=0)  # over tasks with start and actual time
+    timed = db.Column(db.Integer, nullable=False, default=0)
+
+
 class Task(db.Model):
     __tablename__ = 'Tasks'
     taskId = db.Column(db.Integer, primary_key=True)
@@ -97,14 +125,20 @@ group_user_association = db.Table(
     'group_user_association',
     db.Column('id', db.Integer, primary_key=True),
     db.Column('group_id', db.Integer, db.ForeignKey('Groups.id', ondelete='CASCADE')),
-    db.Column('user_id', db.Integer, db.ForeignKey('Users.userId', ondelete='CASCADE'))
+    db.Column('user_id', db.Integer, db.ForeignKey('Users.userId', ondelete='CASCADE')),
+    # One row per membership; the unique index also serves a group's member lookups
+    db.Index('UQ_group_user_association_Group_User', 'group_id', 'user_id', unique=True),
+    db.Index('IX_group_user_association_User_Group', 'user_id', 'group_id'),
 )
 
 task_user_association = db.Table(
     'task_user_association',
     db.Column('id', db.Integer, primary_key=True),
     db.Column('task_id', db.Integer, db.ForeignKey('GroupTasks.id', ondelete='CASCADE')),
-    db.Column('user_id', db.Integer, db.ForeignKey('Users.userId', ondelete='CASCADE'))
+    db.Column('user_id', db.Integer, db.ForeignKey('Users.userId', ondelete='CASCADE')),
+    # One row per assignment; the unique index also serves a task's assignee lookups
+    db.Index('UQ_task_user_association_Task_User', 'task_id', 'user_id', unique=True),
+    db.Index('IX_task_user_association_User_Task', 'user_id', 'task_id'),
 )
 
 class Group(db.Model):
@@ -114,6 +148,11 @@ class Group(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('Users.userId', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
+    __table_args__ = (
+        # /groups?created_by= and the creator half of /groups/user/<id>
+        db.Index('IX_Groups_CreatedBy', 'created_by'),
+    )
+
     members = db.relationship(
         'User',
         secondary=group_user_association,
@@ -122,14 +161,15 @@ class Group(db.Model):
 
     tasks = db.relationship('GroupTask', backref='group', lazy=True)
 
-    def to_dict(self):
+    def to_dict(self, member_ids=None, task_ids=None):
+        # member_ids/task_ids can be prefetched in bulk (see serializers.py) to avoid lazy loads
         return {
             "id": self.id,
             "name": self.name,
             "created_by": self.created_by,
             "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
-            "members": [user.userId for user in self.members],
-            "tasks": [task.id for task in self.tasks]
+            "members": member_ids if member_ids is not None else [user.userId for user in self.members],
+            "tasks": task_ids if task_ids is not None else [task.id for task in self.tasks]
         }
 
 class GroupTask(db.Model):
@@ -145,14 +185,20 @@ class GroupTask(db.Model):
     category = db.Column(db.String(100), default="General") 
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
-    
+
+    __table_args__ = (
+        # A group's tasks, optionally by status
+        db.Index('IX_GroupTasks_Group_Status', 'group_id', 'status'),
+    )
+
     assigned_users = db.relationship(
         'User',
         secondary=task_user_association,
         backref=db.backref('assigned_tasks', lazy='dynamic')
     )
 
-    def to_dict(self):
+    def to_dict(self, assigned_user_ids=None):
+        # assigned_user_ids can be prefetched in bulk (see serializers.py) to avoid a lazy load
         return {
             "id": self.id,
             "title": self.title,
@@ -165,7 +211,7 @@ class GroupTask(db.Model):
             "category": self.category,
             "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
             "updated_at": self.updated_at.strftime("%Y-%m-%d %H:%M:%S") if self.updated_at else None,
-            "assigned_users": [user.userId for user in self.assigned_users]
+            "assigned_users": assigned_user_ids if assigned_user_ids is not None else [user.userId for user in self.assigned_users]
         }
 
 
@@ -180,6 +226,7 @@ class UserFreeSchedule(db.Model):
 
     schedule_id = db.Column("ScheduleID", db.Integer, primary_key=True)
     user_id = db.Column("UserID", db.Integer, db.ForeignKey('Users.userId'), nullable=False)
+    # Legacy comma-joined ranges, read only by `flask migrate-availability`; see UserAvailability
     sunday = db.Column("Sunday", db.String(255), nullable=True)
     monday = db.Column("Monday", db.String(255), nullable=True)
     tuesday = db.Column("Tuesday", db.String(255), nullable=True)
@@ -187,24 +234,48 @@ class UserFreeSchedule(db.Model):
     thursday = db.Column("Thursday", db.String(255), nullable=True)
     friday = db.Column("Friday", db.String(255), nullable=True)
     saturday = db.Column("Saturday", db.String(255), nullable=True)
+    # Kept up to date by availability.save_availability()
+    weekly_free_minutes = db.Column("WeeklyFreeMinutes", db.Integer, nullable=False, default=0, server_default="0")
     created_at = db.Column("CreatedAt", db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column("UpdatedAt", db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
-    def to_dict(self):
+    def to_dict(self, availability=None):
+        # availability: [UserAvailability] for this user; pass it in to skip the query
+        if availability is None:
+            availability = UserAvailability.query.filter_by(user_id=self.user_id).order_by(
+                UserAvailability.weekday, UserAvailability.start_minute).all()
+        ranges = {day: [] for day in WEEKDAY_NAMES}
+        for slot in availability:
+            # The app lists and toggles one-hour "8:00-9:00" slots, so merged rows go back out split by hour
+            ranges[WEEKDAY_NAMES[slot.weekday]].extend(hourly_slots(slot.start_minute, slot.end_minute))
         return {
             "userID": self.user_id,  # Use self.user_id
-            "sunday": self.sunday.split(",") if self.sunday else [],
-            "monday": self.monday.split(",") if self.monday else [],
-            "tuesday": self.tuesday.split(",") if self.tuesday else [],
-            "wednesday": self.wednesday.split(",") if self.wednesday else [],
-            "thursday": self.thursday.split(",") if self.thursday else [],
-            "friday": self.friday.split(",") if self.friday else [],
-            "saturday": self.saturday.split(",") if self.saturday else [],
+            **ranges,
+            "weeklyFreeMinutes": self.weekly_free_minutes,
             "createdAt": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
             "updatedAt": self.updated_at.strftime("%Y-%m-%d %H:%M:%S") if self.updated_at else None
         }
 
 
+# Weekday index used by UserAvailability (0 = Sunday, matching the UI's week)
+WEEKDAY_NAMES = ["sunday", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday"]
+
+
+class UserAvailability(db.Model):
+    """One free time range of a user's week, in minutes after midnight."""
+    __tablename__ = 'UserAvailability'
+    __table_args__ = (
+        db.Index("IX_UserAvailability_User_Weekday", "UserID", "Weekday", "StartMinute"),
+        {'schema': 'dbo'},
+    )
+
+    id = db.Column("AvailabilityID", db.Integer, primary_key=True)
+    user_id = db.Column("UserID", db.Integer, db.ForeignKey('Users.userId'), nullable=False)
+    weekday = db.Column("Weekday", db.SmallInteger, nullable=False)
+    start_minute = db.Column("StartMinute", db.SmallInteger, nullable=False)
+    end_minute = db.Column("EndMinute", db.SmallInteger, nullable=False)
+
+
 class UserSchedule(db.Model):
     __tablename__ = 'UserSchedule'
     __table_args__ = {'schema': 'dbo'}  # ensure it's created in the right schema
@@ -232,10 +303,18 @@ class GroupMessage(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('Users.userId'), nullable=False)
     content = db.Column(db.Text, nullable=True)  # <--- ensure this is nullable
     file_url = db.Column(db.String(255), nullable=True)
+    thumbnail_url = db.Column(db.String(255), nullable=True)  # downscaled image for chat listings
     timestamp = db.Column(db.DateTime, default=db.func.current_timestamp())
 
     user = db.relationship('User')  # ✅ so we can do `m.user.username`
 
+    __table_args__ = (
+        # Keyset pagination of a group's chat seeks on (group_id, id)
+        db.Index('IX_GroupMessages_Group_Id', 'group_id', 'id'),
+        # Latest message time of a group, and read markers by time (backfill-read-markers)
+        db.Index('IX_GroupMessages_Group_Timestamp', 'group_id', 'timestamp'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -244,6 +323,7 @@ class GroupMessage(db.Model):
             "username": self.user.username if self.user else "Unknown",
             "content": self.content,
             "file_url": self.file_url,
+            "thumbnail_url": self.thumbnail_url,
             "timestamp": self.timestamp.strftime("%Y-%m-%d %H:%M:%S") if self.timestamp else None
         }
     
@@ -0,0 +1,166 @@
+"""
+Query-plan audit for the read routes.
+
+seed_audit_data() fills a local database with synthetic users, groups, tasks and chat
+messages. audit_routes() requests each path in AUDITED_ROUTES through the test client
+and records every SELECT the route runs. Each one is then put through the database's
+EXPLAIN, and every table read in full is flagged. A table is read in full when SQLite
+plans "SCAN <table>" or PostgreSQL plans "Seq Scan on <table>".
+
+Run it with `flask --app app audit-queries` (see commands.py), or from a benchmark.
+"""
+import random
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from extensions import db
+from models import (Group, GroupMessage, GroupMessageRead, GroupTask, PersonalTask, User,
+                    group_user_association, task_user_association)
+from serializers import chunked
+
+# Read routes of the app and task screens, filled in with ids from seed_audit_data()
+AUDITED_ROUTES = [
+    "/tasks/user/{user_id}",
+    "/groups?created_by={user_id}",
+    "/groups/user/{user_id}",
+    "/groups/{group_id}/tasks",
+    "/groups/{group_id}/members",
+    "/group-tasks/user/{user_id}",
+    "/groups/{group_id}/chat?user_id={user_id}",
+    "/groups/{group_id}/chat/unread/{user_id}",
+    "/chat/unread/{user_id}",
+    "/api/data/dashboard/{user_id}",
+    "/api/data/completion_rate_chart?user_id={user_id}&format=json",
+]
+
+AuditedQuery = namedtuple("AuditedQuery", ["route", "statement", "plan", "full_scans"])
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_POSTGRES_SCAN = re.compile(r'Seq Scan on "?(\w+)"?')
+
+
+def seed_audit_data(users=200, personal_tasks=20000, groups=100, group_tasks=5000, messages=20000,
+                    members_per_group=8, seed=1):
+    """Bulk insert a synthetic dataset; returns {"user_id", "group_id"} for the audited routes."""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+
+    def insert(table, rows):
+        for chunk in chunked(rows, 5000):
+            db.session.execute(table.insert(), chunk)
+
+    insert(User.__table__, [{"userId": i, "username": f"user{i}", "email": f"user{i}@example.com"}
+                            for i in range(1, users + 1)])
+    insert(Group.__table__, [{"id": i, "name": f"group{i}", "created_by": rng.randint(1, users)}
+                             for i in range(1, groups + 1)])
+    memberships = {(group_id, user_id) for group_id in range(1, groups + 1)
+                   for user_id in rng.sample(range(1, users + 1), min(members_per_group, users))}
+    insert(group_user_association, [{"group_id": g, "user_id": u} for g, u in sorted(memberships)])
+    members = {}
+    for group_id, user_id in memberships:
+        members.setdefault(group_id, []).append(user_id)
+
+    statuses = ["To Do", "In Progress", "Done", "Done"]
+    personal_rows = []
+    for i in range(1, personal_tasks + 1):
+        due = start + timedelta(hours=rng.randrange(24 * 730))
+        done = rng.random() < 0.5
+        personal_rows.append({
+            "id": i, "title": f"task{i}", "priority": rng.randint(1, 4), "user_id": rng.randint(1, users),
+            "status": "Done" if done else rng.choice(statuses[:2]), "category": rng.choice(["Work", "Study"]),
+            "due_date": due, "deadline": due, "start_time": due - timedelta(hours=5),
+            "actual_time": due - timedelta(hours=rng.randint(-3, 4)) if done else None,
+        })
+    insert(PersonalTask.__table__, personal_rows)
+
+    assignments = set()
+    group_task_rows = []
+    for i in range(1, group_tasks + 1):
+        group_id = rng.randint(1, groups)
+        group_task_rows.append({"id": i, "title": f"group task{i}", "group_id": group_id, "priority": 2,
+                                "status": rng.choice(statuses), "due_date": start + timedelta(days=i % 700)})
+        for user_id in rng.sample(members[group_id], min(2, len(members[group_id]))):
+            assignments.add((i, user_id))
+    insert(GroupTask.__table__, group_task_rows)
+    insert(task_user_association, [{"task_id": t, "user_id": u} for t, u in sorted(assignments)])
+
+    message_groups = [rng.randint(1, groups) for _ in range(messages)]
+    insert(GroupMessage.__table__, [
+        {"id": i, "group_id": group_id, "user_id": rng.choice(members[group_id]), "content": f"message {i}",
+         "timestamp": start + timedelta(minutes=i)}
+        for i, group_id in enumerate(message_groups, start=1)
+    ])
+    insert(GroupMessageRead.__table__, [
+        {"user_id": user_id, "group_id": group_id, "last_read_message_id": messages // 2,
+         "last_read_time": start + timedelta(minutes=messages // 2)}
+        for group_id, user_id in sorted(memberships)
+    ])
+    db.session.commit()
+
+    from analytics import rebuild_rollups
+    rebuild_rollups()
+
+    group_id = 1
+    return {"user_id": members[group_id][0], "group_id": group_id}
+
+
+def explain(connection, statement, parameters):
+    """The plan of one captured statement as text lines."""
+    dialect = connection.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise NotImplementedError(f"no EXPLAIN support for {dialect}")
+    cursor = connection.connection.cursor()
+    try:
+        prefix = "EXPLAIN "
+        if dialect == "sqlite":
+            # sqlite3 caches statements by text and would replay the plan from before an index
+            # change; the schema version in the text keeps the plan current
+            cursor.execute("PRAGMA schema_version")
+            prefix = f"EXPLAIN QUERY PLAN /* schema {cursor.fetchone()[0]} */ "
+        cursor.execute(prefix + statement, parameters)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def full_scans(plan, dialect, tables):
+    """Names from `tables` that `plan` reads in full."""
+    pattern = _SQLITE_SCAN if dialect == "sqlite" else _POSTGRES_SCAN
+    scanned = []
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match and match.group(1) in tables and match.group(1) not in scanned:
+            scanned.append(match.group(1))
+    return scanned
+
+
+def audit_routes(client, ids, routes=AUDITED_ROUTES):
+    """Request every route and EXPLAIN the SELECTs it ran; returns AuditedQuerys in order."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((route, statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for route_template in routes:
+            route = route_template.format(**ids)
+            response = client.get(route)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{route} answered {response.status_code}")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    tables = set(db.metadata.tables)
+    results = []
+    with engine.connect() as connection:
+        for route, statement, parameters in captured:
+            plan = explain(connection, statement, parameters)
+            results.append(AuditedQuery(route, statement, plan,
+                                        full_scans(plan, engine.dialect.name, tables)))
+    return results
@@ -0,0 +1,95 @@
+"""
+Deadline-aware scheduling for /ai/generate-schedule (solver="edf").
+
+The weekly free time is laid out over the next seven dates starting today, and cut
+into equal chunks in chronological order. Tasks are then handled earliest deadline
+first, with a lookahead that works like Moore-Hodgson. When the tasks accepted so far
+no longer fit before the current deadline, the least important one (highest priority
+number, then most hours) is set aside. Everything that is kept meets its deadline.
+Tasks set aside get whatever time is left, after their deadline, or stay unassigned.
+"""
+import heapq
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from free_time import DAYS
+
+SOLVERS = ("greedy", "edf")
+
+Chunk = namedtuple("Chunk", ["day", "start_minute", "starts_at", "ends_at"])
+SolverTask = namedtuple("SolverTask", ["key", "chunks", "deadline", "priority"])
+
+
+def dated_chunks(intervals_by_day, slot_minutes, start):
+    """
+    Chronological Chunks of `slot_minutes` over the 7 days beginning at `start`'s date.
+    `intervals_by_day` is FreeTimeline.intervals(); chunks already past `start` are skipped.
+    """
+    chunks = []
+    midnight = datetime(start.year, start.month, start.day)
+    for offset in range(7):
+        day_start = midnight + timedelta(days=offset)
+        day = DAYS[(day_start.weekday() + 1) % 7]  # weekday() counts from Monday, DAYS from Sunday
+        for interval_start, interval_end in intervals_by_day.get(day, []):
+            minute = interval_start
+            while minute + slot_minutes <= interval_end:
+                starts_at = day_start + timedelta(minutes=minute)
+                if starts_at >= start:
+                    chunks.append(Chunk(day, minute, starts_at, starts_at + timedelta(minutes=slot_minutes)))
+                minute += slot_minutes
+    return chunks
+
+
+def solve_edf(tasks, chunks):
+    """
+    Assign `chunks` (chronological) to `tasks` (SolverTasks, most important first on ties).
+    Returns ({task.key: [chunk, ...]}, set of keys that were set aside by the lookahead).
+    """
+    chunk_ends = [chunk.ends_at for chunk in chunks]
+    order = sorted(range(len(tasks)), key=lambda i: (tasks[i].deadline is None, tasks[i].deadline or datetime.max,
+                                                     tasks[i].priority, i))
+
+    accepted = []  # max-heap on (priority number, chunks): the first task to give up
+    used = 0
+    for i in order:
+        task = tasks[i]
+        if task.chunks <= 0:
+            continue
+        capacity = len(chunks) if task.deadline is None else bisect_right(chunk_ends, task.deadline)
+        if task.chunks > capacity:
+            continue  # cannot finish in time even alone; don't let it evict feasible tasks
+        heapq.heappush(accepted, (-task.priority, -task.chunks, -i))
+        used += task.chunks
+        while used > capacity:
+            _, neg_chunks, neg_i = heapq.heappop(accepted)
+            used += neg_chunks
+
+    kept = {-neg_i for _, _, neg_i in accepted}
+    set_aside = {tasks[i].key for i in order if tasks[i].chunks > 0 and i not in kept}
+
+    assignment = {task.key: [] for task in tasks}
+    position = 0
+    # Kept tasks in deadline order are feasible by construction; the rest follow by importance
+    late = sorted((i for i in order if tasks[i].key in set_aside), key=lambda i: (tasks[i].priority, i))
+    for i in [i for i in order if i in kept] + late:
+        take = min(tasks[i].chunks, len(chunks) - position)
+        assignment[tasks[i].key] = chunks[position:position + take]
+        position += take
+    return assignment, set_aside
+
+
+def task_report(task, assigned, slot_minutes):
+    """Per-task outcome: scheduled/unscheduled hours, finish time and slack before the deadline."""
+    finish = assigned[-1].ends_at if assigned and len(assigned) == task.chunks else None
+    slack = None
+    if task.deadline is not None and finish is not None:
+        slack = int((task.deadline - finish).total_seconds() // 60)
+    return {
+        "scheduled_hours": round(len(assigned) * slot_minutes / 60, 2),
+        "unscheduled_hours": round((task.chunks - len(assigned)) * slot_minutes / 60, 2),
+        "finish": finish.strftime("%Y-%m-%d %H:%M:%S") if finish else None,
+        "deadline": task.deadline.strftime("%Y-%m-%d %H:%M:%S") if task.deadline else None,
+        "slack_minutes": slack,
+        "on_time": None if task.deadline is None else slack is not None and slack >= 0,
+    }
@@ -0,0 +1,105 @@
+"""
+Bulk serializers for list endpoints.
+
+Group.to_dict() and GroupTask.to_dict() lazily load members, tasks and assignees,
+which costs one extra SELECT per row. These helpers fetch the association data for
+a whole page of rows with flat id projections (one query per relationship) and pass
+it into to_dict().
+"""
+from collections import defaultdict
+
+from flask import g
+
+from extensions import db
+from models import Group, GroupTask, group_user_association, task_user_association
+
+# SQL Server caps a statement at 2100 bound parameters
+IN_CHUNK_SIZE = 1000
+
+
+def chunked(values, size=IN_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def assigned_user_ids_by_task(task_ids):
+    """Map task id -> [assigned user ids] with one query per 1000 tasks."""
+    result = defaultdict(list)
+    for chunk in chunked(set(task_ids)):
+        rows = db.session.query(task_user_association.c.task_id, task_user_association.c.user_id).filter(
+            task_user_association.c.task_id.in_(chunk)
+        ).order_by(task_user_association.c.id).all()
+        for task_id, user_id in rows:
+            result[task_id].append(user_id)
+    return result
+
+
+def member_ids_by_group(group_ids):
+    """Map group id -> [member user ids]."""
+    result = defaultdict(list)
+    for chunk in chunked(set(group_ids)):
+        rows = db.session.query(group_user_association.c.group_id, group_user_association.c.user_id).filter(
+            group_user_association.c.group_id.in_(chunk)
+        ).order_by(group_user_association.c.id).all()
+        for group_id, user_id in rows:
+            result[group_id].append(user_id)
+    return result
+
+
+def task_ids_by_group(group_ids):
+    """Map group id -> [group task ids]."""
+    result = defaultdict(list)
+    for chunk in chunked(set(group_ids)):
+        rows = db.session.query(GroupTask.group_id, GroupTask.id).filter(
+            GroupTask.group_id.in_(chunk)
+        ).order_by(GroupTask.id).all()
+        for group_id, task_id in rows:
+            result[group_id].append(task_id)
+    return result
+
+
+def group_names_by_id(group_ids):
+    """Map group id -> group name."""
+    result = {}
+    for chunk in chunked(set(group_ids)):
+        result.update(db.session.query(Group.id, Group.name).filter(Group.id.in_(chunk)).all())
+    return result
+
+
+def serialize_group_tasks(tasks):
+    """GroupTask.to_dict() for many tasks: 1 query for all assignees instead of 1 per task."""
+    assignments = assigned_user_ids_by_task(task.id for task in tasks)
+    return [task.to_dict(assigned_user_ids=assignments.get(task.id, [])) for task in tasks]
+
+
+def serialize_groups(groups):
+    """Group.to_dict() for many groups: 2 queries total instead of 2 per group."""
+    group_ids = [group.id for group in groups]
+    members = member_ids_by_group(group_ids)
+    tasks = task_ids_by_group(group_ids)
+    return [
+        group.to_dict(member_ids=members.get(group.id, []), task_ids=tasks.get(group.id, []))
+        for group in groups
+    ]
+
+
+def cached_group_names(group_ids=()):
+    """
+    Request-scoped identity map of group id -> name, kept on flask.g.
+    Only ids not seen earlier in the request hit the database (one query per call).
+    """
+    cache = g.setdefault("group_names", {})
+    missing = {group_id for group_id in group_ids if group_id not in cache}
+    if missing:
+        found = group_names_by_id(missing)
+        for group_id in missing:
+            cache[group_id] = found.get(group_id)
+    return cache
+
+
+def prime_group_names(pairs):
+    """Seed the request-scoped map from (group_id, name) pairs a joined query already returned."""
+    cache = g.setdefault("group_names", {})
+    cache.update(pairs)
+    return cache
@@ -0,0 +1,50 @@
+"""
+SQL expressions that differ between the databases the analytics run on.
+
+Production is SQL Server. The tests and benchmarks run on SQLite. PostgreSQL and
+MySQL are local stand-ins (see benchmarks/bench_analytics.py). Each construct compiles
+to the native form of the dialect, so the whole aggregate stays in SQL. Calendar
+fields come from SQLAlchemy's own extract(), which already compiles per dialect:
+DATEPART on SQL Server, STRFTIME on SQLite, EXTRACT on PostgreSQL and MySQL.
+"""
+from sqlalchemy import Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class seconds_between(FunctionElement):
+    """Seconds from `start` to `end` (negative when end is earlier): seconds_between(start, end)."""
+    type = Float()
+    inherit_cache = True
+    name = "seconds_between"
+
+
+def _start_end(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return compiler.process(start, **kw), compiler.process(end, **kw)
+
+
+@compiles(seconds_between)
+@compiles(seconds_between, "mssql")
+def _seconds_between_default(element, compiler, **kw):
+    start, end = _start_end(element, compiler, **kw)
+    return f"DATEDIFF(SECOND, {start}, {end})"
+
+
+@compiles(seconds_between, "sqlite")
+def _seconds_between_sqlite(element, compiler, **kw):
+    start, end = _start_end(element, compiler, **kw)
+    return f"((julianday({end}) - julianday({start})) * 86400.0)"
+
+
+@compiles(seconds_between, "postgresql")
+def _seconds_between_postgresql(element, compiler, **kw):
+    start, end = _start_end(element, compiler, **kw)
+    return f"EXTRACT(EPOCH FROM ({end} - {start}))"
+
+
+@compiles(seconds_between, "mysql")
+@compiles(seconds_between, "mariadb")
+def _seconds_between_mysql(element, compiler, **kw):
+    start, end = _start_end(element, compiler, **kw)
+    return f"TIMESTAMPDIFF(SECOND, {start}, {end})"
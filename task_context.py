@@ -0,0 +1,69 @@
+"""
+Per-user task context for the AI chat.
+
+Loads only the open tasks of one user (personal tasks they own, group tasks assigned to
+them) with the "not done" and "urgent deadline" filters evaluated by the database, so
+the cost of a /chat message does not depend on how many tasks other users have.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func
+
+from extensions import db
+from models import PersonalTask, GroupTask, task_user_association
+from serializers import serialize_group_tasks
+
+DONE_STATUSES = ("done", "completed")
+URGENT_WINDOW = timedelta(days=2)
+
+
+def _open_status(column):
+    # Same rule as the AI layer: anything not done/completed (case-insensitive), NULL included
+    return func.lower(func.coalesce(column, "")).notin_(DONE_STATUSES)
+
+
+def _urgent_flag(deadline_column, cutoff):
+    return case((deadline_column <= cutoff, True), else_=False).label("is_urgent")
+
+
+def load_task_context(user_id, now=None, urgent_window=URGENT_WINDOW):
+    """
+    Return {"personal_tasks", "group_tasks", "urgent_tasks"} as lists of task dicts,
+    ready to pass to generate_ai_advice(). "deadline" holds a datetime (or None), not
+    the string to_dict() produces. Urgent tasks are open tasks whose deadline
+    falls within `urgent_window` from now (overdue ones included).
+    Costs three queries regardless of table sizes.
+    """
+    user_id = int(user_id)
+    cutoff = (now or datetime.utcnow()) + urgent_window
+
+    personal_rows = db.session.query(PersonalTask, _urgent_flag(PersonalTask.deadline, cutoff)).filter(
+        PersonalTask.user_id == user_id,
+        _open_status(PersonalTask.status)
+    ).order_by(PersonalTask.id).all()
+
+    group_rows = db.session.query(GroupTask, _urgent_flag(GroupTask.deadline, cutoff)).join(
+        task_user_association, task_user_association.c.task_id == GroupTask.id
+    ).filter(
+        task_user_association.c.user_id == user_id,
+        _open_status(GroupTask.status)
+    ).order_by(GroupTask.id).all()
+
+    personal_tasks = [task.to_dict() for task, _ in personal_rows]
+    group_tasks = serialize_group_tasks([task for task, _ in group_rows])
+
+    # The AI layer compares deadlines; hand it the datetimes instead of strings it must re-parse
+    for task_dict, (task, _) in zip(personal_tasks + group_tasks, personal_rows + group_rows):
+        task_dict["deadline"] = task.deadline
+
+    urgent_tasks = [
+        task_dict
+        for task_dict, (_, is_urgent) in zip(personal_tasks + group_tasks, personal_rows + group_rows)
+        if is_urgent
+    ]
+
+    return {
+        "personal_tasks": personal_tasks,
+        "group_tasks": group_tasks,
+        "urgent_tasks": urgent_tasks,
+    }
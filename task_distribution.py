@@ -0,0 +1,198 @@
+"""
+Group task distribution for /groups/<id>/ai-distribute.
+
+Each member's free time comes from their saved UserSchedule, loaded for the whole
+group in one query. Members sit in a heap keyed on (assigned load, -free minutes),
+so picking the next assignee costs O(log m) instead of re-sorting the whole group
+for every task. TaskAssignments fetches task rows with their current assignees and
+the candidate users in bulk, and works on id sets. New assignments are inserted
+together, with a single commit at the end.
+"""
+import heapq
+import json
+from datetime import datetime, timedelta
+
+from extensions import db
+from date_parsing import parse_datetime_value
+from models import GroupTask, User, UserSchedule, task_user_association
+from serializers import chunked
+
+URGENT_WINDOW = timedelta(days=2)
+MINUTES_PER_SLOT = 60  # every entry of a saved schedule's day list is one hour
+
+
+def _slot_count(schedule_json):
+    try:
+        schedule = json.loads(schedule_json)
+    except (TypeError, ValueError):
+        return 0
+    if not isinstance(schedule, dict):
+        return 0
+    return sum(len(slots) for slots in schedule.values() if isinstance(slots, list))
+
+
+def member_free_minutes(member_ids):
+    """{user_id: free minutes} from the members' saved schedules, one query per 1000 members."""
+    import numpy as np
+
+    member_ids = list(member_ids)
+    slot_counts = {}
+    for batch in chunked(member_ids):
+        rows = db.session.query(UserSchedule.user_id, UserSchedule.schedule_json).filter(
+            UserSchedule.user_id.in_(batch)
+        ).all()
+        for user_id, schedule_json in rows:
+            slot_counts[user_id] = _slot_count(schedule_json)
+
+    counts = np.fromiter((slot_counts.get(user_id, 0) for user_id in member_ids), dtype=np.int64,
+                         count=len(member_ids))
+    return dict(zip(member_ids, (counts * MINUTES_PER_SLOT).tolist()))
+
+
+class LoadBalancer:
+    """Hands out the least loaded member, the one with more free time first on ties."""
+
+    def __init__(self, free_minutes):
+        # Member order breaks the remaining ties, so results are reproducible
+        self._heap = [(0, -minutes, order, user_id) for order, (user_id, minutes) in enumerate(free_minutes.items())]
+        heapq.heapify(self._heap)
+        self.loads = {user_id: 0 for user_id in free_minutes}
+
+    def pick(self, count, exclude=()):
+        """Take up to `count` members not in `exclude` and add one task to their load."""
+        picked, skipped = [], []
+        while self._heap and len(picked) < count:
+            entry = heapq.heappop(self._heap)
+            (skipped if entry[3] in exclude else picked).append(entry)
+        for load, neg_minutes, order, user_id in picked:
+            self.loads[user_id] = load + 1
+            heapq.heappush(self._heap, (load + 1, neg_minutes, order, user_id))
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return [entry[3] for entry in picked]
+
+
+class TaskAssignments:
+    """
+    Assignments of a batch of group tasks, held as id lists in memory.
+
+        assignments = TaskAssignments.load(task_ids, candidate_user_ids)
+        assignments.assign(task_id, [user_id, ...])    # or .replace(...)
+        assignments.flush()                             # one INSERT, one DELETE
+
+    load() costs two queries whatever the batch size (up to 1000 ids each): tasks with
+    their current assignees (outer join), and which candidate users exist.
+    """
+
+    def __init__(self, tasks, assigned, association_ids, valid_user_ids):
+        self.tasks = tasks                       # {task_id: GroupTask}
+        self.assigned = assigned                 # {task_id: [user_id, ...]} in assignment order
+        self.valid_user_ids = valid_user_ids     # candidates that exist in Users
+        self._association_ids = association_ids  # {(task_id, user_id): association row id}
+        self._added = []
+        self._removed = set()
+
+    @classmethod
+    def load(cls, task_ids, candidate_user_ids):
+        tasks, assigned, association_ids = {}, {}, {}
+        for batch in chunked(set(task_ids)):
+            rows = db.session.query(GroupTask, task_user_association.c.id, task_user_association.c.user_id).outerjoin(
+                task_user_association, task_user_association.c.task_id == GroupTask.id
+            ).filter(GroupTask.id.in_(batch)).order_by(GroupTask.id, task_user_association.c.id).all()
+            for task, association_id, user_id in rows:
+                tasks[task.id] = task
+                assigned.setdefault(task.id, [])
+                if user_id is not None:
+                    assigned[task.id].append(user_id)
+                    association_ids[(task.id, user_id)] = association_id
+
+        valid_user_ids = set()
+        for batch in chunked(set(candidate_user_ids)):
+            valid_user_ids.update(user_id for (user_id,) in db.session.query(User.userId).filter(User.userId.in_(batch)))
+        return cls(tasks, assigned, association_ids, valid_user_ids)
+
+    def assign(self, task_id, user_ids):
+        """Add `user_ids` to the task, skipping unknown users and current assignees; returns the added ids."""
+        current = self.assigned[task_id]
+        present = set(current)
+        added = []
+        for user_id in user_ids:
+            if user_id in self.valid_user_ids and user_id not in present:
+                present.add(user_id)
+                added.append(user_id)
+        current.extend(added)
+        self._added.extend((task_id, user_id) for user_id in added)
+        return added
+
+    def replace(self, task_id, user_ids):
+        """Make `user_ids` (known users only) the task's assignees; returns (added, removed)."""
+        wanted = [user_id for user_id in dict.fromkeys(user_ids) if user_id in self.valid_user_ids]
+        wanted_set = set(wanted)
+        removed = [user_id for user_id in self.assigned[task_id] if user_id not in wanted_set]
+        for user_id in removed:
+            self._removed.add((task_id, user_id))
+        self.assigned[task_id] = [user_id for user_id in self.assigned[task_id] if user_id in wanted_set]
+        return self.assign(task_id, wanted), removed
+
+    def flush(self):
+        """Write pending changes: one bulk INSERT and one DELETE by association id. The caller commits."""
+        deleted_ids = [self._association_ids[pair] for pair in self._removed if pair in self._association_ids]
+        for batch in chunked(deleted_ids):
+            db.session.execute(task_user_association.delete().where(task_user_association.c.id.in_(batch)))
+        if self._added:
+            db.session.execute(task_user_association.insert(), [
+                {"task_id": task_id, "user_id": user_id} for task_id, user_id in self._added
+            ])
+        self._added, self._removed = [], set()
+
+
+def assignee_count(task, member_count, urgent_cutoff):
+    # Flexible number of assignees
+    if task.priority == 1 and task.deadline and task.deadline <= urgent_cutoff:
+        return min(3, member_count)
+    if task.priority == 1:
+        return min(2, member_count)
+    return 1
+
+
+def distribute_group_tasks(tasks_data, member_ids, now=None):
+    """
+    Assign the tasks in `tasks_data` ([{"id", "priority", "deadline"}, ...]) to `member_ids`.
+    Urgent tasks go first, then by priority and deadline. Returns the task dicts with
+    "new_assigned_users", in assignment order.
+    """
+    urgent_cutoff = (now or datetime.utcnow()) + URGENT_WINDOW
+
+    # Sort tasks — urgent first, then by priority, then deadline
+    def task_sort_key(task_data):
+        parsed_deadline = parse_datetime_value(task_data.get("deadline"))
+        is_urgent = task_data.get("priority") == 1 and parsed_deadline and parsed_deadline <= urgent_cutoff
+        return (not is_urgent, task_data.get("priority", 4), parsed_deadline or datetime.max)
+
+    tasks_data = sorted(tasks_data, key=task_sort_key)
+
+    assignments = TaskAssignments.load([task_data["id"] for task_data in tasks_data], member_ids)
+    # Members missing from Users are never candidates
+    member_ids = [user_id for user_id in dict.fromkeys(member_ids) if user_id in assignments.valid_user_ids]
+
+    balancer = LoadBalancer(member_free_minutes(member_ids))
+    results = []
+    for task_data in tasks_data:
+        task = assignments.tasks.get(task_data["id"])
+        if not task or (task.status or "").lower() == "done":
+            continue
+
+        picked = balancer.pick(assignee_count(task, len(member_ids), urgent_cutoff),
+                               exclude=set(assignments.assigned[task.id]))
+        results.append((task, assignments.assign(task.id, picked)))
+
+    # Serialized before the commit expires the loaded rows
+    distributed_tasks = []
+    for task, new_assigned_users in results:
+        task_dict = task.to_dict(assigned_user_ids=list(assignments.assigned[task.id]))
+        task_dict["new_assigned_users"] = new_assigned_users
+        distributed_tasks.append(task_dict)
+
+    assignments.flush()
+    db.session.commit()
+    return distributed_tasks
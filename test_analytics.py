@@ -0,0 +1,262 @@
+import random
+import unittest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import insert, inspect
+from sqlalchemy.dialects import mssql, mysql, postgresql, sqlite
+
+import analytics
+from analytics import (dashboard, personal_rollup_query, personal_rollup_rows, rebuild_rollups, rollup_rows, summarize,
+                       task_contribution, update_rollup)
+from extensions import db
+from models import User, Group, GroupTask, PersonalTask, PersonalTaskRollup, task_user_association
+from sql_expressions import seconds_between
+from testing_utils import make_test_app, count_queries
+
+
+class DashboardTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.me = User(username="me", email="me@example.com")
+        self.other = User(username="other", email="other@example.com")
+        db.session.add_all([self.me, self.other])
+        db.session.flush()
+
+        rng = random.Random(7)
+        self.tasks = []
+        for i in range(300):
+            start = datetime(2024, 1, 1) + timedelta(hours=rng.randrange(24 * 365))
+            finished = rng.random() < 0.8
+            task = PersonalTask(
+                title=f"t{i}", priority=2, user_id=self.me.userId,
+                category=rng.choice(["Work", "Study", "Health"]),
+                status=rng.choice(["Done", "Done", "To Do"]),
+                start_time=start if rng.random() < 0.7 else None,
+                actual_time=start + timedelta(minutes=rng.randrange(10, 600)) if finished else None,
+                deadline=start + timedelta(minutes=rng.randrange(10, 600)) if rng.random() < 0.6 else None,
+            )
+            self.tasks.append(task)
+        db.session.add_all(self.tasks)
+        db.session.add(PersonalTask(title="not mine", priority=2, user_id=self.other.userId, status="Done",
+                                    actual_time=datetime(2024, 2, 1)))
+
+        group = Group(name="team", created_by=self.me.userId)
+        db.session.add(group)
+        db.session.flush()
+        for i, status in enumerate(["Done", "Done", "To Do"]):
+            task = GroupTask(title=f"g{i}", status=status, priority=2, group_id=group.id)
+            db.session.add(task)
+            db.session.flush()
+            db.session.execute(task_user_association.insert().values(task_id=task.id, user_id=self.me.userId))
+        db.session.commit()
+        rebuild_rollups()  # tasks were inserted directly, not through the task routes
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def expected(self):
+        done = [t for t in self.tasks if t.status == "Done"]
+        monthly = defaultdict(int)
+        durations = defaultdict(list)
+        for t in done:
+            if t.actual_time:
+                monthly[t.actual_time.strftime("%Y-%m")] += 1
+            if t.actual_time and t.start_time:
+                durations[t.category].append((t.actual_time - t.start_time).total_seconds())
+        with_deadline = [t for t in done if t.actual_time and t.deadline]
+        return {
+            "monthly_stats": [{"month": m, "completed_tasks": c} for m, c in sorted(monthly.items())],
+            "time_taken_stats": [{"category": c, "avg_minutes": round(sum(v) / len(v) / 60, 2)}
+                                 for c, v in sorted(durations.items())],
+            "on_time_stats": {"on_time": sum(t.actual_time <= t.deadline for t in with_deadline),
+                              "late": sum(t.actual_time > t.deadline for t in with_deadline)},
+            "completion": {"personal": len(done), "group": 2, "total": len(done) + 2},
+        }
+
+    def test_matches_per_task_computation(self):
+        self.assertEqual(dashboard(self.me.userId), self.expected())
+
+    def test_endpoint_costs_two_queries(self):
+        expected, user_id = self.expected(), self.me.userId
+        with count_queries() as counter:
+            response = self.client.get(f"/api/data/dashboard/{user_id}")
+        self.assertEqual(counter.count, 2)
+        self.assertEqual(response.get_json(), expected)
+
+    def test_on_time_stats_in_one_query(self):
+        user_id = self.me.userId
+        with count_queries() as counter:
+            response = self.client.get(f"/api/data/on_time_stats/{user_id}")
+        self.assertEqual(counter.count, 1)
+        self.assertEqual(response.get_json(), self.expected()["on_time_stats"])
+
+    def test_stat_endpoints_read_rollups(self):
+        expected, user_id = self.expected(), self.me.userId
+        for name in ("monthly_stats", "time_taken_stats"):
+            with count_queries() as counter:
+                response = self.client.get(f"/api/data/{name}/{user_id}")
+            self.assertEqual(counter.count, 1)
+            self.assertEqual(response.get_json(), expected[name])
+
+    def test_rollup_rows_are_per_month_not_per_task(self):
+        # 3 categories x 12 months, plus a bucket for Done tasks without actual_time
+        self.assertLessEqual(PersonalTaskRollup.query.filter_by(user_id=self.me.userId).count(), 3 * 13)
+
+    def test_empty_user(self):
+        user = User(username="new", email="new@example.com")
+        db.session.add(user)
+        db.session.commit()
+        self.assertEqual(dashboard(user.userId), {
+            "monthly_stats": [], "time_taken_stats": [], "on_time_stats": {"on_time": 0, "late": 0},
+            "completion": {"personal": 0, "group": 0, "total": 0},
+        })
+
+    def test_composite_index_declared(self):
+        indexes = {i["name"]: i["column_names"] for i in inspect(db.engine).get_indexes("PersonalTasks")}
+        self.assertEqual(indexes["IX_PersonalTasks_User_Status_ActualTime"], ["user_id", "status", "actual_time"])
+
+    def test_seconds_between_on_sql_server(self):
+        expression = seconds_between(PersonalTask.start_time, PersonalTask.actual_time)
+        self.assertEqual(str(expression.compile(dialect=mssql.dialect())),
+                         'DATEDIFF(SECOND, [PersonalTasks].start_time, [PersonalTasks].actual_time)')
+
+    def test_seconds_between_on_other_databases(self):
+        expression = seconds_between(PersonalTask.start_time, PersonalTask.actual_time)
+        for dialect, expected in (
+            (postgresql.dialect(), 'EXTRACT(EPOCH FROM ("PersonalTasks".actual_time - "PersonalTasks".start_time))'),
+            (mysql.dialect(), 'TIMESTAMPDIFF(SECOND, `PersonalTasks`.start_time, `PersonalTasks`.actual_time)'),
+            (sqlite.dialect(), '((julianday("PersonalTasks".actual_time) - julianday("PersonalTasks".start_time))'
+                               ' * 86400.0)'),
+        ):
+            self.assertEqual(str(expression.compile(dialect=dialect)), expected)
+
+    def test_rollup_query_compiles_without_raw_sql(self):
+        statement = personal_rollup_query(self.me.userId).statement
+        for dialect, date_part in ((mssql.dialect(), "DATEPART"), (postgresql.dialect(), "EXTRACT"),
+                                   (mysql.dialect(), "EXTRACT"), (sqlite.dialect(), "STRFTIME")):
+            self.assertIn(date_part, str(statement.compile(dialect=dialect)).upper())
+
+
+class RollupMaintenanceTests(unittest.TestCase):
+    """The task routes keep PersonalTaskRollups equal to aggregating PersonalTasks."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        user = User(username="me", email="me@example.com")
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.userId
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def assertRollupCurrent(self):
+        db.session.expire_all()
+        self.assertEqual(summarize(rollup_rows(self.user_id)), summarize(personal_rollup_rows(self.user_id)))
+
+    def create(self, **fields):
+        response = self.client.post("/tasks", json={"title": "t", "priority": 2, "user_id": self.user_id, **fields})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()["id"]
+
+    def add(self, **fields):
+        # SQLite only takes datetime objects, so tasks with a deadline skip POST /tasks
+        task = PersonalTask(title="t", priority=2, user_id=self.user_id, **fields)
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+    def update(self, task_id, **fields):
+        self.assertEqual(self.client.put(f"/tasks/{task_id}", json=fields).status_code, 200)
+
+    def test_done_transition_counts_task(self):
+        task_id = self.add(status="To Do", category="Work", deadline=datetime(2999, 1, 1))
+        self.assertEqual(rollup_rows(self.user_id), [])
+        self.update(task_id, status="In Progress")
+        self.update(task_id, status="Done")
+
+        summary = summarize(rollup_rows(self.user_id))
+        self.assertEqual(summary["personal_completed"], 1)
+        self.assertEqual(summary["on_time_stats"], {"on_time": 1, "late": 0})
+        self.assertEqual([s["category"] for s in summary["time_taken_stats"]], ["Work"])
+        self.assertRollupCurrent()
+
+    def test_edits_reopen_and_delete(self):
+        first = self.add(status="To Do", category="Work", deadline=datetime(2000, 1, 1))
+        second = self.create(status="Done", category="Study")  # created Done: no actual_time
+        self.assertRollupCurrent()
+
+        self.update(first, status="In Progress")
+        self.update(first, status="Done")
+        self.assertRollupCurrent()
+        self.update(first, category="Health", priority=1)
+        self.assertRollupCurrent()
+        self.update(first, status="To Do")
+        self.assertRollupCurrent()
+        self.update(second, title="renamed")
+        self.assertRollupCurrent()
+        self.assertEqual(self.client.delete(f"/tasks/{second}").status_code, 200)
+        self.assertRollupCurrent()
+        self.assertEqual(summarize(rollup_rows(self.user_id))["personal_completed"], 0)
+
+    def test_contribution_of_unflushed_request_strings(self):
+        task = PersonalTask(user_id=self.user_id, status="Done", category="Work", start_time=datetime(2024, 5, 1),
+                            actual_time=datetime(2024, 5, 1, 1), deadline="2024-05-01T00:30:00.000Z")
+        self.assertEqual(task_contribution(task), ((self.user_id, 2024, 5, "Work"), (1, 0, 1, 3600.0, 1)))
+        task.status = "In Progress"
+        self.assertIsNone(task_contribution(task))
+
+    def test_concurrent_first_completion_in_bucket(self):
+        contribution = ((self.user_id, 2024, 5, "Work"), (1, 1, 0, 60.0, 1))
+        real_update = analytics._update_rollup_row
+        calls = []
+
+        def racing_update(key, values, sign):
+            calls.append(key)
+            if len(calls) == 1:
+                # Another request creates the bucket right after this update found no row
+                db.session.execute(insert(PersonalTaskRollup).values(
+                    user_id=self.user_id, year=2024, month=5, category="Work", completed=1, on_time=0, late=1,
+                    duration_seconds=30.0, timed=1))
+                return 0
+            return real_update(key, values, sign)
+
+        with mock.patch("analytics._update_rollup_row", side_effect=racing_update):
+            update_rollup(None, contribution)
+        db.session.commit()
+
+        row = PersonalTaskRollup.query.one()
+        self.assertEqual((row.completed, row.on_time, row.late, row.duration_seconds, row.timed), (2, 1, 1, 90.0, 2))
+
+    def test_rebuild_matches_incremental(self):
+        for category in ("Work", "Study", "Work"):
+            task_id = self.create(status="To Do", category=category)
+            self.update(task_id, status="In Progress")
+            self.update(task_id, status="Done")
+        incremental = summarize(rollup_rows(self.user_id))
+        rebuild_rollups()
+        self.assertEqual(summarize(rollup_rows(self.user_id)), incremental)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -172,6 +172,21 @@ class FlaskAppTests(unittest.TestCase):
         })
         self.assertIn(response.status_code, [200, 500])
 
+    def test_predict_batch_missing_tasks(self):
+        response = self.client.post("/predict/batch", json={})
+        self.assertEqual(response.status_code, 400)
+
+    def test_predict_batch_reports_invalid_entries(self):
+        response = self.client.post("/predict/batch", json={"tasks": [
+            {"category": "General", "priority": 2},
+            {"category": "General", "priority": 2, "estimated_time": 30,
+             "start_time": "invalid-date", "user_id": 1}
+        ]})
+        self.assertEqual(response.status_code, 200)
+        predictions = response.get_json()["predictions"]
+        self.assertEqual(len(predictions), 2)
+        self.assertTrue(all("error" in p for p in predictions))
+
     def test_chat_with_ai_empty_message(self):
         response = self.client.post("/chat", json={"user_id": 1, "message": ""})
         self.assertEqual(response.status_code, 200)
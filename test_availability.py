@@ -0,0 +1,114 @@
+import unittest
+
+from sqlalchemy import text
+
+from availability import availability_by_user, migrate_free_schedule_strings, save_availability
+from extensions import db
+from models import User, UserAvailability, UserFreeSchedule
+from testing_utils import make_test_app, count_queries
+
+
+class AvailabilityTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.users = [User(username=f"a{i}", email=f"a{i}@example.com") for i in range(3)]
+        db.session.add_all(self.users)
+        db.session.commit()
+        self.user_id = self.users[0].userId
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def test_save_merges_and_maintains_weekly_total(self):
+        save_availability(self.user_id, {"monday": [(540, 600), (570, 660)], "friday": [(0, 30)]})
+        db.session.commit()
+        self.assertEqual(UserFreeSchedule.query.filter_by(user_id=self.user_id).one().weekly_free_minutes, 150)
+
+        # Only the days passed in are replaced
+        schedule = save_availability(self.user_id, {"monday": [(600, 630)]})
+        db.session.commit()
+        self.assertEqual(schedule.weekly_free_minutes, 60)
+        self.assertEqual(dict(availability_by_user([self.user_id])[self.user_id]),
+                         {"Monday": [(600, 630)], "Friday": [(0, 30)]})
+
+    def test_group_lookup_is_one_query(self):
+        user_ids = [user.userId for user in self.users]
+        for user_id in user_ids:
+            save_availability(user_id, {"sunday": [(480, 540)], "tuesday": [(60, 120)]})
+        db.session.commit()
+        with count_queries() as counter:
+            result = availability_by_user(user_ids)
+        self.assertEqual(counter.count, 1)
+        self.assertEqual(set(result), set(user_ids))
+
+    def test_put_and_get_schedule(self):
+        # Far more than the old String(255) columns could hold
+        ranges = [f"{h:02d}:00-{h:02d}:30" for h in range(24)]
+        response = self.client.put(f"/schedule/{self.user_id}", json={"monday": ranges, "tuesday": ["09:00-12:00"]})
+        self.assertEqual(response.status_code, 200)
+
+        payload = self.client.get(f"/schedule/{self.user_id}").get_json()
+        self.assertEqual(payload["monday"], [f"{h}:00-{h}:30" for h in range(24)])
+        self.assertEqual(payload["tuesday"], ["9:00-10:00", "10:00-11:00", "11:00-12:00"])
+        self.assertEqual(payload["sunday"], [])
+        self.assertEqual(payload["weeklyFreeMinutes"], 24 * 30 + 3 * 60)
+        self.assertNotIn("message", payload)
+
+    def test_app_slots_round_trip(self):
+        # The schedule screen sends and toggles one-hour "H:00-H+1:00" slots
+        slots = ["8:00-9:00", "9:00-10:00", "23:00-24:00"]
+        self.client.put(f"/schedule/{self.user_id}", json={"friday": slots})
+        payload = self.client.get(f"/schedule/{self.user_id}").get_json()
+        self.assertEqual(payload["friday"], slots)
+
+        self.client.put(f"/schedule/{self.user_id}", json={"friday": ["8:00-9:00", "23:00-24:00"]})
+        payload = self.client.get(f"/schedule/{self.user_id}").get_json()
+        self.assertEqual(payload["friday"], ["8:00-9:00", "23:00-24:00"])
+
+    def test_short_schedule_gets_warning(self):
+        self.client.put(f"/schedule/{self.user_id}", json={"monday": ["09:00-10:00"]})
+        payload = self.client.get(f"/schedule/{self.user_id}").get_json()
+        self.assertIn("not have enough available time", payload["message"])
+
+    def test_put_skips_bad_ranges(self):
+        response = self.client.put(f"/schedule/{self.user_id}",
+                                   json={"monday": ["9-10", "10:00-09:00", "25:00-26:00", "", "13:00-14:00"]})
+        self.assertEqual(response.status_code, 200)
+        payload = self.client.get(f"/schedule/{self.user_id}").get_json()
+        self.assertEqual(payload["monday"], ["13:00-14:00"])
+
+        response = self.client.put(f"/schedule/{self.user_id}", json={"monday": "09:00-10:00"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_migrate_legacy_strings(self):
+        # A database from before the migration: no WeeklyFreeMinutes column, no UserAvailability table
+        UserAvailability.__table__.drop(db.engine)
+        db.session.execute(text("DROP TABLE dbo.UserFreeSchedule"))
+        db.session.execute(text(
+            "CREATE TABLE dbo.UserFreeSchedule (ScheduleID INTEGER PRIMARY KEY, UserID INTEGER NOT NULL, "
+            "Sunday VARCHAR(255), Monday VARCHAR(255), Tuesday VARCHAR(255), Wednesday VARCHAR(255), "
+            "Thursday VARCHAR(255), Friday VARCHAR(255), Saturday VARCHAR(255), CreatedAt DATETIME, UpdatedAt DATETIME)"
+        ))
+        db.session.execute(text("INSERT INTO dbo.UserFreeSchedule (UserID, Monday, Friday) "
+                                "VALUES (:user_id, '09:00-12:00,11:00-13:00', '18:00-19:30')"),
+                           {"user_id": self.user_id})
+        db.session.commit()
+
+        self.assertEqual(migrate_free_schedule_strings(), 1)
+        self.assertEqual(migrate_free_schedule_strings(), 0)
+        schedule = UserFreeSchedule.query.filter_by(user_id=self.user_id).one()
+        self.assertEqual(schedule.weekly_free_minutes, 240 + 90)
+        self.assertEqual(schedule.to_dict()["monday"], ["9:00-10:00", "10:00-11:00", "11:00-12:00", "12:00-13:00"])
+
+
+if __name__ == '__main__':
+    unittest.main()
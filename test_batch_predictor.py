@@ -0,0 +1,70 @@
+import threading
+import unittest
+
+import numpy as np
+
+from AI.batch_predictor import PredictionBatcher, build_feature_matrix, predict_minutes
+
+
+class _FakeScaler:
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+
+
+class _SumModel:
+    """Stand-in model: output is the row sum, records every batch it sees."""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, x, verbose=0):
+        self.batch_sizes.append(len(x))
+        return x.sum(axis=1, keepdims=True)
+
+
+class BatchPredictorTests(unittest.TestCase):
+
+    def test_build_feature_matrix_shape(self):
+        features = build_feature_matrix([0, 1], [2, 3], [30, 60], [9, 14], [1, 2])
+        self.assertEqual(features.shape, (2, 5))
+        self.assertEqual(features[1].tolist(), [1, 3, 60, 14, 2])
+
+    def test_predict_minutes_applies_scalers(self):
+        feature_scaler = _FakeScaler([1] * 5, [2] * 5)
+        time_scaler = _FakeScaler([100], [10])
+        features = np.array([[3, 3, 3, 3, 3], [1, 1, 1, 1, 1]])
+        result = predict_minutes(_SumModel(), feature_scaler, time_scaler, features)
+        # scaled rows sum to 5 and 0 -> 5 * 10 + 100, 0 * 10 + 100
+        self.assertEqual(result.tolist(), [150.0, 100.0])
+
+    def test_batcher_merges_concurrent_requests(self):
+        model = _SumModel()
+        batcher = PredictionBatcher(lambda x: model.predict(x).reshape(-1), max_batch_size=64, max_wait_ms=50)
+        results = {}
+        barrier = threading.Barrier(16)
+
+        def worker(i):
+            barrier.wait()
+            results[i] = batcher.predict([i, 0, 0, 0, 0])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, {i: float(i) for i in range(16)})
+        self.assertLess(len(model.batch_sizes), 16)
+        self.assertEqual(sum(model.batch_sizes), 16)
+
+    def test_batcher_propagates_errors(self):
+        def failing(_):
+            raise RuntimeError("boom")
+
+        batcher = PredictionBatcher(failing, max_wait_ms=1)
+        with self.assertRaises(RuntimeError):
+            batcher.predict([0, 0, 0, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
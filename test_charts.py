@@ -0,0 +1,151 @@
+import threading
+import time
+import unittest
+
+from charts import ChartRenderer, chart_etag, completion_chart_data, render_completion_chart
+from extensions import db
+from models import User
+from testing_utils import make_test_app
+
+calls = []
+
+
+def counted(value):
+    calls.append(value)
+    return f"rendered {value}"
+
+
+def slow(value):
+    calls.append(value)
+    time.sleep(0.2)
+    return value
+
+
+def failing(value):
+    calls.append(value)
+    raise ValueError("bad chart")
+
+
+class RenderCompletionChartTests(unittest.TestCase):
+    def test_png_and_svg(self):
+        self.assertTrue(render_completion_chart(3, 1, "png").startswith(b"\x89PNG"))
+        self.assertIn(b"<svg", render_completion_chart(3, 1, "svg"))
+
+    def test_without_data(self):
+        self.assertTrue(render_completion_chart(0, 0).startswith(b"\x89PNG"))
+        self.assertEqual(completion_chart_data(0, 0)["title"], "Task Completion Breakdown (No Data)")
+
+    def test_data(self):
+        self.assertEqual(completion_chart_data(3, 1), {
+            "title": "Task Completion Breakdown (Total: 4)",
+            "labels": ["Personal Tasks", "Group Tasks"],
+            "values": [3, 1],
+            "total": 4,
+        })
+
+    def test_etag_follows_counts(self):
+        self.assertEqual(chart_etag("completion", "png", 3, 1), chart_etag("completion", "png", 3, 1))
+        self.assertNotEqual(chart_etag("completion", "png", 3, 1), chart_etag("completion", "png", 4, 1))
+        self.assertNotEqual(chart_etag("completion", "png", 3, 1), chart_etag("completion", "svg", 3, 1))
+
+
+class ChartRendererTests(unittest.TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_caches_by_arguments(self):
+        renderer = ChartRenderer(workers=0, cache_size=2)
+        self.assertEqual(renderer.render(counted, 1), "rendered 1")
+        self.assertEqual(renderer.render(counted, 1), "rendered 1")
+        renderer.render(counted, 2)
+        self.assertEqual(calls, [1, 2])
+
+        renderer.render(counted, 3)  # evicts 1, the least recently used
+        renderer.render(counted, 1)
+        self.assertEqual(calls, [1, 2, 3, 1])
+
+    def test_concurrent_requests_share_one_render(self):
+        renderer = ChartRenderer(workers=0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(renderer.render(slow, 7))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [7, 7, 7, 7])
+        self.assertEqual(calls, [7])
+
+    def test_failures_are_not_cached(self):
+        renderer = ChartRenderer(workers=0)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                renderer.render(failing, 1)
+        self.assertEqual(calls, [1, 1])
+
+    def test_process_pool(self):
+        renderer = ChartRenderer(workers=1)
+        try:
+            self.assertTrue(renderer.render(render_completion_chart, 2, 5, "png").startswith(b"\x89PNG"))
+        finally:
+            renderer.shutdown()
+
+
+class CompletionChartRouteTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.app.config["CHART_RENDERER"] = ChartRenderer(workers=0)
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        user = User(username="me", email="me@example.com")
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.userId
+        self.url = f"/api/data/completion_rate_chart?user_id={self.user_id}"
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def complete_task(self):
+        response = self.client.post("/tasks", json={"title": "t", "priority": 2, "status": "Done",
+                                                    "user_id": self.user_id})
+        self.assertEqual(response.status_code, 201)
+
+    def test_png_revalidates_until_counts_change(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/png")
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        etag = response.headers["ETag"]
+
+        cached = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b"")
+
+        self.complete_task()
+        changed = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+    def test_svg_and_json(self):
+        self.complete_task()
+        svg = self.client.get(self.url + "&format=svg")
+        self.assertEqual(svg.mimetype, "image/svg+xml")
+        self.assertIn(b"<svg", svg.data)
+
+        data = self.client.get(self.url + "&format=json")
+        self.assertEqual(data.get_json(), completion_chart_data(1, 0))
+        self.assertNotEqual(data.headers["ETag"], svg.headers["ETag"])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(self.url + "&format=gif").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
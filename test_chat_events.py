@@ -0,0 +1,188 @@
+import json
+import unittest
+from datetime import datetime
+
+from werkzeug.test import EnvironBuilder
+
+from chat_events import InProcessBroker, chat_event_stream
+from extensions import db
+from models import User, Group, GroupMessage
+from testing_utils import make_test_app, count_queries
+
+
+def parse_frame(frame):
+    if isinstance(frame, bytes):
+        frame = frame.decode()
+    event, data = None, None
+    for line in frame.strip().splitlines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+    return event, data
+
+
+class InProcessBrokerTests(unittest.TestCase):
+    def test_fans_out_to_the_channel_only(self):
+        broker = InProcessBroker()
+        first, second = broker.subscribe("group:1"), broker.subscribe("group:1")
+        elsewhere = broker.subscribe("group:2")
+        self.assertEqual(broker.publish("group:1", "message", {"id": 1}), 2)
+        self.assertEqual(first.get(timeout=0), ("message", {"id": 1}))
+        self.assertEqual(second.get(timeout=0), ("message", {"id": 1}))
+        self.assertIsNone(elsewhere.get(timeout=0))
+
+    def test_close_unsubscribes(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("group:1")
+        subscription.close()
+        self.assertEqual(broker.publish("group:1", "message", {"id": 1}), 0)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_slow_subscriber_is_dropped(self):
+        broker = InProcessBroker(queue_size=2)
+        slow = broker.subscribe("group:1")
+        for i in range(3):
+            broker.publish("group:1", "message", {"id": i})
+        self.assertTrue(slow.overflowed)
+        self.assertEqual(broker.subscriber_count("group:1"), 0)
+
+
+class ChatEventStreamTests(unittest.TestCase):
+    def frames(self, stream, count):
+        return [parse_frame(next(stream)) for _ in range(count)]
+
+    def test_counts_unread_from_other_members_and_resets_on_read(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("group:1")
+        stream = chat_event_stream(subscription, 1, user_id=7, unread=2, heartbeat=0.01)
+        self.assertEqual(self.frames(stream, 1), [("unread", {"group_id": 1, "unread": 2})])
+
+        broker.publish("group:1", "message", {"id": 10, "user_id": 8})
+        broker.publish("group:1", "message", {"id": 11, "user_id": 7})  # own message
+        broker.publish("group:1", "read", {"group_id": 1, "user_id": 8})  # someone else read
+        broker.publish("group:1", "read", {"group_id": 1, "user_id": 7})
+        self.assertEqual(self.frames(stream, 4), [
+            ("message", {"id": 10, "user_id": 8}),
+            ("unread", {"group_id": 1, "unread": 3}),
+            ("message", {"id": 11, "user_id": 7}),
+            ("unread", {"group_id": 1, "unread": 0}),
+        ])
+        self.assertEqual(next(stream), ": ping\n\n")
+        stream.close()
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_backlog_then_live_without_duplicates(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("group:1")
+        # Published between subscribing and the catch-up query: in both
+        broker.publish("group:1", "message", {"id": 6, "user_id": 8})
+        backlog = [{"id": 5, "user_id": 8}, {"id": 6, "user_id": 8}]
+        stream = chat_event_stream(subscription, 1, user_id=7, unread=2, backlog=backlog, after_id=4)
+        broker.publish("group:1", "message", {"id": 7, "user_id": 8})
+        self.assertEqual([frame[1].get("id") for frame in self.frames(stream, 5)], [5, 6, None, 7, None])
+        stream.close()
+
+    def test_unread_only_mode_and_resync(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("group:1")
+        stream = chat_event_stream(subscription, 1, user_id=7, unread=0, backlog=[{"id": 5, "user_id": 8}],
+                                   after_id=4, resync=True, include_messages=False)
+        broker.publish("group:1", "message", {"id": 9, "user_id": 8})
+        self.assertEqual(self.frames(stream, 3), [
+            ("resync", {"group_id": 1}),
+            ("unread", {"group_id": 1, "unread": 0}),
+            ("unread", {"group_id": 1, "unread": 1}),
+        ])
+        stream.close()
+
+
+class GroupChatEventsRouteTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"chatter{i}", email=f"c{i}@example.com") for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.reader, self.writer = users[0].userId, users[1].userId
+        group = Group(name="chat", created_by=self.reader)
+        db.session.add(group)
+        db.session.flush()
+        self.group_id = group.id
+        messages = [GroupMessage(group_id=group.id, user_id=self.writer, content=f"m{i}",
+                                 timestamp=datetime(2030, 1, 1)) for i in range(3)]
+        db.session.add_all(messages)
+        db.session.commit()
+        self.ids = [m.id for m in messages]
+        self.broker = self.app.config["CHAT_BROKER"]
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def open_stream(self, **params):
+        response = self.client.get(f"/groups/{self.group_id}/chat/events",
+                                   query_string={"user_id": self.reader, **params}, buffered=False)
+        self.addCleanup(response.close)
+        return response, iter(response.response)
+
+    def post_message(self, content):
+        return self.client.post(f"/groups/{self.group_id}/chat", json={"user_id": self.writer, "content": content})
+
+    def test_requires_user_id(self):
+        self.assertEqual(self.client.get(f"/groups/{self.group_id}/chat/events").status_code, 400)
+
+    def test_disconnect_before_first_frame_unsubscribes(self):
+        # Straight through WSGI: the test client would already have pulled the first frame
+        environ = EnvironBuilder(path=f"/groups/{self.group_id}/chat/events",
+                                 query_string={"user_id": self.reader}).get_environ()
+        app_iter = self.app.wsgi_app(environ, lambda status, headers: None)
+        self.assertEqual(self.broker.subscriber_count(), 1)
+        app_iter.close()
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+    def test_pushes_messages_and_unread_counts(self):
+        response, frames = self.open_stream(after_id=self.ids[0])
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertEqual([parse_frame(next(frames)) for _ in range(3)], [
+            ("message", self.client.get(f"/groups/{self.group_id}/chat").get_json()[1]),
+            ("message", self.client.get(f"/groups/{self.group_id}/chat").get_json()[2]),
+            ("unread", {"group_id": self.group_id, "unread": 3}),
+        ])
+
+        self.post_message("hello")
+        event, message = parse_frame(next(frames))
+        self.assertEqual((event, message["content"], message["username"]), ("message", "hello", "chatter1"))
+        self.assertEqual(parse_frame(next(frames)), ("unread", {"group_id": self.group_id, "unread": 4}))
+
+        self.client.post(f"/groups/{self.group_id}/chat/mark_read/{self.reader}")
+        self.assertEqual(parse_frame(next(frames)), ("unread", {"group_id": self.group_id, "unread": 0}))
+
+    def test_idle_streams_cost_no_queries_per_message(self):
+        streams = [self.open_stream(messages="0")[1] for _ in range(20)]
+        for frames in streams:
+            next(frames)  # initial count
+        self.assertEqual(self.broker.subscriber_count(f"group:{self.group_id}"), 20)
+
+        with count_queries() as counter:
+            self.post_message("one")
+        with_subscribers = counter.count
+        for frames in streams:
+            self.assertEqual(parse_frame(next(frames)), ("unread", {"group_id": self.group_id, "unread": 4}))
+            frames.close()
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+        with count_queries() as counter:
+            self.post_message("two")
+        self.assertEqual(with_subscribers, counter.count)
+
+
+if __name__ == "__main__":
+    unittest.main()
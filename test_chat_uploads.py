@@ -0,0 +1,248 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from chat_uploads import (ResumableUploads, UploadOffsetMismatch, UploadTooLarge, content_etag, store_stream)
+from extensions import db
+from group_chat import migrate_chat_thumbnails
+from models import User, Group, GroupMessage
+from testing_utils import make_test_app
+
+
+class StoreStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_content_addressed_and_deduplicated(self):
+        data = os.urandom(300_000)
+        digest = hashlib.sha256(data).hexdigest()
+        first = store_stream(self.root, io.BytesIO(data), "photo.PNG", chunk_size=4096)
+        self.assertEqual(first.relative_path, f"{digest[:2]}/{digest[2:4]}/{digest}.png")
+        self.assertEqual((first.size, first.deduplicated), (300_000, False))
+        with open(os.path.join(self.root, *first.relative_path.split("/")), "rb") as stored:
+            self.assertEqual(stored.read(), data)
+
+        second = store_stream(self.root, io.BytesIO(data), "other-name.png")
+        self.assertEqual((second.relative_path, second.deduplicated), (first.relative_path, True))
+        self.assertEqual(os.listdir(os.path.join(self.root, "tmp")), [])
+
+    def test_same_name_different_content_kept_apart(self):
+        first = store_stream(self.root, io.BytesIO(b"one"), "a.txt")
+        second = store_stream(self.root, io.BytesIO(b"two"), "a.txt")
+        self.assertNotEqual(first.relative_path, second.relative_path)
+
+    def test_size_limit_stops_the_copy(self):
+        class Source(io.RawIOBase):
+            reads = 0
+
+            def read(self, size=-1):
+                Source.reads += 1
+                return b"x" * size
+
+        with self.assertRaises(UploadTooLarge):
+            store_stream(self.root, Source(), "big.bin", max_bytes=10_000, chunk_size=4096)
+        self.assertEqual(Source.reads, 3)
+        self.assertEqual(os.listdir(os.path.join(self.root, "tmp")), [])
+
+
+class ResumableUploadsTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.uploads = ResumableUploads(self.root, max_bytes=1_000_000)
+        self.data = os.urandom(250_000)
+
+    def test_parts_then_complete(self):
+        upload_id = self.uploads.create(len(self.data), "clip.mp4")
+        offset, stored = self.uploads.append(upload_id, 0, io.BytesIO(self.data[:100_000]))
+        self.assertEqual((offset, stored), (100_000, None))
+
+        # Resumed from a fresh instance (restart / other worker): the prefix is re-hashed
+        resumed = ResumableUploads(self.root, max_bytes=1_000_000)
+        self.assertEqual(resumed.info(upload_id)["offset"], 100_000)
+        offset, stored = resumed.append(upload_id, 100_000, io.BytesIO(self.data[100_000:]))
+        self.assertEqual(offset, len(self.data))
+        self.assertEqual(stored.digest, hashlib.sha256(self.data).hexdigest())
+        self.assertTrue(stored.relative_path.endswith(".mp4"))
+        self.assertIsNone(resumed.info(upload_id))
+
+    def test_wrong_offset_is_rejected_with_the_current_one(self):
+        upload_id = self.uploads.create(len(self.data), "clip.mp4")
+        self.uploads.append(upload_id, 0, io.BytesIO(self.data[:10]))
+        with self.assertRaises(UploadOffsetMismatch) as caught:
+            self.uploads.append(upload_id, 0, io.BytesIO(self.data[:10]))
+        self.assertEqual(caught.exception.offset, 10)
+
+    def test_overrunning_the_declared_size_keeps_nothing(self):
+        upload_id = self.uploads.create(100, "a.bin")
+        self.uploads.append(upload_id, 0, io.BytesIO(b"x" * 60))
+        with self.assertRaises(UploadTooLarge):
+            self.uploads.append(upload_id, 60, io.BytesIO(b"y" * 50))
+        self.assertEqual(self.uploads.info(upload_id)["offset"], 60)
+        offset, stored = self.uploads.append(upload_id, 60, io.BytesIO(b"y" * 40))
+        self.assertEqual(stored.digest, hashlib.sha256(b"x" * 60 + b"y" * 40).hexdigest())
+
+    def test_declared_size_over_the_limit(self):
+        with self.assertRaises(UploadTooLarge):
+            self.uploads.create(2_000_000, "huge.bin")
+
+
+class ChatUploadRouteCase(unittest.TestCase):
+    max_bytes = 200_000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.app.config["CHAT_UPLOADS"] = ResumableUploads(self.root, max_bytes=self.max_bytes)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        user = User(username="uploader", email="up@example.com")
+        db.session.add(user)
+        db.session.flush()
+        group = Group(name="files", created_by=user.userId)
+        db.session.add(group)
+        db.session.commit()
+        self.user_id, self.group_id = user.userId, group.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def upload(self, data, filename="pic.jpg"):
+        return self.client.post(f"/groups/{self.group_id}/chat/upload", data={
+            "user_id": str(self.user_id), "file": (io.BytesIO(data), filename)
+        }, content_type="multipart/form-data")
+
+
+class ChatUploadRouteTests(ChatUploadRouteCase):
+    def test_multipart_upload_is_stored_by_content(self):
+        data = os.urandom(50_000)
+        first = self.upload(data).get_json()
+        second = self.upload(data, "renamed.jpg").get_json()
+        self.assertEqual(first["file_url"], second["file_url"])
+        self.assertTrue(first["file_url"].startswith("/uploads/") and first["file_url"].endswith(".jpg"))
+        self.assertEqual(self.client.get(first["file_url"]).data, data)
+        self.assertEqual(GroupMessage.query.count(), 2)
+
+    def test_multipart_upload_over_the_limit(self):
+        response = self.upload(os.urandom(300_000))
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(GroupMessage.query.count(), 0)
+
+    def test_resumable_upload_flow(self):
+        data = os.urandom(120_000)
+        response = self.client.post(f"/groups/{self.group_id}/chat/uploads", json={
+            "user_id": self.user_id, "filename": "notes.pdf", "size": len(data), "content": "minutes"
+        })
+        self.assertEqual(response.status_code, 201)
+        location = response.headers["Location"]
+
+        response = self.client.patch(location, data=data[:70_000], headers={"Upload-Offset": "0"})
+        self.assertEqual(response.headers["Upload-Offset"], "70000")
+        # The client lost the reply: it asks where to resume
+        self.assertEqual(self.client.head(location).headers["Upload-Offset"], "70000")
+        upload_id = location.rsplit('/', 1)[1]
+        for path in (f"tmp/{upload_id}.part", f"./tmp/{upload_id}.json", f"x/../tmp/{upload_id}.json"):
+            self.assertEqual(self.client.get(f"/uploads/{path}").status_code, 404, path)
+        response = self.client.patch(location, data=data[:10], headers={"Upload-Offset": "0"})
+        self.assertEqual((response.status_code, response.headers["Upload-Offset"]), (409, "70000"))
+
+        response = self.client.patch(location, data=data[70_000:], headers={"Upload-Offset": "70000"})
+        self.assertEqual(response.status_code, 201)
+        message = response.get_json()
+        self.assertEqual(message["content"], "minutes")
+        self.assertTrue(message["file_url"].endswith(".pdf"))
+        self.assertEqual(self.client.get(message["file_url"]).data, data)
+        self.assertEqual(self.client.get(location).status_code, 404)
+
+    def test_resumable_upload_rejects_bad_requests(self):
+        response = self.client.post(f"/groups/{self.group_id}/chat/uploads", json={
+            "user_id": self.user_id, "filename": "big.bin", "size": 500_000
+        })
+        self.assertEqual(response.status_code, 413)
+        response = self.client.post(f"/groups/{self.group_id}/chat/uploads", json={
+            "user_id": self.user_id, "filename": "a.bin", "size": 10
+        })
+        location = response.headers["Location"]
+        self.assertEqual(self.client.patch(location, data=b"x").status_code, 400)
+        self.assertEqual(self.client.get(location.replace(f"/groups/{self.group_id}/", "/groups/999/")).status_code, 404)
+        self.assertEqual(self.client.delete(location).status_code, 200)
+        self.assertEqual(self.client.get(location).status_code, 404)
+
+
+def jpeg_bytes(width=1200, height=900):
+    buffer = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert("RGB").save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class AttachmentServingTests(ChatUploadRouteCase):
+    max_bytes = 5_000_000
+
+    def test_images_get_a_thumbnail(self):
+        data = jpeg_bytes()
+        message = self.upload(data).get_json()
+        self.assertTrue(message["thumbnail_url"].endswith(".thumb.jpg"))
+        thumbnail = self.client.get(message["thumbnail_url"])
+        with Image.open(io.BytesIO(thumbnail.data)) as image:
+            self.assertEqual(image.size, (320, 240))
+        self.assertLess(len(thumbnail.data), len(data) / 10)
+        listed = self.client.get(f"/groups/{self.group_id}/chat").get_json()[-1]
+        self.assertEqual(listed["thumbnail_url"], message["thumbnail_url"])
+
+    def test_other_files_have_no_thumbnail(self):
+        self.assertIsNone(self.upload(b"%PDF-1.4", "doc.pdf").get_json()["thumbnail_url"])
+        self.assertIsNone(self.upload(b"not really a jpeg", "broken.jpg").get_json()["thumbnail_url"])
+
+    def test_immutable_strong_etag_and_revalidation(self):
+        data = jpeg_bytes(200, 100)
+        url = self.upload(data).get_json()["file_url"]
+        response = self.client.get(url)
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(response.headers["ETag"], f'"{digest}"')
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertEqual(content_etag(url.removeprefix("/uploads/")), digest)
+
+        revalidated = self.client.get(url, headers={"If-None-Match": f'"{digest}"'})
+        self.assertEqual((revalidated.status_code, revalidated.data), (304, b""))
+
+    def test_range_requests(self):
+        data = os.urandom(5000)
+        url = self.upload(data, "clip.mp4").get_json()["file_url"]
+        response = self.client.get(url, headers={"Range": "bytes=1000-1999"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, data[1000:2000])
+        self.assertEqual(response.headers["Content-Range"], "bytes 1000-1999/5000")
+
+    def test_legacy_flat_files_are_revalidated(self):
+        with open(os.path.join(self.root, "old.jpg"), "wb") as legacy:
+            legacy.write(b"old")
+        response = self.client.get("/uploads/old.jpg")
+        self.assertEqual(response.data, b"old")
+        self.assertNotIn("immutable", response.headers.get("Cache-Control", ""))
+
+    def test_migration_backfills_thumbnails(self):
+        stored = store_stream(self.root, io.BytesIO(jpeg_bytes(640, 480)), "a.jpg")
+        db.session.add(GroupMessage(group_id=self.group_id, user_id=self.user_id,
+                                    file_url=f"/uploads/{stored.relative_path}"))
+        db.session.commit()
+        self.assertEqual(migrate_chat_thumbnails(self.root), 1)
+        self.assertTrue(GroupMessage.query.one().thumbnail_url.endswith(".thumb.jpg"))
+        self.assertEqual(migrate_chat_thumbnails(self.root), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
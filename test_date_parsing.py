@@ -0,0 +1,59 @@
+import unittest
+from datetime import date, datetime
+
+import date_parsing
+from date_parsing import parse_datetime_value
+from AI.AiChat import find_most_urgent, format_due_date
+
+
+class ParseDatetimeValueTests(unittest.TestCase):
+
+    def test_known_formats(self):
+        expected = datetime(2025, 4, 1, 10, 30, 15)
+        for value in ["2025-04-01 10:30:15", "2025-04-01T10:30:15", "2025-04-01 10:30:15.000",
+                      "2025-04-01T10:30:15.000Z", "Tue, 01 Apr 2025 10:30:15 GMT", " 2025-04-01 10:30:15 "]:
+            self.assertEqual(parse_datetime_value(value), expected, value)
+        self.assertEqual(parse_datetime_value("2025-04-01"), datetime(2025, 4, 1))
+
+    def test_offsets_become_naive_utc(self):
+        self.assertEqual(parse_datetime_value("2025-04-01T12:00:00+02:00"), datetime(2025, 4, 1, 10, 0))
+
+    def test_native_values_pass_through(self):
+        now = datetime(2025, 1, 2, 3, 4, 5)
+        self.assertIs(parse_datetime_value(now), now)
+        self.assertEqual(parse_datetime_value(date(2025, 1, 2)), datetime(2025, 1, 2))
+
+    def test_empty_and_invalid(self):
+        for value in [None, "", "   ", "soon", 42, "2025-02-30"]:
+            self.assertIsNone(parse_datetime_value(value), value)
+
+    def test_invalid_value_does_not_poison_its_shape(self):
+        self.assertIsNone(parse_datetime_value("2031-13-01"))
+        self.assertEqual(parse_datetime_value("2031-12-01"), datetime(2031, 12, 1))
+
+    def test_parser_is_memoized_per_shape(self):
+        parse_datetime_value("2025-04-01 10:30:15")
+        shape = "2025-04-01 10:30:15".translate(date_parsing._SHAPE)
+        self.assertEqual(date_parsing._parsers_by_shape[shape], date_parsing._ISO)
+
+
+class AiDeadlineTests(unittest.TestCase):
+
+    def test_find_most_urgent_accepts_native_and_string_deadlines(self):
+        tasks = [
+            {"title": "later", "status": "To Do", "deadline": datetime(2030, 1, 5), "priority": 1},
+            {"title": "sooner", "status": None, "deadline": "2030-01-02 09:00:00", "priority": 2},
+            {"title": "finished", "status": "Done", "deadline": datetime(2029, 1, 1), "priority": 1},
+            {"title": "no deadline", "status": "To Do", "deadline": None, "priority": 1},
+        ]
+        self.assertEqual(find_most_urgent(tasks)["title"], "sooner")
+
+    def test_format_due_date(self):
+        now = datetime(2030, 1, 1, 12, 0)
+        self.assertEqual(format_due_date({"deadline": datetime(2030, 1, 4, 13, 0)}, now), "due in 3 days")
+        self.assertEqual(format_due_date({"deadline": "2029-12-31 00:00:00"}, now), "overdue")
+        self.assertEqual(format_due_date({}, now), "No deadline")
+
+
+if __name__ == '__main__':
+    unittest.main()
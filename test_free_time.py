@@ -0,0 +1,133 @@
+import random
+import unittest
+
+from extensions import db
+from free_time import DAYS, FreeTimeline, merge_intervals, parse_time_ranges, format_clock
+from availability import save_availability
+from models import User, PersonalTask
+from testing_utils import make_test_app
+
+
+def hourly_slots(time_ranges):
+    """The old generate_schedule expansion: one start time per whole hour of each range."""
+    slots = []
+    for start, end in parse_time_ranges(time_ranges):
+        current = start
+        while current + 60 <= end:
+            slots.append(current)
+            current += 60
+    return sorted(slots)
+
+
+class FreeTimelineTests(unittest.TestCase):
+
+    def test_parse_time_ranges(self):
+        self.assertEqual(parse_time_ranges("09:00-12:30, 14:00-15:00"), [(540, 750), (840, 900)])
+        self.assertEqual(parse_time_ranges("22:00-24:00"), [(1320, 1440)])
+        self.assertEqual(parse_time_ranges("bad,10:00-09:00,25:00-26:00,"), [])
+        self.assertEqual(parse_time_ranges(None), [])
+
+    def test_merge_intervals(self):
+        self.assertEqual(merge_intervals([(600, 700), (540, 610), (700, 720), (800, 900)]),
+                         [(540, 720), (800, 900)])
+
+    def test_allocates_earliest_fitting_interval(self):
+        timeline = FreeTimeline({"Monday": [(540, 570), (600, 720)], "Sunday": [(1200, 1230)]})
+        self.assertEqual(timeline.free_minutes, 180)
+        self.assertEqual(timeline.allocate(60), ("Monday", 600, 660))
+        self.assertEqual(timeline.allocate(30), ("Sunday", 1200, 1230))
+        self.assertEqual(timeline.allocate(30), ("Monday", 540, 570))
+        self.assertEqual(timeline.allocate(60), ("Monday", 660, 720))
+        self.assertIsNone(timeline.allocate(1))
+        self.assertEqual(timeline.free_minutes, 0)
+
+    def test_empty_timeline(self):
+        timeline = FreeTimeline({})
+        self.assertIsNone(timeline.allocate(60))
+        self.assertEqual(timeline.intervals(), {day: [] for day in DAYS})
+
+    def test_hourly_allocation_matches_old_slot_lists(self):
+        rng = random.Random(11)
+        for _ in range(200):
+            ranges = {}
+            for day in DAYS:
+                parts = []
+                for _ in range(rng.randint(0, 3)):
+                    start = rng.randrange(0, 22 * 60, 30)
+                    parts.append(f"{format_clock(start)}-{format_clock(start + rng.randrange(30, 180, 30))}")
+                # The old code counted overlapping ranges twice, so only compare disjoint ones
+                if len(merge_intervals(parse_time_ranges(",".join(parts)))) == len(parse_time_ranges(",".join(parts))):
+                    ranges[day] = ",".join(parts)
+            expected = [(day, slot) for day in DAYS for slot in hourly_slots(ranges.get(day))]
+
+            timeline = FreeTimeline({day: parse_time_ranges(text) for day, text in ranges.items()})
+            allocated = []
+            while True:
+                chunk = timeline.allocate(60)
+                if chunk is None:
+                    break
+                allocated.append(chunk[:2])
+            self.assertEqual(allocated, expected)
+
+
+class GenerateScheduleTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        user = User(username="planner", email="planner@example.com")
+        db.session.add(user)
+        db.session.flush()
+        self.user_id = user.userId
+        save_availability(user.userId, {"monday": parse_time_ranges("09:00-10:00,09:30-11:15"),
+                                        "tuesday": parse_time_ranges("08:00-08:45")})
+        self.task_ids = []
+        for title in ["write", "review"]:
+            task = PersonalTask(title=title, status="In Progress", priority=1, user_id=user.userId)
+            db.session.add(task)
+            db.session.flush()
+            self.task_ids.append(task.id)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def post(self, **payload):
+        return self.client.post("/ai/generate-schedule", json={"user_id": self.user_id, **payload})
+
+    def test_hourly_slots_use_merged_ranges(self):
+        response = self.post(task_hours={str(self.task_ids[0]): 2, str(self.task_ids[1]): 1})
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        monday = payload["schedule"][0]
+        self.assertEqual(monday["day"], "Monday")
+        self.assertEqual([(t["task"], t["start_time"], t["time"]) for t in monday["tasks"]],
+                         [("write", "09:00", 1), ("write", "10:00", 1)])
+        self.assertEqual(payload["unassigned_tasks"], ["review"])
+
+    def test_sub_hour_slots(self):
+        response = self.post(task_hours={str(self.task_ids[0]): 2.5, str(self.task_ids[1]): 0.5}, slot_minutes=15)
+        payload = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(payload["unassigned_tasks"], [])
+        by_task = {}
+        for day in payload["schedule"]:
+            for entry in day["tasks"]:
+                by_task.setdefault(entry["task"], []).append((day["day"], entry["start_time"]))
+        self.assertEqual(len(by_task["write"]), 10)
+        self.assertEqual(by_task["review"], [("Tuesday", "08:15"), ("Tuesday", "08:30")])
+
+    def test_invalid_slot_minutes(self):
+        self.assertEqual(self.post(task_hours={str(self.task_ids[0]): 1}, slot_minutes=0).status_code, 400)
+        self.assertEqual(self.post(task_hours={str(self.task_ids[0]): 1}, slot_minutes="x").status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+from datetime import datetime
+
+from commands import create_missing_indexes
+from extensions import db
+from group_chat import backfill_read_markers
+from models import User, Group, GroupMessage, GroupMessageRead, group_user_association
+from testing_utils import make_test_app, count_queries
+
+
+class GroupChatPaginationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"chatter{i}", email=f"c{i}@example.com") for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        group = Group(name="chat", created_by=users[0].userId)
+        other = Group(name="other", created_by=users[0].userId)
+        db.session.add_all([group, other])
+        db.session.flush()
+        self.group_id = group.id
+        messages = [GroupMessage(group_id=group.id, user_id=users[i % 2].userId, content=f"m{i}",
+                                 timestamp=datetime(2030, 1, 1)) for i in range(120)]
+        messages.append(GroupMessage(group_id=other.id, user_id=users[0].userId, content="elsewhere"))
+        db.session.add_all(messages)
+        db.session.commit()
+        self.ids = [m.id for m in messages[:120]]
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def get(self, **params):
+        return self.client.get(f"/groups/{self.group_id}/chat", query_string=params)
+
+    def test_latest_page_by_default(self):
+        response = self.get()
+        payload = response.get_json()
+        self.assertEqual([m["id"] for m in payload], self.ids[-50:])
+        self.assertEqual(response.headers["X-Has-More"], "true")
+        self.assertEqual(payload[-1]["username"], "chatter1")
+        self.assertEqual(payload[-1]["content"], "m119")
+        self.assertIn("file_url", payload[-1])
+
+    def test_scroll_back_with_before_id(self):
+        response = self.get(before_id=self.ids[30], limit=20)
+        self.assertEqual([m["id"] for m in response.get_json()], self.ids[10:30])
+        self.assertEqual(response.headers["X-Has-More"], "true")
+        response = self.get(before_id=self.ids[10], limit=20)
+        self.assertEqual([m["id"] for m in response.get_json()], self.ids[:10])
+        self.assertEqual(response.headers["X-Has-More"], "false")
+
+    def test_sync_after_id(self):
+        response = self.get(after_id=self.ids[-3])
+        self.assertEqual([m["id"] for m in response.get_json()], self.ids[-2:])
+        self.assertEqual(response.headers["X-Has-More"], "false")
+        self.assertEqual(self.get(after_id=self.ids[-1]).get_json(), [])
+        response = self.get(after_id=0, limit=500)
+        self.assertEqual(len(response.get_json()), 120)  # limit is capped at 200
+
+    def test_one_query_per_poll(self):
+        with count_queries() as counter:
+            self.get()
+        self.assertEqual(counter.count, 1)
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.get(after_id="x").status_code, 400)
+        self.assertEqual(self.get(after_id=1, before_id=5).status_code, 400)
+
+    def test_create_missing_indexes(self):
+        next(i for i in GroupMessage.__table__.indexes if i.name == "IX_GroupMessages_Group_Id").drop(db.engine)
+        self.assertEqual(create_missing_indexes(), ["IX_GroupMessages_Group_Id"])
+        self.assertEqual(create_missing_indexes(), [])
+
+
+class UnreadSummaryTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"reader{i}", email=f"r{i}@example.com") for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.me, self.other = users[0].userId, users[1].userId
+        # Created by me, member of, and a group I'm not in
+        groups = [Group(name="mine", created_by=self.me), Group(name="joined", created_by=self.other),
+                  Group(name="foreign", created_by=self.other)]
+        db.session.add_all(groups)
+        db.session.flush()
+        self.mine, self.joined, self.foreign = [g.id for g in groups]
+        db.session.execute(group_user_association.insert(), [{"group_id": self.joined, "user_id": self.me}])
+        self.messages = {}
+        for group_id in (self.mine, self.joined, self.foreign):
+            rows = [GroupMessage(group_id=group_id, user_id=self.other if i % 3 else self.me, content=f"m{i}",
+                                 timestamp=datetime(2030, 1, 1, 9, i)) for i in range(6)]
+            db.session.add_all(rows)
+            db.session.flush()
+            self.messages[group_id] = [m.id for m in rows]
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def summary(self):
+        return self.client.get(f"/chat/unread/{self.me}").get_json()
+
+    def test_counts_messages_from_others_after_last_read_id(self):
+        db.session.add(GroupMessageRead(user_id=self.me, group_id=self.joined,
+                                        last_read_message_id=self.messages[self.joined][3]))
+        db.session.commit()
+        # Own messages (every third) never count
+        self.assertEqual(self.summary(), {
+            "groups": [{"group_id": self.mine, "unread": 4}, {"group_id": self.joined, "unread": 2}],
+            "total_unread": 6,
+        })
+
+    def test_mark_read_records_the_latest_message_id(self):
+        response = self.client.post(f"/groups/{self.mine}/chat/mark_read/{self.me}")
+        self.assertEqual(response.get_json()["last_read_message_id"], self.messages[self.mine][-1])
+        self.assertEqual(self.summary()["groups"][0], {"group_id": self.mine, "unread": 0})
+
+    def test_one_query_for_fifty_groups(self):
+        groups = [Group(name=f"g{i}", created_by=self.other) for i in range(50)]
+        db.session.add_all(groups)
+        db.session.flush()
+        db.session.execute(group_user_association.insert(), [{"group_id": g.id, "user_id": self.me} for g in groups])
+        db.session.add_all([GroupMessage(group_id=g.id, user_id=self.other, content="hi") for g in groups])
+        db.session.commit()
+        with count_queries() as counter:
+            payload = self.summary()
+        self.assertEqual(counter.count, 1)
+        self.assertEqual(len(payload["groups"]), 52)
+        self.assertEqual(payload["total_unread"], 4 + 4 + 50)
+
+    def test_backfill_from_last_read_time(self):
+        db.session.add(GroupMessageRead(user_id=self.me, group_id=self.mine,
+                                        last_read_time=datetime(2030, 1, 1, 9, 2)))
+        db.session.commit()
+        self.assertEqual(backfill_read_markers(), 1)
+        read = GroupMessageRead.query.filter_by(user_id=self.me, group_id=self.mine).one()
+        self.assertEqual(read.last_read_message_id, self.messages[self.mine][2])
+        self.assertEqual(backfill_read_markers(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
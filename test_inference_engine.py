@@ -0,0 +1,72 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+
+from AI.inference_engine import ARTIFACT_PATH, MlpInferenceEngine, export_inference_artifact
+from AI.batch_predictor import predict_minutes
+
+HAS_TENSORFLOW = importlib.util.find_spec("tensorflow") is not None
+
+
+def _random_features(n=256, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(0, 5, n), rng.integers(1, 5, n), rng.uniform(1, 480, n),
+        rng.integers(0, 24, n), rng.integers(0, 3, n)
+    ]).astype(np.float64)
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, "TensorFlow is required for the Keras parity check")
+class InferenceEngineParityTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from tensorflow import keras
+        cls.model = keras.models.load_model("AI/task_prediction_model.keras")
+        cls.feature_scaler = joblib.load("AI/feature_scaler.pkl")
+        cls.time_scaler = joblib.load("AI/time_scaler.pkl")
+
+    def test_fresh_export_matches_keras(self):
+        features = _random_features()
+        expected = predict_minutes(self.model, self.feature_scaler, self.time_scaler, features)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = export_inference_artifact(
+                self.model, self.feature_scaler, self.time_scaler, os.path.join(tmp, "model.npz")
+            )
+            engine = MlpInferenceEngine.load(path)
+        np.testing.assert_allclose(engine.predict_minutes(features), expected, rtol=1e-4, atol=1e-2)
+
+    def test_committed_artifact_matches_keras(self):
+        features = _random_features(seed=1)
+        expected = predict_minutes(self.model, self.feature_scaler, self.time_scaler, features)
+        engine = MlpInferenceEngine.load(ARTIFACT_PATH)
+        np.testing.assert_allclose(engine.predict_minutes(features), expected, rtol=1e-4, atol=1e-2)
+
+
+class InferenceEngineTests(unittest.TestCase):
+
+    def test_single_row_and_batch_agree(self):
+        engine = MlpInferenceEngine.load(ARTIFACT_PATH)
+        features = _random_features(n=8)
+        batch = engine.predict_minutes(features)
+        singles = [engine.predict_minutes(row)[0] for row in features]
+        np.testing.assert_allclose(batch, singles)
+
+    def test_folded_scalers_match_explicit_scaling(self):
+        rng = np.random.default_rng(2)
+        kernels = [rng.normal(size=(5, 4)), rng.normal(size=(4, 1))]
+        biases = [rng.normal(size=4), rng.normal(size=1)]
+        mean, scale = rng.normal(size=5), rng.uniform(0.5, 2, size=5)
+        engine = MlpInferenceEngine(kernels, biases, ["relu", "linear"], mean, scale, [800.0], [300.0])
+
+        x = _random_features(n=16)
+        hidden = np.maximum(((x - mean) / scale) @ kernels[0] + biases[0], 0)
+        expected = (hidden @ kernels[1] + biases[1]).reshape(-1) * 300.0 + 800.0
+        np.testing.assert_allclose(engine.predict_minutes(x), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
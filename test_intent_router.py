@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from AI.AiChat import (
+    is_small_talk, is_urgent_query, is_time_query, is_status_query,
+    is_personal_task_query, is_group_task_query, extract_requested_status
+)
+from AI.intent_router import (
+    classify_message, STATUS_KEYWORDS, URGENT_KEYWORDS, TIME_KEYWORDS,
+    PERSONAL_KEYWORDS, GROUP_KEYWORDS, SMALL_TALK_PHRASES
+)
+
+GOLDEN_MESSAGES = [
+    "Hi!", "hello", "How are you?", "what's up", "yo", "help", "Can you help?",
+    "What time is it?", "what's the time", "Tell me today's date",
+    "What is urgent?", "What should I do first?", "which group task is urgent",
+    "Show my tasks in progress", "show my to do list", "What's todo", "what have I completed",
+    "not started personal tasks", "group tasks that are done", "team to do please",
+    "my to do in progress", "next deadline for my team task",
+    "Nothing matches here", "", "   ", "I'm undone", "abandoned project", "donetodo",
+    "in progresss", "HELLO", "Any tips?!", "hey there", "urgent task in progress",
+]
+
+
+def reference_classification(message):
+    """What AiChat's original helpers report for a message."""
+    intents = set()
+    if is_status_query(message): intents.add("status")
+    if is_urgent_query(message): intents.add("urgent")
+    if is_time_query(message): intents.add("time")
+    if is_small_talk(message): intents.add("small_talk")
+    if is_personal_task_query(message): intents.add("personal")
+    if is_group_task_query(message): intents.add("group")
+    return frozenset(intents), extract_requested_status(message)
+
+
+class IntentRouterTests(unittest.TestCase):
+
+    def assertMatchesReference(self, message):
+        intents, status = classify_message(message)
+        self.assertEqual((intents, status), reference_classification(message), repr(message))
+
+    def test_golden_messages(self):
+        for message in GOLDEN_MESSAGES:
+            self.assertMatchesReference(message)
+
+    def test_random_keyword_mixes(self):
+        rng = random.Random(9)
+        fragments = (STATUS_KEYWORDS + URGENT_KEYWORDS + TIME_KEYWORDS + PERSONAL_KEYWORDS
+                     + GROUP_KEYWORDS + sorted(SMALL_TALK_PHRASES)
+                     + ["todo", "my", "task", "the", "pro", "gress", "do", "ne", "?", "!", "  "])
+        for _ in range(3000):
+            parts = rng.sample(fragments, rng.randint(1, 4))
+            joiner = rng.choice([" ", "", ", "])
+            message = joiner.join(parts)
+            if rng.random() < 0.3:
+                message = message.upper()
+            self.assertMatchesReference(message)
+
+    def test_status_priority(self):
+        self.assertEqual(classify_message("done or in progress?").status, "in progress")
+        self.assertEqual(classify_message("completed, not started").status, "completed")
+        self.assertIsNone(classify_message("what is urgent").status)
+
+
+if __name__ == '__main__':
+    unittest.main()
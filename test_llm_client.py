@@ -0,0 +1,160 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest import mock
+
+from AI.llm_client import LLMClient, LLMError, normalize_prompt
+from testing_utils import StubLLMServer
+
+MESSAGES = [{"role": "user", "content": "Hello   there"}]
+
+
+class LLMClientTests(unittest.TestCase):
+
+    def make_client(self, stub, **kwargs):
+        kwargs.setdefault("backoff_factor", 0)
+        return LLMClient("test-key", "test-model", base_url=stub.base_url, **kwargs)
+
+    def test_complete_sends_payload(self):
+        with StubLLMServer(reply="  hi!  ") as stub:
+            client = self.make_client(stub)
+            self.assertEqual(client.complete(MESSAGES, max_tokens=5), "hi!")
+        self.assertEqual(stub.requests[0]["model"], "test-model")
+        self.assertEqual(stub.requests[0]["max_tokens"], 5)
+
+    def test_connections_are_reused(self):
+        with StubLLMServer() as stub:
+            client = self.make_client(stub)
+            for _ in range(5):
+                client.complete(MESSAGES)
+        self.assertEqual(len(stub.requests), 5)
+        self.assertEqual(stub.connections, 1)
+
+    def test_cache_serves_normalized_repeats(self):
+        with StubLLMServer() as stub:
+            client = self.make_client(stub)
+            client.complete(MESSAGES, cache=True)
+            client.complete([{"role": "user", "content": "hello there "}], cache=True)
+            client.complete(MESSAGES)  # cache not requested
+        self.assertEqual(len(stub.requests), 2)
+        self.assertEqual(client.cache.hits, 1)
+
+    def test_retries_with_backoff_then_succeeds(self):
+        with StubLLMServer(fail_first=[503, 429]) as stub:
+            client = self.make_client(stub, max_retries=2)
+            self.assertEqual(client.complete(MESSAGES), "stub reply")
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_gives_up_after_retries(self):
+        with StubLLMServer(fail_first=[500, 500, 500]) as stub:
+            client = self.make_client(stub, max_retries=1)
+            with self.assertRaises(LLMError):
+                client.complete(MESSAGES)
+
+    def test_read_timeout(self):
+        with StubLLMServer(delay=0.5) as stub:
+            client = self.make_client(stub, read_timeout=0.05, max_retries=0)
+            with self.assertRaises(LLMError):
+                client.complete(MESSAGES)
+
+    def test_async_variant(self):
+        with StubLLMServer(delay=0.05) as stub:
+            client = self.make_client(stub)
+
+            async def run():
+                return await asyncio.gather(*[client.acomplete(MESSAGES) for _ in range(10)])
+
+            self.assertEqual(asyncio.run(run()), ["stub reply"] * 10)
+
+    def test_stream_yields_tokens_as_they_arrive(self):
+        with StubLLMServer(reply="one two three four", token_delay=0.1) as stub:
+            client = self.make_client(stub)
+            start = time.perf_counter()
+            stream = client.stream(MESSAGES)
+            first = next(stream)
+            first_token_at = time.perf_counter() - start
+            rest = list(stream)
+        self.assertEqual(first + "".join(rest), "one two three four")
+        self.assertLess(first_token_at, 0.2)
+        self.assertTrue(stub.requests[0]["stream"])
+
+    def test_stream_decodes_utf8(self):
+        with StubLLMServer(reply="Café — مرحبا 👋") as stub:
+            client = self.make_client(stub)
+            self.assertEqual("".join(client.stream(MESSAGES)), "Café — مرحبا 👋")
+
+    def test_stream_uses_and_fills_cache(self):
+        with StubLLMServer(reply="cached words") as stub:
+            client = self.make_client(stub)
+            self.assertEqual("".join(client.stream(MESSAGES, cache=True)), "cached words")
+            self.assertEqual(list(client.stream(MESSAGES, cache=True)), ["cached words"])
+            self.assertEqual(client.complete(MESSAGES, cache=True), "cached words")
+        self.assertEqual(len(stub.requests), 1)
+
+    def test_normalize_prompt(self):
+        self.assertEqual(normalize_prompt("  What's\n the   TIME "), "what's the time")
+
+
+class AiChatClientTests(unittest.TestCase):
+
+    def test_small_talk_is_cached(self):
+        from AI import AiChat
+        with StubLLMServer(reply="Hello!") as stub:
+            client = LLMClient("test-key", AiChat.TOGETHER_MODEL, base_url=stub.base_url)
+            with mock.patch.object(AiChat, "_llm_client", client), \
+                    mock.patch.object(AiChat, "TOGETHER_API_KEY", "test-key"):
+                replies = [AiChat.generate_ai_advice("Hello!", None, [], [], []) for _ in range(3)]
+        self.assertEqual(replies, ["Hello!"] * 3)
+        self.assertEqual(len(stub.requests), 1)
+
+
+class ChatStreamingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from testing_utils import make_test_app
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def chat(self, stub, **kwargs):
+        from AI import AiChat
+        client = LLMClient("test-key", AiChat.TOGETHER_MODEL, base_url=stub.base_url)
+        with mock.patch.object(AiChat, "_llm_client", client), \
+                mock.patch.object(AiChat, "TOGETHER_API_KEY", "test-key"):
+            start = time.perf_counter()
+            response = self.client.post("/chat", buffered=False, **kwargs)
+            chunks = iter(response.response)
+            first = next(chunks)
+            first_at = time.perf_counter() - start
+            body = first + b"".join(chunks)
+        return response, body.decode(), first_at
+
+    def test_sse_streams_tokens_then_done_event(self):
+        with StubLLMServer(reply="Plan your day now", token_delay=0.1) as stub:
+            response, body, first_at = self.chat(stub, json={"user_id": 1, "message": "What should I plan?", "stream": True})
+        self.assertEqual(response.mimetype, "text/event-stream")
+        events = [e for e in body.split("\n\n") if e]
+        tokens = [json.loads(e[len("data: "):])["token"] for e in events[:-1]]
+        self.assertEqual("".join(tokens), "Plan your day now")
+        self.assertTrue(events[-1].startswith("event: done"))
+        self.assertEqual(json.loads(events[-1].split("data: ", 1)[1])["reply"], "Plan your day now")
+        self.assertLess(first_at, 0.25)  # upstream takes 0.3 s to finish
+
+    def test_accept_header_selects_streaming(self):
+        with StubLLMServer(reply="Hi") as stub:
+            response, body, _ = self.chat(stub, json={"user_id": 1, "message": "What now?"},
+                                          headers={"Accept": "text/event-stream"})
+        self.assertIn('"token": "Hi"', body)
+
+    def test_json_fallback_unchanged(self):
+        from AI import AiChat
+        with StubLLMServer(reply="Plain reply") as stub:
+            client = LLMClient("test-key", AiChat.TOGETHER_MODEL, base_url=stub.base_url)
+            with mock.patch.object(AiChat, "_llm_client", client), \
+                    mock.patch.object(AiChat, "TOGETHER_API_KEY", "test-key"):
+                response = self.client.post("/chat", json={"user_id": 1, "message": "What now?"})
+        self.assertEqual(response.get_json(), {"reply": "Plain reply"})
+
+
+if __name__ == '__main__':
+    unittest.main()
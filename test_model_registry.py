@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+
+from AI.model_registry import COMPONENTS, ModelRegistry
+
+
+class ModelRegistryTests(unittest.TestCase):
+
+    def test_nothing_loaded_until_first_use(self):
+        registry = ModelRegistry("AI")
+        self.assertFalse(registry.loaded)
+        self.assertEqual(registry.missing_files(), [])
+        self.assertIsNotNone(registry.get("CATEGORY_ENCODER"))
+        self.assertTrue(registry.loaded)
+
+    def test_warm_up_loads_in_background(self):
+        registry = ModelRegistry("AI")
+        registry.warm_up().join(timeout=60)
+        self.assertTrue(registry.loaded)
+        for name in COMPONENTS:
+            self.assertIsNotNone(registry.get(name))
+
+    def test_unknown_component(self):
+        with self.assertRaises(KeyError):
+            ModelRegistry("AI").get("NOT_A_COMPONENT")
+
+    def test_missing_files_reported_and_components_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = ModelRegistry(tmp)
+            self.assertIn(os.path.join(tmp, "category_encoder.pkl"), registry.missing_files())
+            self.assertIsNone(registry.get("MODEL"))
+
+
+if __name__ == '__main__':
+    unittest.main()
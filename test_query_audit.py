@@ -0,0 +1,105 @@
+import unittest
+
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import IntegrityError
+
+from commands import create_missing_indexes, remove_duplicate_rows
+from extensions import db
+from models import Group, User, group_user_association, task_user_association
+from query_audit import audit_routes, full_scans, seed_audit_data
+from testing_utils import make_test_app
+
+
+def drop_index(table, name):
+    next(index for index in table.indexes if index.name == name).drop(db.engine)
+
+
+class QueryAuditTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.ids = seed_audit_data(users=30, personal_tasks=500, groups=10, group_tasks=100, messages=300,
+                                   members_per_group=5)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def test_audited_routes_use_indexes(self):
+        results = audit_routes(self.client, self.ids)
+        self.assertGreaterEqual(len({result.route for result in results}), 11)
+        self.assertEqual([(r.route, r.full_scans) for r in results if r.full_scans], [])
+
+    def test_flags_scan_without_index(self):
+        drop_index(task_user_association, "IX_task_user_association_User_Task")
+        results = audit_routes(self.client, self.ids, ["/group-tasks/user/{user_id}"])
+        self.assertIn("task_user_association", results[0].full_scans)
+
+        create_missing_indexes()
+        results = audit_routes(self.client, self.ids, ["/group-tasks/user/{user_id}"])
+        self.assertEqual(results[0].full_scans, [])
+
+    def test_full_scans_parsing(self):
+        tables = {"Groups", "GroupTasks"}
+        plan = ["SCAN Groups", "SEARCH GroupTasks USING INDEX IX_GroupTasks_Group_Status (group_id=?)",
+                "SCAN GroupTasks USING COVERING INDEX IX_GroupTasks_Group_Status", "SCAN anon_1"]
+        self.assertEqual(full_scans(plan, "sqlite", tables), ["Groups"])
+        self.assertEqual(full_scans(['Seq Scan on "GroupTasks"  (cost=0.00..1.05 rows=5 width=4)'],
+                                    "postgresql", tables), ["GroupTasks"])
+
+
+class AssociationKeyTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.users = [User(username=f"u{i}", email=f"u{i}@example.com") for i in range(2)]
+        db.session.add_all(self.users)
+        db.session.flush()
+        self.group = Group(name="team", created_by=self.users[0].userId)
+        db.session.add(self.group)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def add_member(self, user):
+        db.session.execute(group_user_association.insert().values(group_id=self.group.id, user_id=user.userId))
+        db.session.commit()
+
+    def test_association_pairs_are_unique(self):
+        names = {index["name"]: index["unique"] for index in inspect(db.engine).get_indexes("group_user_association")}
+        self.assertEqual(names, {"UQ_group_user_association_Group_User": 1,
+                                 "IX_group_user_association_User_Group": 0})
+        self.add_member(self.users[0])
+        with self.assertRaises(IntegrityError):
+            self.add_member(self.users[0])
+
+    def test_duplicates_removed_before_unique_index(self):
+        drop_index(group_user_association, "UQ_group_user_association_Group_User")
+        for user in (self.users[0], self.users[1], self.users[0], self.users[0]):
+            self.add_member(user)
+
+        self.assertEqual(create_missing_indexes(), ["UQ_group_user_association_Group_User"])
+        rows = db.session.execute(select(group_user_association.c.id, group_user_association.c.user_id)
+                                  .order_by(group_user_association.c.id)).all()
+        self.assertEqual(rows, [(1, self.users[0].userId), (2, self.users[1].userId)])
+        self.assertEqual(remove_duplicate_rows(group_user_association, [group_user_association.c.group_id,
+                                                                    group_user_association.c.user_id]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
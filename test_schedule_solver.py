@@ -0,0 +1,133 @@
+import unittest
+from datetime import datetime
+
+from extensions import db
+from availability import save_availability
+from models import User, PersonalTask
+from schedule_solver import SolverTask, dated_chunks, solve_edf, task_report
+from testing_utils import make_test_app
+
+# Sunday 2030-01-06, 08:00
+START = datetime(2030, 1, 6, 8, 0)
+
+
+def hourly_chunks(days=7):
+    # 09:00-12:00 free every day
+    return dated_chunks({day: [(540, 720)] for day in ["Sunday", "Monday", "Tuesday", "Wednesday",
+                                                      "Thursday", "Friday", "Saturday"]}, 60, START)[:days * 3]
+
+
+class SolveEdfTests(unittest.TestCase):
+
+    def test_dated_chunks_follow_the_calendar(self):
+        chunks = dated_chunks({"Monday": [(540, 660)], "Sunday": [(420, 600)]}, 60, START)
+        # Sunday 07:00 is already past at 08:00
+        self.assertEqual([(c.day, c.starts_at) for c in chunks], [
+            ("Sunday", datetime(2030, 1, 6, 8, 0)),
+            ("Sunday", datetime(2030, 1, 6, 9, 0)),
+            ("Monday", datetime(2030, 1, 7, 9, 0)),
+            ("Monday", datetime(2030, 1, 7, 10, 0)),
+        ])
+
+    def test_deadline_order_beats_priority_order(self):
+        chunks = hourly_chunks()
+        tasks = [
+            SolverTask("important, due friday", 3, datetime(2030, 1, 11, 12, 0), 1),
+            SolverTask("minor, due sunday noon", 3, datetime(2030, 1, 6, 12, 0), 4),
+        ]
+        assignment, set_aside = solve_edf(tasks, chunks)
+        self.assertEqual(set_aside, set())
+        for task in tasks:
+            report = task_report(task, assignment[task.key], 60)
+            self.assertTrue(report["on_time"], task.key)
+        self.assertEqual(task_report(tasks[1], assignment[tasks[1].key], 60)["slack_minutes"], 0)
+
+    def test_lookahead_sets_aside_least_important(self):
+        chunks = hourly_chunks()
+        deadline = datetime(2030, 1, 7, 12, 0)  # 6 hours of free time before it
+        tasks = [
+            SolverTask("a", 3, deadline, 1),
+            SolverTask("b", 2, deadline, 3),
+            SolverTask("c", 3, deadline, 2),
+        ]
+        assignment, set_aside = solve_edf(tasks, chunks)
+        self.assertEqual(set_aside, {"b"})
+        self.assertTrue(all(c.ends_at <= deadline for c in assignment["a"] + assignment["c"]))
+        # Set-aside tasks still get the leftover time, late
+        self.assertEqual(len(assignment["b"]), 2)
+        self.assertFalse(task_report(tasks[1], assignment["b"], 60)["on_time"])
+
+    def test_impossible_task_does_not_evict_others(self):
+        chunks = hourly_chunks()
+        tasks = [
+            SolverTask("ok", 2, datetime(2030, 1, 6, 12, 0), 4),
+            SolverTask("overdue", 1, datetime(2030, 1, 1), 1),
+        ]
+        assignment, set_aside = solve_edf(tasks, chunks)
+        self.assertEqual(set_aside, {"overdue"})
+        self.assertEqual(assignment["ok"], chunks[:2])
+
+    def test_capacity_exhausted(self):
+        chunks = hourly_chunks(days=1)
+        tasks = [SolverTask("big", 5, None, 2)]
+        assignment, set_aside = solve_edf(tasks, chunks)
+        report = task_report(tasks[0], assignment["big"], 60)
+        # Partially scheduled, like the greedy solver, and reported as unfinished
+        self.assertEqual((report["scheduled_hours"], report["unscheduled_hours"]), (3, 2))
+        self.assertIsNone(report["finish"])
+        self.assertEqual(set_aside, {"big"})
+
+
+class EdfRouteTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        user = User(username="edf", email="edf@example.com")
+        db.session.add(user)
+        db.session.flush()
+        self.user_id = user.userId
+        save_availability(user.userId, {"sunday": [(540, 660)], "monday": [(540, 660)]})
+        self.urgent = PersonalTask(title="urgent", status="In Progress", priority=3, user_id=user.userId,
+                                   deadline=datetime(2030, 1, 6, 11, 0))
+        self.important = PersonalTask(title="important", status="In Progress", priority=1, user_id=user.userId,
+                                      deadline=datetime(2030, 1, 7, 11, 0))
+        db.session.add_all([self.urgent, self.important])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def post(self, **payload):
+        body = {"user_id": self.user_id, "task_hours": {str(self.urgent.id): 2, str(self.important.id): 2},
+                "start": START.isoformat(), **payload}
+        return self.client.post("/ai/generate-schedule", json=body)
+
+    def test_greedy_misses_deadline_edf_does_not(self):
+        greedy = self.post().get_json()
+        self.assertEqual([t["task"] for t in greedy["schedule"][0]["tasks"]], ["important", "important"])
+
+        response = self.post(solver="edf")
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(payload["solver"], "edf")
+        self.assertEqual(payload["unassigned_tasks"], [])
+        self.assertEqual(payload["schedule"][0]["date"], "2030-01-06")
+        self.assertEqual([t["task"] for t in payload["schedule"][0]["tasks"]], ["urgent", "urgent"])
+        self.assertEqual({t["task"]: t["slack_minutes"] for t in payload["tasks"]}, {"urgent": 0, "important": 0})
+        self.assertTrue(all(t["on_time"] for t in payload["tasks"]))
+
+    def test_invalid_solver_and_start(self):
+        self.assertEqual(self.post(solver="ilp").status_code, 400)
+        self.assertEqual(self.post(solver="edf", start="tomorrow").status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
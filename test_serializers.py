@@ -0,0 +1,112 @@
+import unittest
+
+from extensions import db
+from availability import save_availability
+from models import User, Group, GroupTask, WEEKDAY_NAMES, group_user_association, task_user_association
+from testing_utils import make_test_app, count_queries
+
+
+class SerializerQueryCountTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def seed(self, groups, tasks_per_group, members_per_group=3, status="Pending"):
+        users = [User(username=f"u{i}", email=f"u{i}@example.com") for i in range(members_per_group)]
+        db.session.add_all(users)
+        db.session.flush()
+        for g in range(groups):
+            group = Group(name=f"group {g}", created_by=users[0].userId)
+            db.session.add(group)
+            db.session.flush()
+            db.session.execute(group_user_association.insert(), [
+                {"group_id": group.id, "user_id": user.userId} for user in users
+            ])
+            for t in range(tasks_per_group):
+                task = GroupTask(title=f"task {g}.{t}", group_id=group.id, priority=2, status=status)
+                db.session.add(task)
+                db.session.flush()
+                db.session.execute(task_user_association.insert(), [
+                    {"task_id": task.id, "user_id": user.userId} for user in users[:2]
+                ])
+        db.session.commit()
+        return users
+
+    def request_query_count(self, url):
+        with count_queries() as counter:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return counter.count, response.get_json()
+
+    def assert_constant_queries(self, url_for_seed):
+        small, _ = self.request_query_count(url_for_seed(self.seed(2, 2)))
+        self.tearDown(); self.setUp()
+        large, payload = self.request_query_count(url_for_seed(self.seed(25, 10)))
+        self.assertEqual(small, large, f"query count grew with rows: {small} -> {large}")
+        return large, payload
+
+    def test_groups_listing(self):
+        count, payload = self.assert_constant_queries(lambda users: "/groups")
+        self.assertLessEqual(count, 3)
+        self.assertEqual(len(payload), 25)
+        self.assertEqual(len(payload[0]["members"]), 3)
+        self.assertEqual(len(payload[0]["tasks"]), 10)
+
+    def test_user_groups(self):
+        count, payload = self.assert_constant_queries(lambda users: f"/groups/user/{users[1].userId}")
+        self.assertLessEqual(count, 3)
+        self.assertEqual(len(payload), 25)
+
+    def test_group_tasks(self):
+        count, payload = self.assert_constant_queries(lambda users: "/groups/1/tasks")
+        self.assertLessEqual(count, 3)
+        self.assertEqual(payload[0]["assigned_users"], [1, 2])
+
+    def test_group_tasks_for_user(self):
+        count, payload = self.assert_constant_queries(lambda users: f"/group-tasks/user/{users[0].userId}")
+        self.assertLessEqual(count, 2)
+        self.assertEqual(len(payload), 250)
+        self.assertEqual(payload[0]["group"], {"name": "group 0"})
+
+    def schedule_query_count(self, groups, tasks_per_group):
+        users = self.seed(groups, tasks_per_group, status="In Progress")
+        save_availability(users[0].userId, {day: [(8 * 60, 20 * 60)] for day in WEEKDAY_NAMES})
+        db.session.commit()
+        task_hours = {str(task.id): 2 for task in GroupTask.query.all()}
+        with count_queries() as counter:
+            response = self.client.post("/ai/generate-schedule", json={"user_id": users[0].userId,
+                                                                     "task_hours": task_hours})
+        self.assertEqual(response.status_code, 200)
+        return counter.count, response.get_json()
+
+    def test_generate_schedule_queries_independent_of_slots(self):
+        small, _ = self.schedule_query_count(1, 2)
+        self.tearDown(); self.setUp()
+        large, payload = self.schedule_query_count(4, 10)
+        self.assertEqual(small, large)
+        first = payload["schedule"][0]["tasks"][0]
+        self.assertEqual(first["group"], "group 0")
+        self.assertEqual(first["group_name"], "group 0")
+
+    def test_serialized_payload_matches_to_dict(self):
+        from serializers import serialize_group_tasks, serialize_groups
+        self.seed(3, 4)
+        groups = Group.query.all()
+        tasks = GroupTask.query.all()
+        self.assertEqual(serialize_groups(groups), [g.to_dict() for g in groups])
+        self.assertEqual(serialize_group_tasks(tasks), [t.to_dict() for t in tasks])
+
+
+if __name__ == '__main__':
+    unittest.main()
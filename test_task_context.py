@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import User, Group, GroupTask, PersonalTask, task_user_association
+from task_context import load_task_context
+from testing_utils import make_test_app, count_queries
+
+
+class TaskContextTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+
+        self.now = datetime(2025, 5, 1, 12, 0, 0)
+        self.me = User(username="me", email="me@example.com")
+        self.other = User(username="other", email="other@example.com")
+        db.session.add_all([self.me, self.other])
+        db.session.flush()
+        group = Group(name="team", created_by=self.me.userId)
+        db.session.add(group)
+        db.session.flush()
+
+        def personal(title, status, deadline=None, user=self.me):
+            db.session.add(PersonalTask(title=title, status=status, deadline=deadline,
+                                        priority=2, user_id=user.userId))
+
+        def group_task(title, status, assignees, deadline=None):
+            task = GroupTask(title=title, status=status, deadline=deadline, priority=2, group_id=group.id)
+            db.session.add(task)
+            db.session.flush()
+            for user in assignees:
+                db.session.execute(task_user_association.insert().values(task_id=task.id, user_id=user.userId))
+
+        personal("soon", "To Do", self.now + timedelta(days=1))
+        personal("later", "In Progress", self.now + timedelta(days=10))
+        personal("finished", "Done", self.now + timedelta(days=1))
+        personal("completed", "completed")
+        personal("no status", None)
+        personal("someone else's", "To Do", self.now, user=self.other)
+        group_task("mine overdue", "In Progress", [self.me], self.now - timedelta(days=1))
+        group_task("mine done", "Done", [self.me])
+        group_task("not mine", "To Do", [self.other], self.now)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def titles(self, tasks):
+        return sorted(t["title"] for t in tasks)
+
+    def test_buckets(self):
+        context = load_task_context(self.me.userId, now=self.now)
+        self.assertEqual(self.titles(context["personal_tasks"]), ["later", "no status", "soon"])
+        self.assertEqual(self.titles(context["group_tasks"]), ["mine overdue"])
+        self.assertEqual(self.titles(context["urgent_tasks"]), ["mine overdue", "soon"])
+        self.assertEqual(context["group_tasks"][0]["assigned_users"], [self.me.userId])
+
+    def test_deadlines_are_native_datetimes(self):
+        context = load_task_context(self.me.userId, now=self.now)
+        soon = next(t for t in context["personal_tasks"] if t["title"] == "soon")
+        self.assertEqual(soon["deadline"], self.now + timedelta(days=1))
+        self.assertIsInstance(context["group_tasks"][0]["deadline"], datetime)
+        self.assertIsNone(next(t for t in context["personal_tasks"] if t["title"] == "no status")["deadline"])
+
+    def test_query_count_independent_of_tenant_size(self):
+        my_id = self.me.userId
+        for i in range(200):
+            db.session.add(PersonalTask(title=f"noise {i}", status="To Do", priority=3, user_id=self.other.userId))
+        db.session.commit()
+        with count_queries() as counter:
+            load_task_context(str(my_id), now=self.now)
+        self.assertEqual(counter.count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
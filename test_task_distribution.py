@@ -0,0 +1,148 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import User, Group, GroupTask, UserSchedule, group_user_association, task_user_association
+from task_distribution import LoadBalancer, TaskAssignments
+from testing_utils import make_test_app, count_queries
+
+
+class LoadBalancerTests(unittest.TestCase):
+
+    def test_least_loaded_then_most_free(self):
+        balancer = LoadBalancer({1: 60, 2: 600, 3: 120})
+        self.assertEqual(balancer.pick(1), [2])
+        self.assertEqual(balancer.pick(2), [3, 1])
+        self.assertEqual(balancer.pick(1, exclude={2}), [3])
+        self.assertEqual(balancer.loads, {1: 1, 2: 1, 3: 2})
+
+    def test_pick_more_than_available(self):
+        balancer = LoadBalancer({1: 0, 2: 0})
+        self.assertEqual(balancer.pick(3, exclude={1}), [2])
+
+
+class AiDistributeTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = make_test_app()
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def seed(self, member_count, task_count):
+        users = [User(username=f"m{i}", email=f"m{i}@example.com") for i in range(member_count)]
+        db.session.add_all(users)
+        db.session.flush()
+        group = Group(name="team", created_by=users[0].userId)
+        db.session.add(group)
+        db.session.flush()
+        db.session.execute(group_user_association.insert(), [
+            {"group_id": group.id, "user_id": user.userId} for user in users
+        ])
+        # Member i has i free hours on Monday
+        db.session.add_all([UserSchedule(user_id=user.userId, schedule_json=json.dumps({"Monday": ["x"] * i}))
+                            for i, user in enumerate(users)])
+        tasks = [GroupTask(title=f"t{i}", group_id=group.id, priority=3, status="To Do") for i in range(task_count)]
+        db.session.add_all(tasks)
+        db.session.commit()
+        return group.id, [user.userId for user in users], [task.id for task in tasks]
+
+    def distribute(self, group_id, member_ids, tasks):
+        return self.client.post(f"/groups/{group_id}/ai-distribute",
+                                json={"tasks": tasks, "members": [{"id": m} for m in member_ids]})
+
+    def test_balanced_assignment(self):
+        group_id, member_ids, task_ids = self.seed(3, 7)
+        response = self.distribute(group_id, member_ids, [{"id": t, "priority": 3} for t in task_ids])
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(len(payload), 7)
+        # Most free time first, then round-robin by load
+        self.assertEqual([t["new_assigned_users"][0] for t in payload[:3]], list(reversed(member_ids)))
+        counts = {m: sum(m in t["assigned_users"] for t in payload) for m in member_ids}
+        self.assertEqual(sorted(counts.values()), [2, 2, 3])
+        stored = db.session.query(task_user_association).count()
+        self.assertEqual(stored, 7)
+
+    def test_urgent_done_and_existing_assignees(self):
+        group_id, member_ids, task_ids = self.seed(4, 3)
+        urgent, done, assigned = task_ids
+        db.session.get(GroupTask, urgent).priority = 1
+        db.session.get(GroupTask, urgent).deadline = datetime.utcnow() + timedelta(hours=5)
+        db.session.get(GroupTask, done).status = "Done"
+        db.session.execute(task_user_association.insert(), [{"task_id": assigned, "user_id": member_ids[3]}])
+        db.session.commit()
+
+        payload = self.distribute(group_id, member_ids, [
+            {"id": assigned, "priority": 3},
+            {"id": done, "priority": 3},
+            {"id": urgent, "priority": 1, "deadline": (datetime.utcnow() + timedelta(hours=5)).isoformat()},
+        ]).get_json()
+        self.assertEqual([t["id"] for t in payload], [urgent, assigned])
+        self.assertEqual(payload[0]["new_assigned_users"], [member_ids[3], member_ids[2], member_ids[1]])
+        self.assertEqual(payload[1]["new_assigned_users"], [member_ids[0]])
+        self.assertEqual(payload[1]["assigned_users"], [member_ids[3], member_ids[0]])
+
+    def test_task_assignments_api(self):
+        group_id, member_ids, task_ids = self.seed(3, 2)
+        first, second = task_ids
+        db.session.execute(task_user_association.insert(), [{"task_id": first, "user_id": member_ids[0]}])
+        db.session.commit()
+
+        with count_queries() as counter:
+            assignments = TaskAssignments.load(task_ids + [999], member_ids + [999])
+        self.assertEqual(counter.count, 2)
+        self.assertEqual(set(assignments.tasks), {first, second})
+        self.assertEqual(assignments.valid_user_ids, set(member_ids))
+
+        self.assertEqual(assignments.assign(first, [member_ids[0], member_ids[1], 999]), [member_ids[1]])
+        self.assertEqual(assignments.replace(second, [member_ids[2]]), ([member_ids[2]], []))
+        self.assertEqual(assignments.replace(first, [member_ids[1], member_ids[2]]), ([member_ids[2]], [member_ids[0]]))
+        with count_queries() as counter:
+            assignments.flush()
+        self.assertEqual(counter.count, 2)
+        db.session.commit()
+
+        stored = sorted(db.session.query(task_user_association.c.task_id, task_user_association.c.user_id))
+        self.assertEqual(stored, sorted([(first, member_ids[1]), (first, member_ids[2]), (second, member_ids[2])]))
+
+    def test_update_group_task_assignees(self):
+        group_id, member_ids, task_ids = self.seed(3, 1)
+        outsider = User(username="outsider", email="outsider@example.com")
+        db.session.add(outsider)
+        db.session.execute(task_user_association.insert(), [{"task_id": task_ids[0], "user_id": member_ids[0]}])
+        db.session.commit()
+        outsider_id = outsider.userId
+
+        response = self.client.put(f"/groups/{group_id}/tasks/{task_ids[0]}", json={
+            "title": "renamed", "assigned_users": [member_ids[2], member_ids[1], outsider_id]
+        })
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(payload["title"], "renamed")
+        self.assertEqual(payload["assigned_users"], [member_ids[1], member_ids[2]])
+        stored = sorted(user_id for (user_id,) in db.session.query(task_user_association.c.user_id))
+        self.assertEqual(stored, [member_ids[1], member_ids[2]])
+
+    def test_query_count_independent_of_group_size(self):
+        def queries(members, tasks):
+            self.tearDown(); self.setUp()
+            group_id, member_ids, task_ids = self.seed(members, tasks)
+            with count_queries() as counter:
+                self.distribute(group_id, member_ids, [{"id": t, "priority": 3} for t in task_ids])
+            return counter.count
+
+        self.assertEqual(queries(3, 5), queries(40, 120))
+
+
+if __name__ == '__main__':
+    unittest.main()
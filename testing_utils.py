@@ -0,0 +1,173 @@
+"""
+Helpers shared by the test suite and the benchmarks: an app bound to an in-memory
+SQLite database with every table created, a SQL statement counter, and a local
+stand-in for the chat-completions API.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from sqlalchemy import event, text
+
+from extensions import db
+
+
+def make_test_app(database_uri="sqlite:///:memory:"):
+    """
+    Create the Flask app against a throwaway database (in-memory SQLite by default)
+    with all tables created. PostgreSQL and MySQL URIs work too, for benchmarks.
+    """
+    from app import create_app
+
+    # Scoped to create_app(): tests that build the app themselves must not inherit these
+    with mock.patch.dict(os.environ, {"SQLALCHEMY_DATABASE_URI": database_uri,
+                                      "AI_WARMUP": os.environ.get("AI_WARMUP", "0")}):
+        app = create_app()
+    app.config['TESTING'] = True
+
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == "sqlite":
+            # UserFreeSchedule/UserSchedule live in the SQL Server "dbo" schema
+            @event.listens_for(engine, "connect")
+            def attach_dbo_schema(dbapi_connection, connection_record):
+                dbapi_connection.execute("ATTACH DATABASE ':memory:' AS dbo")
+        elif engine.dialect.name == "postgresql":
+            with engine.begin() as connection:
+                connection.execute(text("CREATE SCHEMA IF NOT EXISTS dbo"))
+        elif engine.dialect.name in ("mysql", "mariadb"):
+            # A MySQL schema is a database; the user needs CREATE rights for it
+            with engine.begin() as connection:
+                connection.execute(text("CREATE DATABASE IF NOT EXISTS dbo"))
+
+        db.create_all()
+    return app
+
+
+class QueryCounter:
+    """Collects every SQL statement executed on an engine while active."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Usage:
+        with count_queries() as counter:
+            client.get("/groups")
+        assert counter.count <= 3
+    """
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._record)
+
+
+class StubLLMServer:
+    """
+    Local HTTP server answering POST /v1/chat/completions like the Together.ai API.
+
+        with StubLLMServer(delay=0.05, fail_first=[503]) as stub:
+            client = LLMClient("key", "model", base_url=stub.base_url)
+
+    `delay` is added to every response, `fail_first` lists status codes returned by the
+    first requests before the server starts answering normally. Requests with
+    "stream": true get the reply as server-sent events, one whitespace-separated token
+    every `token_delay` seconds.
+    """
+
+    def __init__(self, reply="stub reply", delay=0.0, fail_first=(), token_delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.token_delay = token_delay
+        self.fail_first = list(fail_first)
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests.append(body)
+                    status = stub.fail_first.pop(0) if stub.fail_first else 200
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if status == 200 and body.get("stream"):
+                    return self.stream_reply()
+                if status != 200:
+                    payload = json.dumps({"error": "stub failure"}).encode()
+                else:
+                    payload = json.dumps({"choices": [{"message": {"role": "assistant", "content": stub.reply}}]}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def stream_reply(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                tokens = stub.reply.split(" ")
+                for index, token in enumerate(tokens):
+                    if index and stub.token_delay:
+                        time.sleep(stub.token_delay)
+                    text = token if index == 0 else " " + token
+                    event = {"choices": [{"delta": {"content": text}, "finish_reason": None}]}
+                    # Raw UTF-8 without a charset in the Content-Type, as OpenAI-compatible servers often send it
+                    self.write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode())
+                self.write_chunk(b"data: [DONE]\n\n")
+                self.write_chunk(b"")
+
+        return Handler
+
+    def __enter__(self):
+        server_class = type("StubServer", (ThreadingHTTPServer,), {"request_queue_size": 256})
+        self.server = server_class(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()